@@ -18,9 +18,12 @@ from .basic import (
 )
 IFloat = IReal
 
+from . import options
 from .utils import (
     to_radians,
     to_degrees,
+    sum,
+    prod,
     math
 )
 
@@ -33,12 +36,24 @@ from .core.expressions.add import ExpressionNode, Operation, Add
 from .core.expressions.divide import Divide, FloorDiv, Modulo
 from .core.expressions.multiply import Multiply, Power
 from .core.expressions.binaries import (
+    BinaryOperation,
     LeftShift,
     RightShift,
     And,
     Xor,
     Or
 )
+from .core.expressions.builder import ExpressionBuilder
+from .core.expressions.traversal import (
+    children,
+    preorder,
+    postorder,
+    Visitor,
+    Transformer
+)
+from .core.expressions.render import Renderer, render
+from .core.expressions.expand import Expander, expand, expand_power, iter_power_terms
+from .core.expressions.linear import LinearForm
 
 from .core.numbers import (
     Number,
@@ -48,10 +63,16 @@ from .core.numbers import (
     Integral
 )
 Float = Real
+from .core import assumptions, symbols
+from .core.symbols import SymbolTable
+from .core.assumptions import assume, forget
 from .core.variables import BasicVariable, Variable, VariableGroup, RaisedVariable
+from .core.indexed import IndexedSymbol
 from .core.functions import (
     Function,
 )
+from .core.equivalence import probably_equal
+from .core.egraph import EGraph, optimize
 
 from .constants.core import (
     Constant,
@@ -80,8 +101,11 @@ from .functions.integral import (
     Round,
 )
 from .functions.roots import Root, Sqrt
+from .functions.custom import function
+from .core.cache import function_cache
 
 from . import (
     geometry,
-    expressions
+    expressions,
+    rewrite
 )
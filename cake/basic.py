@@ -4,6 +4,7 @@
 
 from __future__ import annotations
 from ._abc import BasicNode, BasicExpression, BasicFunction, BasicVariable
+from .core.symbols import intern
 from abc import abstractmethod
 import numbers
 
@@ -75,11 +76,13 @@ class Variable(BasicVariable, BasicNode):
             Variable('a', default_value=15)
     '''
     representation: str
+    symbol_id: int
     coefficient: Any
     power: Any
 
     def __init__(self, repr: str, coefficient: Any = 1, power: Any = 1) -> None:
         self.__repr = repr
+        self.symbol_id = intern(repr)
 
         self.coefficient = coefficient
         self.power = power
@@ -111,6 +114,21 @@ class Variable(BasicVariable, BasicNode):
         '''
         return [cls(i) if isinstance(i, str) else cls(*i) for i in symbols]
 
+    @staticmethod
+    def array(name: str, size: int) -> cake.IndexedSymbol:
+        ''' Returns an :class:`IndexedSymbol` representing ``name[0]`` to ``name[size - 1]``,
+        unlike :meth:`Variable.many` no variables are created until they are indexed.
+
+        .. code-block:: py
+
+            >>> w = Variable.array('w', 10_000)
+            >>> w[0] + w[1]
+            Expression(w[0] + w[1])
+            >>> (w[0] + w[1]).solve(w=[3, 4, ...])
+            Integral(7)
+        '''
+        return cake.IndexedSymbol(name, size)
+
 
 class Function(BasicFunction, BasicNode):
     ''' Base class for creating functions,
@@ -0,0 +1,208 @@
+## Domain facts about symbols
+##
+## >>> x = Variable('x', assumptions={'positive', 'integer'})
+## >>> is_integer(x * 2 + 1)
+## True
+## >>> Sqrt(x ** 2)
+## x
+##
+## Facts are stored per symbol within the symbol table, so every Variable('x') shares them.
+## Variable('x', assumptions=...) is shorthand for assume('x', ...) and won't replace facts already made.
+## Queries only answer True when a fact is known, False means unknown rather than untrue.
+##
+from __future__ import annotations
+from typing import Any, Dict, FrozenSet, Iterable
+import numbers
+
+from .symbols import table, symbol_id
+import cake
+
+KNOWN = frozenset({
+    'real',
+    'integer',
+    'even',
+    'odd',
+    'positive',
+    'negative',
+    'nonnegative',
+    'nonzero',
+})
+''' Assumptions which can be given to a symbol '''
+
+## Facts which follow from another
+IMPLIES: Dict[str, FrozenSet[str]] = {
+    'integer': frozenset({'real'}),
+    'even': frozenset({'integer', 'real'}),
+    'odd': frozenset({'integer', 'real', 'nonzero'}),
+    'positive': frozenset({'real', 'nonnegative', 'nonzero'}),
+    'negative': frozenset({'real', 'nonzero'}),
+    'nonnegative': frozenset({'real'}),
+}
+
+def assume(symbol: Any, facts: Iterable[str], *, replace: bool = True) -> FrozenSet[str]:
+    ''' Sets the assumptions of a symbol, replacing any it had before.
+    Assumptions belong to the symbol rather than a variable, so they apply to every variable using it.
+
+    .. code-block:: py
+
+        >>> assume('n', {'integer', 'positive'})
+        frozenset({'integer', 'nonnegative', 'nonzero', 'positive', 'real'})
+
+    Parameters
+    ----------
+    symbol: Union[:class:`str`, :class:`Variable`]
+        Symbol to set assumptions for
+    facts: Iterable[:class:`str`]
+        Assumptions to set, must be within :data:`KNOWN`
+    replace: :class:`bool`
+        Whether different assumptions already made about the symbol can be replaced
+
+    Raises
+    ------
+    :py:obj:`ValueError`:
+        An unknown or contradictory assumption was given,
+        or the symbol already has different assumptions and ``replace`` is False
+    '''
+    i = symbol_id(symbol)
+    symbol = getattr(symbol, 'representation', symbol)
+    facts = set(facts)
+
+    unknown = facts - KNOWN
+    if unknown:
+        raise ValueError(f'Unknown assumptions {sorted(unknown)!r}, expected any of {sorted(KNOWN)!r}')
+
+    for fact in list(facts):
+        facts |= IMPLIES.get(fact, frozenset())
+
+    if {'positive', 'negative'} <= facts or {'even', 'odd'} <= facts or {'negative', 'nonnegative'} <= facts:
+        raise ValueError(f'Contradictory assumptions given for {symbol!r}')
+
+    current = table.assumptions.get(i)
+    if not replace and current is not None and current != facts:
+        raise ValueError(f'{symbol!r} already has the assumptions {sorted(current)!r}, use assume to replace them')
+
+    if facts:
+        table.assumptions[i] = frozenset(facts)
+    else:
+        table.assumptions.pop(i, None)
+    return frozenset(facts)
+
+
+def assumptions(symbol: Any) -> FrozenSet[str]:
+    ''' Returns the assumptions of a symbol, including those implied by others '''
+    return table.assumptions.get(symbol_id(symbol), frozenset())
+
+
+def forget(*symbols: Any) -> None:
+    ''' Removes the assumptions of the symbols given, or every symbol if none are given '''
+    if not symbols:
+        table.assumptions.clear()
+    for symbol in symbols:
+        table.assumptions.pop(symbol_id(symbol), None)
+
+
+def _value(node: Any) -> Any:
+    value = getattr(node, 'value', node)
+    if isinstance(value, bool) or not isinstance(value, numbers.Number):
+        return None
+    return value
+
+
+def _natural(power: Any) -> bool:
+    value = _value(power)
+    return isinstance(value, numbers.Integral) and value >= 0
+
+
+def _symbol(node: Any, fact: str) -> bool:
+    if getattr(node, '_to_type', None):
+        ## Constants such as Pi are positive real numbers
+        return fact in ('real', 'positive', 'nonnegative', 'nonzero')
+    return fact in assumptions(node)
+
+
+def is_real(node: Any) -> bool:
+    ''' Returns whether a node is known to be a real number '''
+    return _check(node, 'real')
+
+
+def is_integer(node: Any) -> bool:
+    ''' Returns whether a node is known to be an integer '''
+    return _check(node, 'integer')
+
+
+def is_positive(node: Any) -> bool:
+    ''' Returns whether a node is known to be greater than 0 '''
+    return _check(node, 'positive')
+
+
+def is_nonnegative(node: Any) -> bool:
+    ''' Returns whether a node is known to be greater than or equal to 0 '''
+    return _check(node, 'nonnegative')
+
+
+def is_nonzero(node: Any) -> bool:
+    ''' Returns whether a node is known not to be 0 '''
+    return _check(node, 'nonzero')
+
+
+def _check(node: Any, fact: str) -> bool:
+    node = getattr(node, 'exp', node)
+
+    value = _value(node)
+    if value is not None:
+        if fact == 'integer':
+            return isinstance(value, numbers.Integral) or (isinstance(value, float) and value.is_integer())
+        elif fact == 'real':
+            return isinstance(value, numbers.Real)
+        elif not isinstance(value, numbers.Real):
+            return False
+        return {'positive': value > 0, 'nonnegative': value >= 0, 'nonzero': value != 0}[fact]
+
+    if isinstance(node, cake.Variable):
+        factors = [(node.coefficient, None), (node, node.power)]
+    elif isinstance(node, cake.VariableGroup):
+        factors = [(node.coefficient, None)] + [(group, group.power) for group in node.groups]
+    elif isinstance(node, cake.Multiply):
+        factors = [(child, None) for child in node.nodes]
+    elif isinstance(node, cake.Add):
+        return _check_sum(node.nodes, fact)
+    else:
+        return False
+
+    return _check_product(factors, fact)
+
+
+def _check_product(factors: list, fact: str) -> bool:
+    ## Factors are (node, power) pairs, a power of None means the node is checked as it is
+    for node, power in factors:
+        if power is None:
+            known = _check(node, fact)
+        else:
+            ## Integer powers of the symbol, such as x**2 where x is an integer
+            if fact == 'integer':
+                known = _symbol(node, 'integer') and _natural(power)
+            elif fact == 'real':
+                known = _symbol(node, 'real') and (_natural(power) or _symbol(node, 'positive'))
+            elif fact == 'nonzero':
+                known = _symbol(node, 'nonzero') and _value(power) is not None
+            else:
+                known = _symbol(node, 'positive') and _value(power) is not None
+                if fact == 'nonnegative' and not known:
+                    value = _value(power)
+                    known = value is not None and (
+                        (_symbol(node, 'nonnegative') and value > 0)
+                        or (_symbol(node, 'real') and _natural(power) and value % 2 == 0)
+                    )
+
+        if not known:
+            return False
+    return True
+
+
+def _check_sum(nodes: list, fact: str) -> bool:
+    if fact == 'nonzero':
+        ## A sum of positive terms is never 0
+        return all(_check(node, 'positive') for node in nodes)
+    elif fact == 'positive':
+        return all(_check(node, 'nonnegative') for node in nodes) and any(_check(node, 'positive') for node in nodes)
+    return all(_check(node, fact) for node in nodes)
@@ -0,0 +1,105 @@
+## Memoisation of function results
+##
+## >>> cake.options.configure(function_cache_size=1024)
+## >>> Sqrt(Variable('x')).evaluate(x=18)       # factorised
+## >>> Sqrt(Variable('y')).evaluate(y=18)       # read from the cache
+## >>> cake.function_cache.info()
+## CacheInfo(hits=1, misses=1, maxsize=1024, currsize=1)
+##
+## Results are keyed by the type of the function, any state such as the base of a Root,
+## and the solved parameter, coefficient and power. Only numerical values are cached.
+##
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, Optional
+import numbers
+
+from cake import options
+
+MISSING = object()
+
+
+class CacheInfo(NamedTuple):
+    ''' Statistics for a :class:`LRUCache` '''
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        ''' Fraction of lookups which were found in the cache '''
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache:
+    ''' A bounded cache which discards the least recently used results first,
+    its size is set by ``cake.options.function_cache_size`` and a size of 0 disables it.
+
+    .. code-block:: py
+
+        >>> with cake.options.using(function_cache_size=128):
+        ...     for _ in range(10):
+        ...         Sin(x).evaluate(x=1)
+        >>> cake.function_cache.info().hit_rate
+        0.9
+    '''
+    __slots__ = ('_data', 'hits', 'misses')
+
+    def __init__(self) -> None:
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def enabled(self) -> bool:
+        ''' Whether results are being cached '''
+        return options.function_cache_size > 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        ''' Returns a cached result, marking it as recently used '''
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        ''' Stores a result, discarding the least recently used results when full '''
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+        while len(self._data) > options.function_cache_size:
+            self._data.popitem(last=False)
+
+    def info(self) -> CacheInfo:
+        ''' Returns the hit and miss counts along with the size of the cache '''
+        return CacheInfo(self.hits, self.misses, options.function_cache_size, len(self._data))
+
+    def clear(self) -> None:
+        ''' Removes every result and resets the statistics '''
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+function_cache = LRUCache()
+''' Cache used when evaluating functions '''
+
+
+def value_key(x: Any) -> Optional[Hashable]:
+    ''' Returns a key for a solved numerical value, ``None`` if it can't be cached.
+    Types are kept as part of the key since ``Sqrt(4)`` and ``Sqrt(4.0)`` differ.
+    '''
+    value = getattr(x, 'value', x)
+    if isinstance(value, bool) or not isinstance(value, numbers.Number):
+        return None
+    return (type(value), value)
@@ -0,0 +1,541 @@
+## Equality saturation over expression trees
+##
+## An e-graph stores many equivalent forms of an expression at once,
+## each e-class is a set of e-nodes which are known to be equal.
+##
+## Sin(x) * y + Sin(x) * z
+##
+## c0 = {x}, c1 = {Sin(c0)}, c2 = {y}, c3 = {z}
+## c4 = {c1 * c2, c2 * c1}, c5 = {c1 * c3, c3 * c1}
+## c6 = {c4 + c5, c1 * (c2 + c3), ...}
+##
+## Rules only ever add e-nodes and merge e-classes, so no rewrite can lose a cheaper form,
+## once saturated the cheapest tree is extracted from the root e-class.
+##
+## E-nodes are tuples of (operation, payload, *child e-class ids).
+##
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+import copy
+import numbers
+
+from .expressions.add import Operation, Add
+from .expressions.multiply import Multiply, Power
+from .expressions.divide import Divide
+import cake
+
+ENode = Tuple[Any, ...]
+
+DEFAULT_COSTS: Dict[str, float] = {
+    'Number': 0,
+    'Variable': 0,
+    'Constant': 0,
+    'Add': 1,
+    'Multiply': 1,
+    'Divide': 2,
+    'Power': 4,
+    'Function': 10,
+}
+''' Cost of each node used by :func:`optimize` when none is given,
+functions are looked up by their class name before falling back to ``'Function'``.
+'''
+
+_FUNCTION_FIELDS = ('parameter', 'coefficient', 'power', '_err')
+
+
+def _python(value: Any) -> Any:
+    return getattr(value, 'value', value)
+
+
+def _is_integer(value: Any) -> bool:
+    return isinstance(value, numbers.Integral) or (isinstance(value, float) and value.is_integer())
+
+
+class EGraph(object):
+    ''' A set of e-classes, each holding equivalent e-nodes.
+
+    .. code-block:: py
+
+        >>> graph = EGraph()
+        >>> root = graph.add_node(Sin(x) * y + Sin(x) * z)
+        >>> graph.saturate()
+        >>> graph.extract(root)
+        Expression((y + z) * Sin(x))
+
+    Parameters
+    ----------
+    node_limit: :class:`int`
+        Maximum number of e-nodes, rules stop being applied once reached.
+    '''
+    def __init__(self, *, node_limit: int = 5000) -> None:
+        self.node_limit = node_limit
+
+        self.parents: List[int] = []
+        self.classes: Dict[int, Set[ENode]] = {}
+        self.hashcons: Dict[ENode, int] = {}
+        self.constants: Dict[int, Any] = {}
+        self.templates: Dict[Any, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.hashcons)
+
+    ''' Union find '''
+
+    def find(self, cid: int) -> int:
+        ''' Returns the canonical id of an e-class '''
+        root = cid
+        parents = self.parents
+        while parents[root] != root:
+            root = parents[root]
+
+        while parents[cid] != root:
+            parents[cid], cid = root, parents[cid]
+        return root
+
+    def canonicalize(self, enode: ENode) -> ENode:
+        return enode[:2] + tuple(self.find(c) for c in enode[2:])
+
+    def add(self, enode: ENode) -> int:
+        ''' Adds an e-node, returning the id of the e-class it belongs to '''
+        enode = self.canonicalize(enode)
+        cid = self.hashcons.get(enode)
+        if cid is not None:
+            return self.find(cid)
+
+        cid = len(self.parents)
+        self.parents.append(cid)
+        self.classes[cid] = {enode}
+        self.hashcons[enode] = cid
+
+        if enode[0] == 'Number':
+            self.constants[cid] = enode[1]
+        return cid
+
+    def union(self, a: int, b: int) -> bool:
+        ''' Merges 2 e-classes, returning whether they were different '''
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+
+        if len(self.classes[a]) < len(self.classes[b]):
+            a, b = b, a
+
+        self.parents[b] = a
+        self.classes[a] |= self.classes.pop(b)
+        if b in self.constants:
+            self.constants.setdefault(a, self.constants.pop(b))
+        return True
+
+    def rebuild(self) -> None:
+        ''' Restores congruence, e-nodes whose children were merged are merged in turn '''
+        while True:
+            hashcons = {}
+            pending = []
+
+            for cid in list(self.classes):
+                nodes = {self.canonicalize(n) for n in self.classes[cid]}
+                self.classes[cid] = nodes
+
+                for enode in nodes:
+                    other = hashcons.get(enode)
+                    if other is not None and other != cid:
+                        pending.append((other, cid))
+                    hashcons[enode] = cid
+
+            self.hashcons = hashcons
+            if not pending:
+                return
+
+            for a, b in pending:
+                self.union(a, b)
+
+    def constant(self, cid: int) -> Any:
+        ''' Returns the numerical value of an e-class, or ``None`` '''
+        return self.constants.get(self.find(cid))
+
+    ''' Conversion '''
+
+    def _function_key(self, node: Any) -> Any:
+        fields = tuple(sorted((k, repr(v)) for k, v in vars(node).items() if k not in _FUNCTION_FIELDS))
+        key = (type(node), fields)
+        self.templates.setdefault(key, node)
+        return key
+
+    def _number(self, value: Any) -> int:
+        return self.add(('Number', _python(value)))
+
+    def _term(self, coefficient: Any, base: int, power: Any) -> int:
+        ## coefficient * base ** power, skipping ones
+        if not (isinstance(_python(power), numbers.Number) and _python(power) == 1):
+            base = self.add(('Power', None, base, self.add_node(power)))
+        if not (isinstance(_python(coefficient), numbers.Number) and _python(coefficient) == 1):
+            base = self.add(('Multiply', None, self.add_node(coefficient), base))
+        return base
+
+    def _fold(self, op: str, ids: List[int]) -> int:
+        result = ids[0]
+        for cid in ids[1:]:
+            result = self.add((op, None, result, cid))
+        return result
+
+    def add_node(self, node: Any) -> int:
+        ''' Adds a cake node into the graph, returning the id of its e-class '''
+        if isinstance(node, cake.Expression):
+            node = node.exp
+
+        if isinstance(node, str):
+            node = cake.Variable(node)
+
+        if isinstance(node, numbers.Number):
+            return self._number(node)
+
+        elif isinstance(node, cake.Variable):
+            if getattr(node, '_to_type', None):
+                base = self.add(('Constant', type(node)))
+            else:
+                base = self.add(('Variable', node.representation))
+            return self._term(node.coefficient, base, node.power)
+
+        elif isinstance(node, cake.VariableGroup):
+            ids = [self.add_node(group) for group in node.groups]
+            if not (isinstance(_python(node.coefficient), numbers.Number) and _python(node.coefficient) == 1):
+                ids.insert(0, self.add_node(node.coefficient))
+            return self._fold('Multiply', ids)
+
+        elif isinstance(node, cake.RaisedVariable):
+            return self.add(('Power', None, self.add_node(node.base), self.add_node(node.power)))
+
+        elif isinstance(node, cake.Function):
+            base = self.add(('Function', self._function_key(node), self.add_node(node.parameter)))
+            return self._term(node.coefficient, base, node.power)
+
+        elif isinstance(node, Operation):
+            ids = [self.add_node(child) for child in node.nodes]
+            name = type(node).__name__
+
+            if type(node) in (Add, Multiply):
+                return self._fold(name, ids)
+            elif type(node) in (Divide, Power):
+                return self.add((name, None, *ids))
+            return self.add(('Operation', type(node), *ids))
+
+        raise TypeError(f'Cannot add node of type {node.__class__.__name__} to an e-graph')
+
+    ''' Rules '''
+
+    def _rules(self, cid: int, enode: ENode) -> Iterator[Tuple[int, Callable[[], int]]]:
+        ## Yields e-classes to merge with cid, as functions which add the equivalent e-node
+        op = enode[0]
+        add = self.add
+        constant = self.constant
+
+        if op in ('Add', 'Multiply'):
+            _, _, a, b = enode
+            ## Commutativity and associativity
+            yield lambda: add((op, None, b, a))
+            for inner in list(self.classes[self.find(a)]):
+                if inner[0] == op:
+                    _, _, x, y = inner
+                    yield lambda x=x, y=y: add((op, None, x, add((op, None, y, b))))
+
+            ca, cb = constant(a), constant(b)
+            identity = 0 if op == 'Add' else 1
+            if cb is not None and cb == identity:
+                yield lambda: a
+            if ca is not None and cb is not None:
+                value = ca + cb if op == 'Add' else ca * cb
+                yield lambda: self._number(value)
+
+        if op == 'Multiply':
+            _, _, a, b = enode
+            if constant(b) == 0:
+                yield lambda: self._number(0)
+
+            ## Distributivity
+            for inner in list(self.classes[self.find(b)]):
+                if inner[0] == 'Add':
+                    _, _, x, y = inner
+                    yield lambda x=x, y=y: add(('Add', None, add(('Multiply', None, a, x)), add(('Multiply', None, a, y))))
+
+            ## Power laws, a * a -> a ** 2, a ** m * a ** n -> a ** (m + n)
+            if self.find(a) == self.find(b):
+                yield lambda: add(('Power', None, a, self._number(2)))
+            for left in self._powers(a):
+                for right in self._powers(b):
+                    if self.find(left[0]) == self.find(right[0]):
+                        yield lambda l=left, r=right: add(('Power', None, l[0], self._arithmetic('Add', l[1], r[1])))
+
+            ## a * b ** -1 -> a / b
+            for inner in list(self.classes[self.find(b)]):
+                if inner[0] == 'Power' and constant(inner[3]) == -1:
+                    yield lambda d=inner[2]: add(('Divide', None, a, d))
+
+        elif op == 'Add':
+            _, _, a, b = enode
+            ## Factoring, a * x + a * y -> a * (x + y)
+            for left in list(self.classes[self.find(a)]):
+                if left[0] != 'Multiply':
+                    continue
+                for right in list(self.classes[self.find(b)]):
+                    if right[0] == 'Multiply' and self.find(left[2]) == self.find(right[2]):
+                        yield lambda l=left, r=right: add(('Multiply', None, l[2], add(('Add', None, l[3], r[3]))))
+
+            ## x + x -> 2 * x
+            if self.find(a) == self.find(b):
+                yield lambda: add(('Multiply', None, self._number(2), a))
+
+        elif op == 'Power':
+            _, _, a, n = enode
+            cn = constant(n)
+            ca = constant(a)
+
+            if cn is not None and cn == 1:
+                yield lambda: a
+            if cn is not None and cn == 0:
+                yield lambda: self._number(1)
+            if ca is not None and cn is not None and self._can_fold_power(ca, cn):
+                yield lambda: self._number(ca ** cn)
+
+            if cn is not None and _is_integer(cn):
+                for inner in list(self.classes[self.find(a)]):
+                    ## (a ** m) ** n -> a ** (m * n)
+                    if inner[0] == 'Power':
+                        yield lambda i=inner: add(('Power', None, i[2], self._arithmetic('Multiply', i[3], n)))
+                    ## (a * b) ** n -> a ** n * b ** n
+                    elif inner[0] == 'Multiply':
+                        yield lambda i=inner: add(('Multiply', None, add(('Power', None, i[2], n)), add(('Power', None, i[3], n))))
+
+        elif op == 'Divide':
+            _, _, a, b = enode
+            if self.find(a) == self.find(b):
+                yield lambda: self._number(1)
+            if constant(b) is not None and constant(b) == 1:
+                yield lambda: a
+
+            ca, cb = constant(a), constant(b)
+            if ca is not None and cb and _is_integer(ca) and _is_integer(cb) and ca % cb == 0:
+                yield lambda: self._number(type(ca)(ca // cb))
+
+            ## a / b -> a * b ** -1, lets power laws cancel factors
+            yield lambda: add(('Multiply', None, a, add(('Power', None, b, self._number(-1)))))
+
+            ## Cancellation, (c * x) / (c * y) -> x / y
+            for top in list(self.classes[self.find(a)]):
+                if top[0] != 'Multiply':
+                    continue
+                if self.find(top[2]) == self.find(b):
+                    yield lambda t=top: t[3]
+                for bottom in list(self.classes[self.find(b)]):
+                    if bottom[0] == 'Multiply' and self.find(top[2]) == self.find(bottom[2]):
+                        yield lambda t=top, d=bottom: add(('Divide', None, t[3], d[3]))
+
+    def _arithmetic(self, op: str, a: int, b: int) -> int:
+        ## Exponents are folded straight away, stopping chains such as x ** (1 + 1 + ...)
+        ca, cb = self.constant(a), self.constant(b)
+        if ca is not None and cb is not None:
+            return self._number(ca + cb if op == 'Add' else ca * cb)
+        return self.add((op, None, a, b))
+
+    def _powers(self, cid: int) -> List[Tuple[int, int]]:
+        ## Every way of writing an e-class as base ** exponent, including itself ** 1
+        powers = [(cid, None)]
+        for enode in self.classes[self.find(cid)]:
+            if enode[0] == 'Power':
+                powers.append((enode[2], enode[3]))
+        return [(b, e if e is not None else self._number(1)) for b, e in powers]
+
+    @staticmethod
+    def _can_fold_power(base: Any, power: Any) -> bool:
+        if isinstance(base, float) or isinstance(power, float):
+            return isinstance(base, numbers.Real) and (base > 0 or _is_integer(power))
+        return _is_integer(power) and 0 <= power <= 64
+
+    def saturate(self, iterations: int = 8) -> bool:
+        ''' Applies the rules until nothing new is learnt, the node limit is reached
+        or the number of iterations runs out. Returns whether the graph was saturated.
+        '''
+        for _ in range(iterations):
+            changed = False
+            matches = [(cid, enode) for cid, nodes in list(self.classes.items()) for enode in list(nodes)]
+
+            for cid, enode in matches:
+                for rule in self._rules(cid, enode):
+                    if len(self) >= self.node_limit:
+                        self.rebuild()
+                        return False
+                    changed |= self.union(cid, rule())
+
+            self.rebuild()
+            if not changed:
+                return True
+        return False
+
+    ''' Extraction '''
+
+    def _name(self, enode: ENode) -> List[str]:
+        op = enode[0]
+        if op == 'Function':
+            cls = enode[1][0]
+            return [cls.__name__, 'Function']
+        elif op == 'Operation':
+            return [enode[1].__name__, 'Operation']
+        return [op]
+
+    def _cost(self, enode: ENode, cost: Dict[str, float]) -> float:
+        for name in self._name(enode):
+            if name in cost:
+                return cost[name]
+        return 1
+
+    def extract(self, cid: int, cost: Optional[Union[Dict[str, float], Callable[[str], float]]] = None) -> Any:
+        ''' Returns the cheapest tree in an e-class as a cake node '''
+        if cost is None:
+            cost = DEFAULT_COSTS
+        elif callable(cost):
+            cost = _CallableCost(cost)
+
+        best: Dict[int, Tuple[float, ENode]] = {}
+        changed = True
+        while changed:
+            changed = False
+            for eid, nodes in self.classes.items():
+                for enode in nodes:
+                    children = [self.find(c) for c in enode[2:]]
+                    if any(c not in best for c in children):
+                        continue
+
+                    total = self._cost(enode, cost) + sum(best[c][0] for c in children)
+                    if eid not in best or total < best[eid][0]:
+                        best[eid] = (total, enode)
+                        changed = True
+
+        result = self._build(self.find(cid), best, {})
+        if isinstance(result, Operation):
+            return cake.Expression(result)
+        return result
+
+    def _build(self, cid: int, best: Dict[int, Tuple[float, ENode]], built: Dict[int, Any]) -> Any:
+        if cid in built:
+            return built[cid]
+
+        enode = best[cid][1]
+        op = enode[0]
+        children = [self._build(self.find(c), best, built) for c in enode[2:]]
+
+        if op == 'Number':
+            node = cake.Number.convert(enode[1])
+        elif op == 'Variable':
+            node = cake.Variable(enode[1])
+        elif op == 'Constant':
+            node = enode[1]()
+        elif op == 'Function':
+            node = copy.copy(self.templates[enode[1]])
+            node.parameter = cake.Expression(children[0]) if isinstance(children[0], Operation) else children[0]
+            node.coefficient = 1
+            node.power = 1
+        elif op == 'Operation':
+            node = enode[1](*children)
+        elif op == 'Multiply':
+            node = _multiply(*children)
+        elif op == 'Power':
+            node = _power(*children)
+        elif op == 'Add':
+            node = Add(*children)
+        else:
+            node = Divide(*children)
+
+        built[cid] = node
+        return node
+
+
+class _CallableCost(dict):
+    ## Looks costs up using a function, caching the results
+    def __init__(self, func: Callable[[str], float]) -> None:
+        super().__init__()
+        self.func = func
+
+    def __contains__(self, name: object) -> bool:
+        if not dict.__contains__(self, name):
+            value = self.func(name)
+            if value is None:
+                return False
+            self[name] = value
+        return True
+
+
+def _monomial(node: Any) -> bool:
+    return isinstance(node, (numbers.Number, cake.VariableGroup)) or (
+        isinstance(node, cake.Variable) and not getattr(node, '_to_type', None)
+    )
+
+
+def _multiply(a: Any, b: Any) -> Any:
+    ## Products are built without distributing, numbers become coefficients where possible
+    if _monomial(a) and _monomial(b):
+        return a * b
+    elif isinstance(a, numbers.Number) and isinstance(b, cake.Function):
+        a, b = b, a
+    if isinstance(a, cake.Function) and isinstance(b, numbers.Number):
+        node = copy.copy(a)
+        node.coefficient = a.coefficient * b
+        return node
+    return Multiply(a, b)
+
+
+def _is_one(value: Any) -> bool:
+    value = _python(value)
+    return isinstance(value, numbers.Number) and value == 1
+
+
+def _can_fold(base: Any, power: Any) -> bool:
+    ## (c * b ** m) ** n == c ** n * b ** (m * n) only for integer n or positive bases,
+    ## bases without a coefficient or power have nothing to fold
+    if _is_integer(_python(power)) or cake.assumptions.is_positive(base):
+        return True
+    return _is_one(getattr(base, 'coefficient', None)) and _is_one(getattr(base, 'power', None))
+
+
+def _power(base: Any, power: Any) -> Any:
+    if isinstance(power, numbers.Number) and _can_fold(base, power):
+        if isinstance(base, cake.Variable) and not getattr(base, '_to_type', None):
+            return base ** power
+        elif isinstance(base, cake.Function):
+            node = copy.copy(base)
+            node.power = base.power * power
+            return node
+    return Power(base, power)
+
+
+def optimize(node: Any, cost: Optional[Union[Dict[str, float], Callable[[str], float]]] = None, *,
+             iterations: int = 8, node_limit: int = 5000) -> Any:
+    ''' Finds a cheaper equivalent form of an expression using equality saturation.
+
+    The expression is added to an :class:`EGraph`, which is saturated with algebraic rules
+    and the cheapest tree is extracted from it.
+    Rules include commutativity, associativity, distributivity and factoring,
+    power laws, cancelling divisions, identities and folding numbers.
+
+    .. code-block:: py
+
+        >>> optimize(Sin(x) * y + Sin(x) * z)
+        Expression((y + z) * Sin(x))
+        >>> optimize(x * x * x, cost={'Power': 1, 'Multiply': 3})
+        x**3
+
+    Parameters
+    ----------
+    node: Any[Like[cake.BasicNode]]
+        Expression to optimize
+    cost: Optional[Union[Dict[:class:`str`, :class:`float`], Callable[[:class:`str`], :class:`float`]]]
+        Cost of each type of node, keyed by names such as ``'Add'``, ``'Power'`` or a function name like ``'Sin'``.
+        Functions fall back to ``'Function'`` and other operations to ``'Operation'``, unknown names cost 1.
+        Defaults to :data:`DEFAULT_COSTS`.
+    iterations: :class:`int`
+        Maximum number of times the rules are applied to the whole graph
+    node_limit: :class:`int`
+        Maximum size of the graph, stops rules from growing it endlessly
+    '''
+    graph = EGraph(node_limit=node_limit)
+    root = graph.add_node(node)
+    graph.saturate(iterations)
+    return graph.extract(root, cost)
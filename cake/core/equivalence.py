@@ -0,0 +1,233 @@
+## Probabilistic equivalence of expressions
+##
+## Rather than simplifying both sides into a canonical form,
+## both expressions are evaluated at the same random points.
+##
+## Expressions built from integers, variables, +, -, *, / and integer powers
+## are evaluated exactly over the integers modulo a large prime,
+## 2 different rational functions of degree d agree at a random point with probability at most d / P.
+## Anything else, such as functions, falls back to floating point evaluation at points either side of 0,
+## which is only a heuristic.
+##
+from __future__ import annotations
+from typing import Any, Dict, Optional, Set
+import cmath
+import numbers
+import random
+
+from .expressions.traversal import Visitor, preorder
+from .expressions.divide import Divide
+import cake
+
+## Mersenne prime 2**61 - 1
+PRIME = (1 << 61) - 1
+
+## Random points used for floating point evaluation are at least this far from 0
+POLE_DISTANCE = 0.05
+
+
+class _Unsupported(Exception):
+    ''' Raised when a node can't be evaluated exactly '''
+
+
+def _integer(value: Any) -> int:
+    value = getattr(value, 'value', value)
+
+    if isinstance(value, bool) or not isinstance(value, numbers.Real):
+        raise _Unsupported
+    elif isinstance(value, numbers.Integral):
+        return int(value)
+    elif isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise _Unsupported
+
+
+class _ModularEvaluator(Visitor):
+    ## Evaluates a tree over the integers modulo PRIME
+
+    def __init__(self, point: Dict[str, int]) -> None:
+        super().__init__()
+        self.point = point
+
+    def _value(self, node: Any) -> int:
+        if isinstance(node, numbers.Number):
+            return _integer(node) % PRIME
+        return self.visit(node)
+
+    def _power(self, base: int, power: Any) -> int:
+        power = _integer(power)
+        if power < 0:
+            if not base:
+                raise ZeroDivisionError
+            return pow(pow(base, PRIME - 2, PRIME), -power, PRIME)
+        return pow(base, power, PRIME)
+
+    def visit_Number(self, node, results) -> int:
+        return _integer(node) % PRIME
+
+    def visit_Variable(self, node, results) -> int:
+        if getattr(node, '_to_type', None):
+            raise _Unsupported
+
+        value = self._power(self.point[node.representation], node.power)
+        return self._value(node.coefficient) * value % PRIME
+
+    def visit_VariableGroup(self, node, results) -> int:
+        value = self._value(node.coefficient)
+        for group in node.groups:
+            value = value * self.visit_Variable(group, []) % PRIME
+        return value
+
+    def visit_RaisedVariable(self, node, results) -> int:
+        return self._power(results[0], node.power)
+
+    def visit_Expression(self, node, results) -> int:
+        return results[0]
+
+    def visit_Add(self, node, results) -> int:
+        return sum(results) % PRIME
+
+    def visit_Multiply(self, node, results) -> int:
+        value = 1
+        for result in results:
+            value = value * result % PRIME
+        return value
+
+    def visit_Power(self, node, results) -> int:
+        return self._power(results[0], node.power)
+
+    def visit_Divide(self, node, results) -> int:
+        ## FloorDiv and Modulo can't be evaluated in a field
+        if type(node) is not Divide:
+            raise _Unsupported
+        return results[0] * self._power(results[1], -1) % PRIME
+
+    def generic_visit(self, node, results) -> int:
+        if isinstance(node, numbers.Number):
+            return _integer(node) % PRIME
+        raise _Unsupported
+
+
+def _symbols(*nodes: Any) -> Set[str]:
+    symbols = set()
+    stack = list(nodes)
+
+    while stack:
+        for node in preorder(stack.pop()):
+            if isinstance(node, cake.VariableGroup):
+                stack.append(node.coefficient)
+                symbols.update(i.representation for i in node.groups)
+            elif isinstance(node, cake.Variable):
+                stack.extend((node.coefficient, node.power))
+                if not getattr(node, '_to_type', None):
+                    symbols.add(node.representation)
+    return symbols
+
+
+def _modular(node: Any, point: Dict[str, int]) -> int:
+    if isinstance(node, numbers.Number):
+        return _integer(node) % PRIME
+    return _ModularEvaluator(point).visit(node)
+
+
+def _numeric(node: Any, point: Dict[str, float]) -> Optional[complex]:
+    try:
+        ## Roots are reduced to their numerical value rather than their simplest form
+        if isinstance(node, cake.Expression):
+            value = node.solve(true_value=True, **point)
+        elif hasattr(node, 'true_value'):
+            value = node.true_value(**point)
+        else:
+            value = cake.utils.solve_if_possible(node, **point)
+    except (ArithmeticError, ValueError):
+        return None
+
+    value = getattr(value, 'value', value)
+    if isinstance(value, bool) or not isinstance(value, numbers.Number):
+        return None
+    return complex(value)
+
+
+def probably_equal(e1: Any, e2: Any, /, trials: int = 8, *,
+                   seed: Optional[int] = None,
+                   rel_tol: float = 1e-9) -> bool:
+    ''' Checks whether 2 expressions are equivalent by evaluating both at random points,
+    without simplifying either of them.
+
+    Expressions made up of integers, variables, ``+``, ``-``, ``*``, ``/`` and integer powers
+    are evaluated exactly over the integers modulo a large prime,
+    a ``False`` result is always correct and a ``True`` result is wrong
+    with a probability of at most ``(degree / 2**61) ** trials``.
+
+    Any other expression, such as one containing functions or constants,
+    is evaluated using floating point numbers at points between -2 and 2 and compared within ``rel_tol``.
+    This is only a heuristic: expressions which differ only outside of that range, or by less than ``rel_tol``,
+    are reported as equal.
+
+    .. code-block:: py
+
+        >>> x, y = Variable.many('x', 'y')
+        >>> probably_equal((x + y) ** 2, x ** 2 + 2 * x * y + y ** 2)
+        True
+        >>> probably_equal((x + 1) / (x + 1), 1)
+        True
+        >>> probably_equal(Sin(x) * 2, Sin(x) + Sin(x))
+        True
+        >>> probably_equal(x * y, x + y)
+        False
+
+    Parameters
+    ----------
+    e1: Any[Like[cake.BasicNode]]
+        First expression to compare
+    e2: Any[Like[cake.BasicNode]]
+        Second expression to compare
+    trials: :class:`int`
+        Number of random points to evaluate the expressions at
+    seed: Optional[:class:`int`]
+        Seed for the random points, making results reproducible
+    rel_tol: :class:`float`
+        Relative tolerance used when falling back to floating point evaluation
+    '''
+    rng = random.Random(seed)
+    symbols = sorted(_symbols(e1, e2))
+    attempts = trials * 4
+
+    try:
+        passed = 0
+        while passed < trials and attempts:
+            attempts -= 1
+            point = {s: rng.randrange(1, PRIME) for s in symbols}
+
+            try:
+                if _modular(e1, point) != _modular(e2, point):
+                    return False
+            except ZeroDivisionError:
+                ## Hit a pole, try another point
+                continue
+            passed += 1
+        return passed > 0
+    except _Unsupported:
+        pass
+
+    attempts = trials * 4
+    passed = 0
+    while passed < trials and attempts:
+        attempts -= 1
+        ## Negative values are included so identities such as Sqrt(x ** 2) == x are caught,
+        ## points close to 0 are skipped as it is a common pole
+        point = {s: rng.uniform(-2, 2) for s in symbols}
+        if any(abs(v) < POLE_DISTANCE for v in point.values()):
+            continue
+
+        v1, v2 = _numeric(e1, point), _numeric(e2, point)
+        if v1 is None or v2 is None or not (cmath.isfinite(v1) and cmath.isfinite(v2)):
+            continue
+        elif max(abs(v1), abs(v2)) > 1e12:
+            ## Close to some other pole, where rounding errors are too large to compare
+            continue
+
+        if not cmath.isclose(v1, v2, rel_tol=rel_tol, abs_tol=rel_tol):
+            return False
+        passed += 1
+    return passed > 0
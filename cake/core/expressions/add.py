@@ -13,7 +13,10 @@
 ##
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from typing import Any, Iterable
 from cake.basic import BasicNode
+from ..sparse import SparsePolynomial
+from cake import options
 import cake
 
 
@@ -32,8 +35,17 @@ class ExpressionNode(ABC, object):
 
         self.__post_init__()
 
+    separator: str = None
+    ''' String placed between nodes when rendered, operations without one are rendered as ``Name(x, y)`` '''
+
+    parenthesize: tuple = ()
+    ''' Types of nodes which are wrapped in brackets when rendered as one of the nodes '''
+
+    commutative: bool = False
+    ''' Whether the nodes can be reordered without changing the result '''
+
     def __repr__(self) -> str:
-        return f'{self.__class__.__name__}({", ".join(map(str, self.nodes))})'
+        return cake.Renderer().render_call(self)
 
     @abstractmethod
     def __post_init__(self) -> None:
@@ -46,8 +58,20 @@ class Operation(ExpressionNode):
     Use :class:`Expression` to assist in this.
     '''
 
+    def __str__(self) -> str:
+        return cake.Renderer().render(self)
+
     def __post_init__(self) -> None:
         self.flatten()
+
+        if options.immutable_nodes:
+            self.nodes = tuple(self.nodes)
+
+    def with_nodes(self, *nodes: BasicNode) -> Operation:
+        ''' Returns a new operation of the same type using different nodes,
+        used when rewriting expression trees.
+        '''
+        return self.__class__(*nodes)
     
     @abstractmethod
     def flatten(self) -> None:
@@ -58,8 +82,23 @@ class Operation(ExpressionNode):
 
 
 class Add(Operation):
-    def __str__(self) -> str:
-        return ' + '.join(map(str, self.nodes))
+    separator = ' + '
+    commutative = True
+
+    @classmethod
+    def from_iterable(cls, iterable: Iterable[Any]) -> Add:
+        ''' Creates an :class:`Add` from any number of terms, which are flattened exactly once.
+        Prefer this over :py:func:`sum` or repeated ``+=`` which re-flatten on every step.
+
+        .. code-block:: py
+
+            >>> Add.from_iterable(Variable(f'x{i}') for i in range(3))
+            Add(x0, x1, x2)
+        '''
+        nodes = list(iterable)
+        while len(nodes) < 2:
+            nodes.append(0)
+        return cls(*nodes)
 
     def flatten(self) -> None:
         cleaned_nodes = []
@@ -76,28 +115,52 @@ class Add(Operation):
             else:
                 nodes.append(node)
 
+        ## Monomials are combined through a sparse polynomial keyed by their exponents,
+        ## slots map each key to the position of the first node seen with it.
+        poly = SparsePolynomial()
+        slots = {}
+        merged = set()
+        ## Variables which aren't monomials, such as constants, are compared with each other
+        similar = []
+
         for node in nodes:
             if not node:
                 continue
 
-            for index, cleaned_node in enumerate(cleaned_nodes):
-                if isinstance(node, cake.Number) and isinstance(cleaned_node, cake.Number):
-                    cleaned_nodes[index] = node + cleaned_nodes[index]
-                    break
-
-                if isinstance(node, cake.Variable) and isinstance(cleaned_node, cake.Variable):
-                    similar = cake.Variable.is_similar(node, cleaned_node)
-                    if similar:
-                        cleaned_nodes[index] = cleaned_nodes[index] + node
-                        break
+            key = poly.add_node(node)
+            if key is not None:
+                if key in slots:
+                    merged.add(key)
+                else:
+                    slots[key] = len(cleaned_nodes)
+                    cleaned_nodes.append(node)
+                continue
 
-                if isinstance(node, cake.VariableGroup) and isinstance(cleaned_node, cake.VariableGroup):
-                    similar = cake.VariableGroup.is_similar(node, cleaned_node)
-                    if similar:
-                        cleaned_nodes[index] = cleaned_nodes[index] + node
-                        break
+            if isinstance(node, cake.Variable):
+                check = cake.Variable
+            elif isinstance(node, cake.VariableGroup):
+                check = cake.VariableGroup
+            else:
+                cleaned_nodes.append(node)
+                continue
 
+            for index in similar:
+                cleaned_node = cleaned_nodes[index]
+                if isinstance(cleaned_node, check) and check.is_similar(node, cleaned_node):
+                    cleaned_nodes[index] = cleaned_node + node
+                    break
             else:
+                similar.append(len(cleaned_nodes))
                 cleaned_nodes.append(node)
 
-        self.nodes = cleaned_nodes
+        removed = set()
+        for key in merged:
+            index = slots[key]
+            if poly.terms[key] == 0:
+                removed.add(index)
+            else:
+                cleaned_nodes[index] = poly.node(key)
+
+        if removed:
+            cleaned_nodes = [n for i, n in enumerate(cleaned_nodes) if i not in removed]
+        self.nodes = cleaned_nodes or [cake.Integral(0)]
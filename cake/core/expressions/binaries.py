@@ -1,27 +1,95 @@
 ## All the odd few binary operators
+##
+## Integers, including variables assumed to be integers, simplify with their identities
+## x << 0 -> x, x & 0 -> 0, x | x -> x, x ^ x -> 0
+##
+from __future__ import annotations
+from typing import Any, Optional
+import numbers
+
 from .add import Operation
+from .structure import same
+import cake
+
+
+def _convert(node: Any) -> Any:
+    if isinstance(node, str):
+        return cake.Variable(node)
+    elif isinstance(node, numbers.Number) and not isinstance(node, cake.Number):
+        return cake.Number.convert(node)
+    return node
+
+
+def _is_zero(node: Any) -> bool:
+    value = getattr(node, 'value', node)
+    return isinstance(value, numbers.Number) and not isinstance(value, bool) and value == 0
+
+
+class BinaryOperation(Operation):
+    ''' Base class for the binary operators, which only take 2 nodes.
+    Operations between integers are simplified using :meth:`BinaryOperation.simplify` when created.
+    '''
+    def __new__(cls, x: Any = None, y: Any = None, /, *nodes: Any) -> Any:
+        if x is not None and y is not None and not nodes:
+            x, y = _convert(x), _convert(y)
+            if cake.assumptions.is_integer(x) and cake.assumptions.is_integer(y):
+                result = cls.simplify(x, y)
+                if result is not None:
+                    return result
+        return super().__new__(cls)
+
+    @classmethod
+    def simplify(cls, x: Any, y: Any) -> Optional[Any]:
+        ''' Returns a simpler node for ``x ? y`` where both are integers, or ``None`` '''
+        return None
+
+    def flatten(self) -> None:
+        assert len(self.nodes) == 2, f'Invalid {self.__class__.__name__} op given, must only contain 2 nodes'
 
 
-class LeftShift(Operation):
-    def __flatten__(self) -> None:
-        assert len(self.nodes) == 2, 'Invalid shift op given, must only contain 2 nodes'
+class LeftShift(BinaryOperation):
+    @classmethod
+    def simplify(cls, x: Any, y: Any) -> Optional[Any]:
+        if _is_zero(y):
+            return x
+        return None
 
 
-class RightShift(Operation):
-    def __flatten__(self) -> None:
-        assert len(self.nodes) == 2, 'Invalid shift op given, must only contain 2 nodes'
+class RightShift(BinaryOperation):
+    @classmethod
+    def simplify(cls, x: Any, y: Any) -> Optional[Any]:
+        if _is_zero(y) or _is_zero(x):
+            return x
+        return None
 
 
-class And(Operation):
-    def __flatten__(self) -> None:
-        assert len(self.nodes) == 2, 'Invalid and op given, must only contain 2 nodes'
+class And(BinaryOperation):
+    @classmethod
+    def simplify(cls, x: Any, y: Any) -> Optional[Any]:
+        if _is_zero(x) or _is_zero(y):
+            return cake.Integral(0)
+        elif same(x, y):
+            return x
+        return None
 
 
-class Xor(Operation):
-    def __flatten__(self) -> None:
-        assert len(self.nodes) == 2, 'Invalid xor op given, must only contain 2 nodes'
+class Xor(BinaryOperation):
+    @classmethod
+    def simplify(cls, x: Any, y: Any) -> Optional[Any]:
+        if _is_zero(y):
+            return x
+        elif _is_zero(x):
+            return y
+        elif same(x, y):
+            return cake.Integral(0)
+        return None
 
 
-class Or(Operation):
-    def __flatten__(self) -> None:
-        assert len(self.nodes) == 2, 'Invalid Or op given, must only contain 2 nodes'
+class Or(BinaryOperation):
+    @classmethod
+    def simplify(cls, x: Any, y: Any) -> Optional[Any]:
+        if _is_zero(y) or same(x, y):
+            return x
+        elif _is_zero(x):
+            return y
+        return None
@@ -0,0 +1,140 @@
+## Mutable accumulator for building large sums
+##
+## builder = ExpressionBuilder()
+## for ...: builder += term     -> terms are indexed, nothing is flattened
+## builder.build()              -> Expression(Add(...)), flattened once
+##
+from __future__ import annotations
+from typing import Any, Iterable, List
+import numbers
+
+from cake.basic import BasicNode
+from ..sparse import SparsePolynomial
+from .add import Add
+import cake
+
+
+class ExpressionBuilder(object):
+    ''' A mutable accumulator of terms which can be frozen into an :class:`Expression` when needed.
+    Unlike ``expr += term``, which creates a new :class:`Add` and re-flattens every term each time,
+    adding a term to a builder takes amortized constant time, like terms are combined as they arrive.
+
+    .. code-block:: py
+
+        >>> builder = ExpressionBuilder()
+        >>> for i in range(3):
+        ...     builder += Variable('x', power=i + 1)
+        >>> builder += Variable('x')
+        >>> builder.build()
+        Expression(2x + x**2 + x**3)
+
+    Parameters
+    ----------
+    *terms: Any[Like[cake.BasicNode]]
+        Terms to start the builder with,
+        expressions which are sums are split into their terms.
+    '''
+    def __init__(self, *terms: Any) -> None:
+        self._poly = SparsePolynomial()
+        self._order: List[Any] = []
+        self._seen = set()
+
+        self.extend(terms)
+
+    def _convert(self, term: Any) -> Any:
+        if isinstance(term, BasicNode):
+            return term
+        elif isinstance(term, str):
+            return cake.Variable(term)
+        return cake.Number.convert(term)
+
+    def add(self, term: Any) -> ExpressionBuilder:
+        ''' Adds a term onto the builder
+
+        Parameters
+        ----------
+        term: Any[Like[cake.BasicNode]]
+            Term to add, sums are split into their terms.
+        '''
+        node = getattr(term, 'exp', term)
+        if isinstance(node, Add):
+            return self.extend(node.nodes)
+
+        term = self._convert(term)
+        key = self._poly.add_node(term)
+
+        if key is None:
+            self._order.append(term)
+        elif key not in self._seen:
+            self._seen.add(key)
+            self._order.append(key)
+        return self
+
+    def extend(self, terms: Iterable[Any]) -> ExpressionBuilder:
+        ''' Adds each term from an iterable onto the builder '''
+        for term in terms:
+            self.add(term)
+        return self
+
+    def subtract(self, term: Any) -> ExpressionBuilder:
+        ''' Subtracts a term from the builder '''
+        return self.add(-self._convert(term))
+
+    def scale(self, factor: Any) -> ExpressionBuilder:
+        ''' Multiplies every term in the builder by a numerical factor '''
+        terms = self._poly.terms
+        for key in terms:
+            terms[key] = terms[key] * factor
+
+        self._order = [i if isinstance(i, tuple) else i * factor for i in self._order]
+        return self
+
+    def clear(self) -> None:
+        ''' Removes all terms from the builder '''
+        self._poly = SparsePolynomial()
+        self._order.clear()
+        self._seen.clear()
+
+    def nodes(self) -> List[Any]:
+        ''' Returns the combined terms of the builder, terms which have cancelled out are skipped '''
+        nodes = []
+        for item in self._order:
+            if not isinstance(item, tuple):
+                nodes.append(item)
+            elif self._poly.terms[item] != 0:
+                nodes.append(self._poly.node(item))
+        return nodes
+
+    def build(self) -> Any:
+        ''' Freezes the builder into an :class:`Expression`,
+        a single term or number is returned if that is all which remains.
+
+        The builder is left untouched and can continue to be used.
+        '''
+        nodes = self.nodes()
+        if not nodes:
+            return cake.Integral(0)
+        elif len(nodes) == 1:
+            return nodes[0]
+        return cake.Expression(Add(*nodes))
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __repr__(self) -> str:
+        return f'ExpressionBuilder({len(self)} terms)'
+
+    def __iadd__(self, other: Any) -> ExpressionBuilder:
+        return self.add(other)
+
+    def __isub__(self, other: Any) -> ExpressionBuilder:
+        return self.subtract(other)
+
+    def __imul__(self, other: Any) -> ExpressionBuilder:
+        if isinstance(other, numbers.Number):
+            return self.scale(other)
+
+        ## Non numerical factors need the whole sum, rebuild from the product
+        product = self.build() * other
+        self.clear()
+        return self.add(product)
@@ -6,7 +6,7 @@ from cake import (
     Comparity,
     ComparitySymbol
 )
-from typing import Any, Union
+from typing import Any, Iterator, Optional, TextIO, Union
 
 
 from .add import (
@@ -16,12 +16,18 @@ from .add import (
 from .divide import Divide, FloorDiv, Modulo
 from .multiply import Multiply, Power
 from .binaries import LeftShift, RightShift, And, Xor, Or
+from ..sparse import SparsePolynomial
+from .traversal import preorder, postorder
+from .substitution import Substitution
+from .render import Renderer
+from .expand import expand
+from cake import options
 
 OtherType = Union[OtherType, Operation]
 
 
 '''Meths implemented
-__iter__, __next__,
+__iter__,
 __repr__, __str__,
 __add__, __radd__, __iadd__
 __sub__, __rsub__, __isub__
@@ -74,7 +80,16 @@ class Expression(BasicExpression):
             x + 5
     '''
     def __init__(self, starting_op: Operation) -> None:
-        self.exp = starting_op
+        self.exp = starting_op.exp if isinstance(starting_op, Expression) else starting_op
+
+    @classmethod
+    def wrap(cls, node: Any) -> Any:
+        ''' Wraps an operation in an expression, any other node is returned as it is.
+        Used for operations which may simplify into a single node when created, such as ``(2x) // 2``.
+        '''
+        if isinstance(node, Operation):
+            return cls(node)
+        return node
 
     def _try_get_child_value(self, child: Any, true_value: bool, **kwds) -> Any:
         if hasattr(child, 'solve'):
@@ -99,7 +114,7 @@ class Expression(BasicExpression):
         return r
 
     def _multiply(self, node: Multiply, *, true_value: bool = False, **kwds) -> Any:
-        r = self._try_get_child_value(node.nodes[0], **kwds)
+        r = self._try_get_child_value(node.nodes[0], true_value, **kwds)
         for child in node.nodes[1:]:
             try:
                 r *= self._try_get_child_value(child, true_value, **kwds)
@@ -180,12 +195,13 @@ class Expression(BasicExpression):
             return self._multiply
         elif isinstance(node, Power):
             return self._power
-        elif isinstance(node, Divide):
-            return self._truediv
+        ## FloorDiv and Modulo subclass Divide, so are checked first
         elif isinstance(node, FloorDiv):
             return self._floordiv
         elif isinstance(node, Modulo):
             return self._modulo
+        elif isinstance(node, Divide):
+            return self._truediv
         elif isinstance(node, LeftShift):
             return self._leftshift
         elif isinstance(node, RightShift):
@@ -232,11 +248,46 @@ class Expression(BasicExpression):
             return Expression(r)
         return r
     
+    def expand(self) -> Any:
+        ''' Distributes every product in the expression over the sums it contains,
+        products of sums are only kept while ``cake.options.factored_products`` is enabled.
+
+        .. code-block:: py
+
+            >>> with cake.options.using(factored_products=True):
+            ...     f = (a + b) * (c + d)
+            >>> f
+            Expression((a + b) * (c + d))
+            >>> f.solve(a=1, b=2, c=3, d=4)
+            Integral(21)
+            >>> f.expand()
+            Expression(ac + ad + bc + bd)
+        '''
+        return expand(self)
+
     def __repr__(self) -> str:
-        return f'Expression({str(self.exp)})'
+        return f'Expression({Renderer().render(self.exp)})'
 
     def __str__(self) -> str:
-        return str(self.exp)
+        return Renderer().render(self.exp)
+
+    def render(self, file: Optional[TextIO] = None, *, max_chars: Optional[int] = None) -> Optional[str]:
+        ''' Renders the expression as a string, streaming the output into a file like object.
+        Useful for logging large expressions without building the whole string.
+
+        .. code-block:: py
+
+            >>> expr.render(sys.stderr, max_chars=20)
+            x0 + x1 + x2 + x3 + ...
+
+        Parameters
+        ----------
+        file: Optional[TextIO]
+            File like object to write to, if not given the rendered string is returned.
+        max_chars: Optional[:class:`int`]
+            Maximum number of characters to write before truncating the output with ``...``
+        '''
+        return Renderer(file, max_chars=max_chars).render(self.exp)
     
     ''' Numerical Methods '''
     
@@ -258,16 +309,26 @@ class Expression(BasicExpression):
         if (x := other == 1) and not isinstance(x, Comparity):
             return Expression(self.exp) # Reduces messy expressions
 
-        if isinstance(self.exp, Divide):
+        if type(self.exp) is Divide:
 
-            if isinstance(other, Divide):
-                return Expression(Divide(self.exp.nodes[0] * other.nodes[0], self.exp.nodes[1] * other.nodes[0]))
-            elif isinstance(other, Expression) and isinstance(other.exp, Divide):
-                return Expression(Divide(self.exp.nodes[0] * other.exp.nodes[0], self.exp.nodes[1] * other.exp.nodes[0]))
+            if type(other) is Divide:
+                return Expression.wrap(Divide(self.exp.nodes[0] * other.nodes[0], self.exp.nodes[1] * other.nodes[1]))
+            elif isinstance(other, Expression) and type(other.exp) is Divide:
+                return Expression.wrap(Divide(self.exp.nodes[0] * other.exp.nodes[0], self.exp.nodes[1] * other.exp.nodes[1]))
 
-            return Expression(Divide(self.exp.nodes[0] * other, self.exp.nodes[1]))
+            return Expression.wrap(Divide(self.exp.nodes[0] * other, self.exp.nodes[1]))
         
         if isinstance(self.exp, Add):
+            if options.factored_products and isinstance(getattr(other, 'exp', None), (Add, Multiply)):
+                ## Products of sums are expanded lazily, see Expression.expand
+                return Expression(Multiply(self.exp, other.exp))
+
+            ## Sums of monomials are expanded in one pass through the sparse engine
+            left = SparsePolynomial.from_node(self.exp)
+            right = SparsePolynomial.from_node(other) if left is not None else None
+            if right is not None:
+                return (left * right).as_node()
+
             nodes = []
             for node in self.exp.nodes:
                 nodes.append(node * other)
@@ -280,76 +341,80 @@ class Expression(BasicExpression):
     __call__ = __mul__
 
     def __truediv__(self, other: OtherType) -> Expression:
-        return Expression(Divide(self.exp, other))
+        return Expression.wrap(Divide(self.exp, other))
 
     def __rtruediv__(self, other: OtherType) -> Expression:
-        return Expression(Divide(other, self.exp))
+        return Expression.wrap(Divide(other, self.exp))
 
     __itruediv__ = __truediv__
 
     def __floordiv__(self, other: OtherType) -> Expression:
-        return Expression(FloorDiv(self.exp, other))
+        return Expression.wrap(FloorDiv(self.exp, other))
 
     def __rfloordiv__(self, other: OtherType) -> Expression:
-        return Expression(FloorDiv(other, self.exp))
+        return Expression.wrap(FloorDiv(other, self.exp))
 
     __ifloordiv__ = __floordiv__
 
     def __mod__(self, other: OtherType) -> Expression:
-        return Expression(Modulo(self.exp, other))
+        return Expression.wrap(Modulo(self.exp, other))
 
     def __rmod__(self, other: OtherType) -> Expression:
-        return Expression(Modulo(other, self.exp))
+        return Expression.wrap(Modulo(other, self.exp))
 
     __imod__ = __mod__
 
     def __pow__(self, other: OtherType) -> Expression:
-        if other == 1:
+        if (x := other == 1) and not isinstance(x, Comparity):
             return Expression(self.exp)     ## Reduces messy expressions
-        return Expression(Power(self.exp, other))
+
+        ## Powers fold into simpler nodes where possible
+        r = Power(self.exp, other)
+        return Expression(r) if isinstance(r, Operation) else r
 
     def __rpow__(self, other: OtherType) -> Expression:
-        return Expression(Power(other, self.exp))
+        r = Power(other, self.exp)
+        return Expression(r) if isinstance(r, Operation) else r
 
     __ipow__ = __pow__
 
     def __lshift__(self, other: OtherType) -> Expression:
-        return Expression(LeftShift(self.exp, other))
+        return Expression.wrap(LeftShift(self.exp, other))
 
     def __rlshift__(self, other: OtherType) -> Expression:
-        return Expression(LeftShift(other, self.exp))
+        return Expression.wrap(LeftShift(other, self.exp))
 
     __ilshift__ = __lshift__
 
     def __rshift__(self, other: OtherType) -> Expression:
-        return Expression(RightShift(self.exp, other))
+        return Expression.wrap(RightShift(self.exp, other))
 
     def __rrshift__(self, other: OtherType) -> Expression:
-        return Expression(RightShift(other, self.exp))
+        return Expression.wrap(RightShift(other, self.exp))
 
     __irshift__ = __rshift__
 
     def __and__(self, other: OtherType) -> Expression:
-        return Expression(And(self.exp, other))
+        return Expression.wrap(And(self.exp, other))
 
     def __rand__(self, other: OtherType) -> Expression:
-        return Expression(And(other, self.exp))
+        return Expression.wrap(And(other, self.exp))
 
     __iand__ = __and__
 
     def __xor__(self, other: OtherType) -> Expression:
-        return Expression(Xor(self.exp, other))
+        return Expression.wrap(Xor(self.exp, other))
 
     def __rxor__(self, other: OtherType) -> Expression:
-        return Expression(Xor(other, self.exp))
+        return Expression.wrap(Xor(other, self.exp))
 
     __ixor__ = __xor__
 
     def __or__(self, other: OtherType) -> Expression:
-        return Expression(Or(self.exp, other))
+        return Expression.wrap(Or(self.exp, other))
 
     def __ror__(self, other: OtherType) -> Expression:
-        return Expression(Or(other, self.exp))
+        return Expression.wrap(Or(other, self.exp))
     
     __ior__ = __or__
 
@@ -385,5 +450,42 @@ class Expression(BasicExpression):
     def __ge__(self, other: OtherType) -> Comparity:
         return Comparity(self, other, ComparitySymbol.GREATER_OR_EQUAL_TO)
 
-    def __next__(self) -> BasicNode:
-        raise NotImplemented
+    def __iter__(self) -> Iterator[BasicNode]:
+        return iter(self.exp.nodes)
+
+    ''' TRAVERSAL '''
+
+    def subs(self, mapping: dict = None, /, **values) -> Any:
+        ''' Replaces variables in the expression with other values, in a single pass.
+        Only the parts of the tree which contain a replaced variable are rebuilt,
+        everything else is shared with the original expression.
+
+        .. code-block:: py
+
+            >>> expr = x + Sin(y)
+            >>> expr.subs({y: x + 1})
+            Expression(x + Sin(x + 1))
+            >>> expr.subs(x=2, y=z)
+            Expression(2 + Sin(z))
+
+        Parameters
+        ----------
+        mapping: Dict[Union[:class:`str`, :class:`Variable`], Any[Like[cake.BasicNode]]]
+            Variables to replace, keys may be variables or their representations.
+        **values: Any[Like[cake.BasicNode]]
+            Variables to replace by name.
+        '''
+        mapping = dict(mapping or {}, **values)
+        return Substitution(mapping).visit(self)
+
+    def preorder(self) -> Iterator[Any]:
+        ''' Yields every unique node in the expression, parents before their children.
+        See :func:`cake.preorder`
+        '''
+        return preorder(self)
+
+    def postorder(self) -> Iterator[Any]:
+        ''' Yields every unique node in the expression, children before their parents.
+        See :func:`cake.postorder`
+        '''
+        return postorder(self)
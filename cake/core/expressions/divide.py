@@ -6,14 +6,158 @@
 ##
 ## Expression(Divide(1, 3)) * 3 -> 1/3 * 3 -> 1
 ##
-from .add import Operation
-from typing import Any
+## Divide(Divide(a, b), c) -> Divide(a, b * c)
+##
+## Divide(6x**2y, 4xy) -> Divide(3x, 2)
+##
+## Divide(2x, 2) -> x
+##
+from __future__ import annotations
+from typing import Any, List, Optional, Tuple
+import math
+import numbers
+
+from ..sparse import SparsePolynomial
+from .add import Operation, Add
+from .multiply import Multiply
+from .structure import same
+import cake
+
+
+def _integer(value: Any) -> Optional[int]:
+    value = getattr(value, 'value', value)
+    if isinstance(value, bool) or not isinstance(value, numbers.Integral):
+        return None
+    return int(value)
+
+
+def _split(node: Any) -> Tuple[Optional[SparsePolynomial], List[Any]]:
+    ## Splits a side into a polynomial part and any other factors
+    node = getattr(node, 'exp', node)
+    factors = node.nodes if isinstance(node, Multiply) else [node]
+
+    poly = None
+    others = []
+    for factor in factors:
+        p = SparsePolynomial.from_node(factor)
+        if p is None:
+            others.append(factor)
+        elif poly is None:
+            poly = p
+        else:
+            poly = poly * p
+    return poly, others
+
+
+def _content(poly: SparsePolynomial) -> Tuple[int, dict]:
+    ## Greatest common factor of every term, as an integer and a mapping of symbol exponents
+    coefficient = 0
+    exponents = None
+
+    for key, c in poly.terms.items():
+        c = _integer(c)
+        coefficient = math.gcd(coefficient, c) if c is not None and coefficient is not None else None
+
+        powers = {poly.symbols[p]: e for p, e in key if isinstance(e, int) and e > 0}
+        if exponents is None:
+            exponents = powers
+        else:
+            exponents = {s: min(e, powers[s]) for s, e in exponents.items() if s in powers}
+    return coefficient or 1, exponents or {}
+
+
+def _divide(poly: SparsePolynomial, coefficient: int, exponents: dict) -> SparsePolynomial:
+    result = poly.copy()
+    result.terms = {}
+    positions = {poly.index[s]: e for s, e in exponents.items()}
+
+    for key, c in poly.terms.items():
+        key = tuple((p, e - positions.get(p, 0)) for p, e in key if e != positions.get(p, 0))
+        if coefficient == 1:
+            result.terms[key] = c
+        elif (i := _integer(c)) is not None:
+            result.terms[key] = i // coefficient
+        else:
+            ## Only integers share a common factor, so the coefficient is -1 from moving the sign
+            result.terms[key] = c * -1
+    return result
+
+
+def _build(poly: Optional[SparsePolynomial], others: List[Any]) -> Any:
+    if poly is None:
+        return cake.prod(others) if others else cake.Integral(1)
+    return cake.prod([poly.as_node(), *others])
+
+
+def _merge(numerator: Any, denominator: Any) -> Tuple[Any, Any]:
+    ## Nested fractions are merged into a single fraction, (a / b) / (c / d) -> (a * d) / (b * c)
+    top = getattr(numerator, 'exp', numerator)
+    bottom = getattr(denominator, 'exp', denominator)
+    if type(top) is Divide or type(bottom) is Divide:
+        a, b = (top.numerator, [top.denominator]) if type(top) is Divide else (numerator, [])
+        c, d = (bottom.numerator, [bottom.denominator]) if type(bottom) is Divide else (denominator, [])
+        numerator, denominator = cake.prod([a, *d]), cake.prod([*b, c])
+    return numerator, denominator
+
+
+def _cancel(numerator: Any, denominator: Any) -> Tuple[Any, Any]:
+    ## Cancels common monomial factors, integer coefficients and identical factors
+    num_poly, num_others = _split(numerator)
+    den_poly, den_others = _split(denominator)
+    changed = False
+
+    i = 0
+    while i < len(num_others):
+        for index, other in enumerate(den_others):
+            if same(num_others[i], other):
+                del num_others[i]
+                del den_others[index]
+                changed = True
+                break
+        else:
+            i += 1
+
+    if num_poly is not None and den_poly is not None and num_poly.terms and den_poly.terms:
+        if len(num_poly.terms) > 1 and (num_poly - den_poly).prune().terms == {}:
+            num_poly = den_poly = None
+            changed = True
+
+    if num_poly is not None and den_poly is not None and num_poly.terms and den_poly.terms:
+        n_co, n_exp = _content(num_poly)
+        d_co, d_exp = _content(den_poly)
+
+        coefficient = math.gcd(n_co, d_co)
+        exponents = {s: min(e, d_exp[s]) for s, e in n_exp.items() if s in d_exp}
+
+        ## Keep the sign on the numerator when the denominator is a single term
+        if len(den_poly.terms) == 1 and (c := _integer(next(iter(den_poly.terms.values())))) is not None and c < 0:
+            coefficient = -coefficient
+
+        if coefficient != 1 or exponents:
+            num_poly = _divide(num_poly, coefficient, exponents)
+            den_poly = _divide(den_poly, coefficient, exponents)
+            changed = True
+
+    if changed:
+        return _build(num_poly, num_others), _build(den_poly, den_others)
+    return numerator, denominator
+
+
+def _convert(node: Any) -> Any:
+    if isinstance(node, str):
+        return cake.Variable(node)
+    elif isinstance(node, numbers.Number) and not isinstance(node, cake.Number):
+        return cake.Number.convert(node)
+    return node
 
 
 class Divide(Operation):
     ''' The divide operation mimicks a fractional element.
     Unlike the rational class which only accepts numerical values for top and bottom values,
     the ``Divide`` op can function using Variables.
+
+    Fractions whose denominator cancels to 1 are returned as their numerator,
+    so :meth:`Expression.wrap` should be used to wrap the result.
     '''
 
     @property
@@ -24,18 +168,81 @@ class Divide(Operation):
     def denominator(self) -> Any:
         return self.nodes[1]
 
-    def __str__(self) -> str:
-        return ' / '.join(map(str, self.nodes))
+    separator = ' / '
+    parenthesize = (Add, Multiply)      ## Divide itself is added below the class
+
+    def __new__(cls, x: Any = None, y: Any = None, /, *nodes: Any) -> Any:
+        if nodes or x is None or y is None:
+            return super().__new__(cls)
+
+        numerator, denominator = _cancel(*_merge(_convert(x), _convert(y)))
+        if _integer(denominator) == 1:
+            return numerator
+
+        self = super().__new__(cls)
+        self._folded = (numerator, denominator)
+        return self
+
+    def __init__(self, x: Any, y: Any, /, *nodes: Any) -> None:
+        ## Arguments may have been simplified in __new__
+        super().__init__(*self.__dict__.get('_folded', (x, y) + nodes))
 
     def flatten(self) -> None:
         assert len(self.nodes) == 2, 'Invalid divide op given, must only contain 2 nodes'
 
+        ## Fractions created through __new__ are already simplified
+        if self.__dict__.pop('_folded', None) is None:
+            self.nodes = list(_cancel(*_merge(*self.nodes)))
+
+
+## Nested fractions are bracketed, a / (b / c), which can only be added once Divide exists
+Divide.parenthesize += (Divide,)
+
+
+def _exact_quotient(numerator: Any, denominator: Any) -> Optional[SparsePolynomial]:
+    ## Divides an integer valued polynomial by an integer which divides every coefficient
+    d = _integer(denominator)
+    poly = SparsePolynomial.from_node(numerator) if d else None
+    if poly is None:
+        return None
+
+    if not all(cake.assumptions.is_integer(cake.Variable(symbol)) for symbol in poly.symbols):
+        return None
+
+    terms = {}
+    for key, c in poly.terms.items():
+        c = _integer(c)
+        if c is None or c % d or any(not isinstance(e, int) or e < 0 for _, e in key):
+            return None
+        terms[key] = c // d
+
+    poly.terms = terms
+    return poly
+
 
 class FloorDiv(Divide):
-    def __str__(self) -> str:
-        return ' // '.join(map(str, self.nodes))
+    separator = ' // '
+
+    def __new__(cls, x: Any = None, y: Any = None, /, *nodes: Any) -> Any:
+        ## Integers divided by a factor of every coefficient need no flooring, (2x) // 2 -> x
+        if x is not None and y is not None and not nodes:
+            quotient = _exact_quotient(x, y)
+            if quotient is not None:
+                return quotient.as_node()
+        return super().__new__(cls)
+
+    def flatten(self) -> None:
+        ## Cancelling factors changes the result of floor division
+        assert len(self.nodes) == 2, 'Invalid divide op given, must only contain 2 nodes'
 
 
 class Modulo(Divide):
-    def __str__(self) -> str:
-        return ' % '.join(map(str, self.nodes))
+    separator = ' % '
+
+    def __new__(cls, x: Any = None, y: Any = None, /, *nodes: Any) -> Any:
+        ## Integers which are multiples of the modulus leave no remainder, (2x) % 2 -> 0
+        if x is not None and y is not None and not nodes and _exact_quotient(x, y) is not None:
+            return cake.Integral(0)
+        return super().__new__(cls)
+
+    flatten = FloorDiv.flatten
@@ -0,0 +1,187 @@
+## Distributing products over sums
+##
+## Multiply(Add(a, b), Add(c, d)) -> Add(ac, ad, bc, bd)
+##
+## Products are kept factored while ``cake.options.factored_products`` is enabled,
+## expanding is then only done when asked for.
+##
+## Powers of sums are expanded using multinomial coefficients,
+## (a + b) ** n -> sum(comb(n, k) * a**(n - k) * b**k for k in 0..n)
+## so each term is generated directly rather than multiplying the sum by itself n times.
+##
+from __future__ import annotations
+from typing import Any, Iterator, List, Tuple
+import itertools
+import math
+import numbers
+
+from ..sparse import SparsePolynomial, _multiply_keys
+from .traversal import Transformer
+from .add import Add
+from .multiply import Multiply, Power
+import cake
+
+
+def _terms(node: Any) -> List[Any]:
+    node = getattr(node, 'exp', node)
+    if isinstance(node, Add):
+        return list(node.nodes)
+    return [node]
+
+
+def _exponent(n: Any) -> int:
+    n = getattr(n, 'value', n)
+    if isinstance(n, float) and n.is_integer():
+        n = int(n)
+
+    if isinstance(n, bool) or not isinstance(n, numbers.Integral) or n < 0:
+        raise ValueError('Sums can only be expanded to non-negative integer powers')
+    return int(n)
+
+
+def _compositions(n: int, k: int) -> Iterator[Tuple[int, ...]]:
+    ## Every way of splitting n into k non-negative parts, using stars and bars
+    for bars in itertools.combinations(range(n + k - 1), k - 1):
+        previous = -1
+        parts = []
+        for bar in bars:
+            parts.append(bar - previous - 1)
+            previous = bar
+        parts.append(n + k - 2 - previous)
+        ## Reversed so the first term of the sum starts with the highest power
+        yield tuple(reversed(parts))
+
+
+def _multinomial(parts: Tuple[int, ...]) -> int:
+    coefficient, total = 1, 0
+    for part in parts:
+        total += part
+        coefficient *= math.comb(total, part)
+    return coefficient
+
+
+def iter_power_terms(base: Any, n: int) -> Iterator[Any]:
+    ''' Lazily yields the terms of ``base ** n``, where base is a sum,
+    like terms are not combined with each other.
+
+    .. code-block:: py
+
+        >>> list(iter_power_terms(x + 5, 2))
+        [x**2, 10x, Integral(25)]
+
+    Parameters
+    ----------
+    base: Any[Like[cake.BasicNode]]
+        Sum to raise, any other node is treated as a sum of 1 term
+    n: :class:`int`
+        Non-negative integer power
+    '''
+    n = _exponent(n)
+    terms = _terms(base)
+
+    for parts in _compositions(n, len(terms)):
+        factors = [_multinomial(parts)]
+        for term, part in zip(terms, parts):
+            if part == 1:
+                factors.append(term)
+            elif part:
+                factors.append(term ** part)
+        yield cake.prod(factors)
+
+
+def _power_poly(poly: SparsePolynomial, n: int) -> SparsePolynomial:
+    terms = list(poly.terms.items())
+    result = poly.copy()
+    result.terms = {}
+
+    for parts in _compositions(n, len(terms)):
+        key, coefficient = (), _multinomial(parts)
+        for (k, c), part in zip(terms, parts):
+            if part:
+                key = _multiply_keys(key, tuple((p, e * part) for p, e in k))
+                coefficient = coefficient * c ** part
+        result.add_term(key, coefficient)
+    return result.prune()
+
+
+def expand_power(base: Any, n: int) -> Any:
+    ''' Expands ``base ** n`` into a sum, using multinomial coefficients.
+
+    .. code-block:: py
+
+        >>> expand_power(x + 5, 3)
+        Expression(x**3 + 15x**2 + 75x + Integral(125))
+        >>> expand_power(x + Sin(x), 2)
+        Expression(x**2 + 2x * Sin(x) + Sin**2(x))
+
+    Parameters
+    ----------
+    base: Any[Like[cake.BasicNode]]
+        Sum to raise
+    n: :class:`int`
+        Non-negative integer power
+    '''
+    n = _exponent(n)
+    if n == 0:
+        return cake.Integral(1)
+
+    ## Sums of monomials are combined straight into a polynomial
+    poly = SparsePolynomial.from_node(base)
+    if poly is not None:
+        return _power_poly(poly, n).as_node()
+
+    add = Add.from_iterable(iter_power_terms(base, n))
+    if len(add.nodes) == 1:
+        return add.nodes[0]
+    return cake.Expression(add)
+
+
+class Expander(Transformer):
+    ''' A :class:`Transformer` which distributes every product over the sums it contains,
+    factors which are sums of monomials are multiplied together in a single pass.
+    Sums raised to non-negative integer powers are expanded using :func:`expand_power`.
+    '''
+    def visit_Multiply(self, node: Multiply, results: list) -> Any:
+        poly = None
+        others = []
+
+        for factor in results:
+            p = SparsePolynomial.from_node(factor)
+            if p is None:
+                others.append(factor)
+            elif poly is None:
+                poly = p
+            else:
+                poly = poly * p
+
+        terms = _terms(poly.as_node()) if poly is not None else [cake.Integral(1)]
+        for factor in others:
+            terms = [cake.prod((a, b)) for a in terms for b in _terms(factor)]
+
+        if len(terms) == 1:
+            return terms[0]
+        return cake.Expression(Add.from_iterable(terms))
+
+    def visit_Power(self, node: Power, results: list) -> Any:
+        base, power = results
+        if isinstance(getattr(base, 'exp', base), Add):
+            try:
+                return expand_power(base, power)
+            except ValueError:
+                pass
+        return self.rebuild(node, results)
+
+
+def expand(node: Any) -> Any:
+    ''' Expands a node, distributing products over sums and expanding integer powers of sums.
+
+    .. code-block:: py
+
+        >>> with cake.options.using(factored_products=True):
+        ...     f = (a + b) * (c + d)
+        >>> f
+        Expression((a + b) * (c + d))
+        >>> expand(f)
+        Expression(ac + ad + bc + bd)
+    '''
+    return Expander().visit(node)
@@ -0,0 +1,310 @@
+## Linear forms
+##
+## c0 + c1*x1 + c2*x2 + ... + cn*xn
+##
+## Rather than an Add holding a Variable per term, the coefficients are stored in a contiguous array
+## alongside the ids of their symbols, so evaluating the form is a single dot product
+## and adding forms together merges 2 arrays.
+##
+## Elements of a single IndexedSymbol are gathered straight from the array given for it,
+## >>> form.solve(w=weights)            # one row
+## >>> form.solve(w=rows)               # 2d array, one result per row
+##
+from __future__ import annotations
+from array import array
+from operator import add, mul
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+import numbers
+
+from .add import Operation, Add
+from .multiply import Multiply, Power
+from ..symbols import table, name, symbol_id
+from cake.utils import _numpy, _is_array
+import cake
+
+
+def _number(node: Any) -> Any:
+    value = getattr(node, 'value', node)
+    if isinstance(value, bool) or not isinstance(value, numbers.Number):
+        return None
+    return value
+
+
+def _pack(values: Iterable[Any]) -> Sequence[Any]:
+    ## Integers and floats are stored in typed arrays, anything else such as complex numbers in a tuple
+    values = list(values)
+
+    if all(isinstance(v, int) for v in values):
+        try:
+            return array('q', values)
+        except OverflowError:
+            return tuple(values)
+    elif all(isinstance(v, (int, float)) for v in values):
+        return array('d', values)
+    return tuple(values)
+
+
+class LinearForm(Operation):
+    ''' Represents a sum which is linear in its variables, ``c0 + c1*x1 + ... + cn*xn``,
+    storing the coefficients in a contiguous array rather than as a node per term.
+
+    Forms are evaluated as a single dot product, for one set of values or over batches of them
+    when NumPy arrays are given.
+
+    .. code-block:: py
+
+        >>> x, y = Variable.many('x', 'y')
+        >>> f = LinearForm.from_node(2 * x + 3 * y + 1)
+        >>> f
+        LinearForm(2x, 3y, Integral(1))
+        >>> f.solve(x=1, y=2)
+        Integral(9)
+        >>> f.solve(x=numpy.array([1, 2]), y=numpy.array([2, 3]))
+        array([ 9, 14])
+        >>> f * 2 + x
+        LinearForm(5x, 6y, Integral(2))
+
+    Weights of an :class:`IndexedSymbol` can be evaluated from a single array
+
+    .. code-block:: py
+
+        >>> w = IndexedSymbol('w', 10_000)
+        >>> f = LinearForm(w, range(10_000))
+        >>> f.solve(w=numpy.ones(10_000))
+        49995000.0
+        >>> f.solve(w=[1] * 10_000)
+        Integral(49995000)
+
+    Parameters
+    ----------
+    symbols: Iterable[Union[:class:`str`, :class:`Variable`]]
+        Symbols of each term
+    coefficients: Iterable[Any]
+        Numerical coefficient of each term
+    constant: Any
+        Numerical constant added to the form
+
+    Raises
+    ------
+    :py:obj:`ValueError`:
+        A different number of symbols and coefficients were given, or a coefficient wasn't a number
+    '''
+    separator = ' + '
+
+    def __init__(self, symbols: Iterable[Any], coefficients: Iterable[Any], constant: Any = 0) -> None:
+        ids = tuple(symbol_id(s) for s in symbols)
+        values = [_number(c) for c in coefficients]
+
+        if len(ids) != len(values):
+            raise ValueError('Number of symbols and coefficients given must be the same')
+        elif any(v is None for v in values) or _number(constant) is None:
+            raise ValueError('Coefficients of a linear form must be numbers')
+
+        if len(set(ids)) != len(ids):
+            merged = {}
+            for i, c in zip(ids, values):
+                merged[i] = merged.get(i, 0) + c
+            ids, values = tuple(merged), merged.values()
+
+        self._set(ids, _pack(values), _number(constant))
+
+    def _set(self, symbols: Tuple[int, ...], coefficients: Sequence[Any], constant: Any) -> None:
+        self.symbols = symbols
+        self.coefficients = coefficients
+        self.constant = constant
+        self._index = None
+        self._gather = False
+        self._nodes = None
+
+    @classmethod
+    def _new(cls, symbols: Tuple[int, ...], coefficients: Sequence[Any], constant: Any) -> LinearForm:
+        form = cls.__new__(cls)
+        form._set(symbols, coefficients, constant)
+        return form
+
+    @classmethod
+    def from_node(cls, node: Any) -> Optional[LinearForm]:
+        ''' Converts a sum of numbers and variables with numerical coefficients into a form,
+        ``None`` is returned if any term isn't linear.
+
+        .. code-block:: py
+
+            >>> LinearForm.from_node(x * 2 + y - 4)
+            LinearForm(2x, y, Integral(-4))
+            >>> LinearForm.from_node(x * y + 1)
+            None
+        '''
+        node = getattr(node, 'exp', node)
+        terms = node.nodes if isinstance(node, (Add, LinearForm)) else [node]
+
+        coefficients: Dict[int, Any] = {}
+        constant = 0
+
+        for term in terms:
+            term = getattr(term, 'exp', term)
+
+            if isinstance(term, LinearForm):
+                for i, c in zip(term.symbols, term.coefficients):
+                    coefficients[i] = coefficients.get(i, 0) + c
+                constant += term.constant
+            elif (value := _number(term)) is not None:
+                constant += value
+            elif (
+                isinstance(term, cake.Variable)
+                and not getattr(term, '_to_type', None)
+                and _number(term.power) == 1
+                and (c := _number(term.coefficient)) is not None
+            ):
+                coefficients[term.symbol_id] = coefficients.get(term.symbol_id, 0) + c
+            else:
+                return None
+
+        return cls._new(tuple(coefficients), _pack(coefficients.values()), constant)
+
+    def to_expression(self) -> cake.Expression:
+        ''' Converts the form back into an :class:`Expression` of an :class:`Add` '''
+        return cake.Expression(Add.from_iterable(self.nodes))
+
+    @property
+    def nodes(self) -> tuple:
+        ''' The terms of the form, created the first time they are accessed '''
+        if self._nodes is None:
+            nodes = [cake.Variable(name(i), c) for i, c in zip(self.symbols, self.coefficients) if c]
+            if self.constant or not nodes:
+                nodes.append(cake.Number.convert(self.constant))
+            self._nodes = tuple(nodes)
+        return self._nodes
+
+    def flatten(self) -> None:
+        ## Terms are combined when the form is created
+        return None
+
+    def with_nodes(self, *nodes: Any) -> Operation:
+        add = Add.from_iterable(nodes)
+        form = LinearForm.from_node(add)
+        return add if form is None else form
+
+    def coefficient(self, symbol: Any) -> Any:
+        ''' Returns the coefficient of a symbol within the form, 0 if it isn't in the form '''
+        if self._index is None:
+            self._index = {i: position for position, i in enumerate(self.symbols)}
+
+        position = self._index.get(symbol_id(symbol))
+        return 0 if position is None else self.coefficients[position]
+
+    ''' Evaluation '''
+
+    def _positions(self) -> Optional[Tuple[str, Tuple[int, ...]]]:
+        ## Positions of each symbol when every symbol is an element of the same indexed symbol
+        if self._gather is False:
+            self._gather = None
+            indices = [table.indices.get(i) for i in self.symbols]
+
+            if indices and all(indices) and len({base for base, _ in indices}) == 1:
+                self._gather = (indices[0][0], tuple(index for _, index in indices))
+        return self._gather
+
+    def solve(self, **values) -> Any:
+        ''' Evaluates the form as a dot product of its coefficients and the values given.
+
+        Values may be NumPy arrays, in which case the form is evaluated for every row at once.
+        When some values are missing, the known terms are folded into the constant
+        and a new form is returned.
+
+        .. code-block:: py
+
+            >>> f = LinearForm.from_node(2 * x + 3 * y + 1)
+            >>> f.solve(x=1)
+            Expression(3y + Integral(3))
+        '''
+        gather = self._positions()
+        if gather is not None and gather[0] in values:
+            base, positions = gather
+            row = values[base]
+
+            if _is_array(row):
+                np = _numpy()
+                return np.asarray(row)[..., list(positions)] @ np.asarray(self.coefficients) + self.constant
+            return self._dot([row[p] for p in positions])
+
+        row = [table.lookup(i, values) for i in self.symbols]
+        row = [getattr(v, 'value', v) for v in row]
+
+        if any(_is_array(v) for v in row):
+            if any(v is None for v in row):
+                raise ValueError('A value must be given for every symbol when evaluating over arrays')
+
+            np = _numpy()
+            columns = np.stack(np.broadcast_arrays(*row), axis=-1)
+            return columns @ np.asarray(self.coefficients) + self.constant
+
+        if any(v is None for v in row):
+            constant = self.constant
+            missing = []
+            for i, c, v in zip(self.symbols, self.coefficients, row):
+                if v is None:
+                    missing.append((i, c))
+                else:
+                    constant += c * v
+
+            form = LinearForm._new(tuple(i for i, _ in missing), _pack(c for _, c in missing), constant)
+            return cake.Expression(form)
+        return self._dot(row)
+
+    def _dot(self, row: Sequence[Any]) -> Any:
+        total = sum(map(mul, self.coefficients, map(lambda v: getattr(v, 'value', v), row)), self.constant)
+        return cake.Number.convert(total)
+
+    def run(self, node: LinearForm, *, true_value: bool = False, **values) -> Any:
+        ## Used by Expression.solve
+        return node.solve(**values)
+
+    ''' Arithmetic '''
+
+    def __add__(self, other: Any) -> Any:
+        other = getattr(other, 'exp', other)
+
+        if (value := _number(other)) is not None:
+            return LinearForm._new(self.symbols, self.coefficients, self.constant + value)
+        elif not isinstance(other, LinearForm):
+            form = LinearForm.from_node(other)
+            if form is None:
+                return cake.Expression(Add(self, other))
+            other = form
+
+        constant = self.constant + other.constant
+        if self.symbols == other.symbols:
+            return LinearForm._new(self.symbols, _pack(map(add, self.coefficients, other.coefficients)), constant)
+
+        merged = dict(zip(self.symbols, self.coefficients))
+        for i, c in zip(other.symbols, other.coefficients):
+            merged[i] = merged.get(i, 0) + c
+        return LinearForm._new(tuple(merged), _pack(merged.values()), constant)
+
+    __radd__ = __add__
+
+    def __neg__(self) -> LinearForm:
+        return self * -1
+
+    def __sub__(self, other: Any) -> Any:
+        return self + (-other)
+
+    def __rsub__(self, other: Any) -> Any:
+        return (-self) + other
+
+    def __mul__(self, other: Any) -> Any:
+        if (value := _number(other)) is None:
+            return cake.Expression(Multiply(self, other))
+        return LinearForm._new(self.symbols, _pack(c * value for c in self.coefficients), self.constant * value)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Any) -> Any:
+        if (value := _number(other)) is None:
+            return cake.Expression.wrap(cake.Divide(self, other))
+        return LinearForm._new(self.symbols, _pack(c / value for c in self.coefficients), self.constant / value)
+
+
+## Forms are sums, so are bracketed in the same places
+Multiply.parenthesize += (LinearForm,)
+Power.parenthesize += (LinearForm,)
@@ -1,21 +1,129 @@
 ## Holds values to be multiplied, these are not simplified like the addition and divide operations,
 ## As a result it is not recomended to directly use this operator
-from .add import Operation
-from typing import Any
+##
+## Factors sharing a base are merged into a single power,
+## Multiply(Power(x + 1, 2), x + 1) -> Multiply(Power(x + 1, 3))
+##
+## Power(Power(a, 2), 3) -> Power(a, 6)
+## Power(2, 3) -> Integral(8)
+## Power(a, 1) -> a
+##
+from __future__ import annotations
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import numbers
+import operator
+
+from .add import Operation, Add
+from .structure import key
+import cake
+
+
+def _number(node: Any) -> Any:
+    ## Returns the python value of a numerical node, or None
+    value = getattr(node, 'value', node)
+    if isinstance(value, bool) or not isinstance(value, numbers.Number):
+        return None
+    return value
+
+
+def _is_integer(value: Any) -> bool:
+    return isinstance(value, numbers.Integral) or (isinstance(value, float) and value.is_integer())
+
+
+def _base_exponent(node: Any) -> Tuple[Any, Any]:
+    ## Splits a factor into its base and exponent
+    inner = getattr(node, 'exp', node)
+    if isinstance(inner, Power):
+        return inner.base, inner.power
+    elif isinstance(inner, cake.RaisedVariable):
+        return inner.base, inner.power
+    return node, 1
+
+
+class _Factors(object):
+    ## Factors of a flattened product, bases are indexed by their structural key
+    ## so a new factor is merged without comparing it against every other factor.
+    __slots__ = ('nodes', 'merged', 'first')
+
+    def __init__(self) -> None:
+        self.nodes: List[Any] = []
+        self.merged: List[Tuple[Any, Any, Hashable]] = []     ## base, exponent and key of each node
+        self.first: Dict[Hashable, int] = {}                  ## first factor with a base
+
+    def copy(self) -> _Factors:
+        factors = _Factors.__new__(_Factors)
+        factors.nodes = list(self.nodes)
+        factors.merged = list(self.merged)
+        factors.first = dict(self.first)
+        return factors
+
+    def add(self, node: Any, base: Any, exponent: Any, k: Hashable) -> None:
+        position = self.first.get(k)
+
+        if position is None:
+            self.first[k] = len(self.nodes)
+            self.nodes.append(node)
+            self.merged.append((base, exponent, k))
+            return
+
+        b, e, _ = self.merged[position]
+        self.merged[position] = (b, e + exponent, k)
+        self.nodes[position] = _power(b, e + exponent)
 
 
 class Multiply(Operation):
+    _factors: Optional[_Factors] = None
+
+    def _flattened(self) -> Optional[_Factors]:
+        ## Merged factors from when the product was flattened, if its nodes haven't changed since
+        factors = self._factors
+        if factors is None or len(factors.nodes) != len(self.nodes) or not all(map(operator.is_, factors.nodes, self.nodes)):
+            return None
+        return factors
 
     def flatten(self) -> None:
-        return
+        ## Factors with the same base are merged, bases are compared by their structure
+        factors = _Factors()
+
+        for node in self.nodes:
+            inner = getattr(node, 'exp', node)
+            children = (node,)
+
+            ## Nested products are spliced in, reusing their merged factors if they were already flattened
+            if isinstance(inner, Multiply):
+                nested = inner._flattened()
+                if nested is None:
+                    children = inner.nodes
+                elif not factors.nodes:
+                    factors = nested.copy()
+                    continue
+                else:
+                    for child, entry in zip(nested.nodes, nested.merged):
+                        factors.add(child, *entry)
+                    continue
+
+            for child in children:
+                base, exponent = _base_exponent(child)
+                factors.add(child, base, exponent, key(base))
+
+        self._factors = factors
+        self.nodes = list(factors.nodes)
+
+    separator = ' * '
+    parenthesize = (Add,)
+    commutative = True
+
+
+def _power(base: Any, exponent: Any) -> Any:
+    if isinstance(base, (cake.BasicVariable, cake.Function)):
+        return base ** exponent
+    return Power(getattr(base, 'exp', base), exponent)
 
-    def __str__(self) -> str:
-        return ' * '.join(map(str, self.nodes))
 
 class Power(Operation):
 
-    def __str__(self) -> str:
-        return ' ** '.join(map(str, self.nodes))
+    separator = ' ** '
+    parenthesize = (Add, Multiply)      ## Power itself is added below the class
 
     @property
     def base(self) -> Any:
@@ -25,5 +133,44 @@ class Power(Operation):
     def power(self) -> Any:
         return self.nodes[1]
 
+    def __new__(cls, base: Any = None, power: Any = None, /, *nodes: Any) -> Any:
+        if nodes or base is None or power is None:
+            return super().__new__(cls)
+
+        ## Nested powers are folded, (a ** m) ** n == a ** (m * n) for integer n or positive a
+        inner = getattr(base, 'exp', base)
+        n = _number(power)
+        if isinstance(inner, Power) and n is not None and (_is_integer(n) or cake.assumptions.is_positive(inner.base)):
+            base, power = inner.base, inner.power * power
+            n = _number(power)
+
+        if n is not None:
+            if n == 0:
+                return cake.Integral(1)
+            elif n == 1:
+                if isinstance(base, str):
+                    return cake.Variable(base)
+                elif isinstance(base, numbers.Number) and not isinstance(base, cake.Number):
+                    return cake.Number.convert(base)
+                return base
+
+            ## Numbers are only folded when the result stays exact
+            b = _number(base)
+            if b is not None and (isinstance(b, float) or isinstance(n, float) or (_is_integer(b) and n > 0)):
+                return cake.Number.convert(b ** n)
+
+        self = super().__new__(cls)
+        self._folded = (base, power)
+        return self
+
+    def __init__(self, base: Any, power: Any, /, *nodes: Any) -> None:
+        ## Arguments may have been folded in __new__
+        base, power = self.__dict__.pop('_folded', (base, power))
+        super().__init__(base, power, *nodes)
+
     def flatten(self) -> None:
         assert len(self.nodes) == 2, 'Power operation only take 2 nodes, base and power'
+
+
+## Chained powers are bracketed, (a ** b) ** c, which can only be added once Power exists
+Power.parenthesize += (Power,)
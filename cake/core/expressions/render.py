@@ -0,0 +1,202 @@
+## Streaming string rendering for expression trees
+##
+## Rendering writes small pieces straight into a file like object,
+## rather than joining the strings of every subtree together.
+##
+## >>> render(expr, sys.stderr, max_chars=80)
+## x0 + x1 + x2 + x3 + ...
+##
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, TextIO
+
+from .add import ExpressionNode, Operation
+import cake
+
+
+class _Truncated(Exception):
+    pass
+
+
+class Renderer(object):
+    ''' Writes the string form of a tree into a file like object,
+    the output is identical to calling :py:func:`str` on the tree.
+
+    The tree is walked without recursion and output is flushed in chunks,
+    subtrees shared between parents are rendered once and reused from a cache.
+
+    Parameters
+    ----------
+    file: Optional[TextIO]
+        File like object to write to, if not given the output is collected and returned.
+    max_chars: Optional[:class:`int`]
+        Maximum number of characters to write, once reached ``...`` is written and rendering stops.
+    cache_limit: :class:`int`
+        Largest subtree, in characters, which is kept in the cache.
+    '''
+    chunk_size: int = 8192
+
+    def __init__(self, file: Optional[TextIO] = None, *,
+                 max_chars: Optional[int] = None,
+                 cache_limit: int = 512) -> None:
+        self.file = file
+        self.max_chars = max_chars
+        self.cache_limit = cache_limit
+        self.cache: Dict[int, str] = {}
+
+        self._pieces: List[str] = []
+        self._offset = 0
+        self._pending = 0
+        self._written = 0
+        self._frames: List[list] = []
+
+    ''' Output '''
+
+    def write(self, text: str) -> None:
+        ''' Writes text to the output, respecting ``max_chars`` '''
+        if self.max_chars is not None and self._written + len(text) > self.max_chars:
+            text = text[:self.max_chars - self._written] + '...'
+            self._pieces.append(text)
+            self._written = self.max_chars
+            raise _Truncated
+
+        self._pieces.append(text)
+        self._written += len(text)
+        self._pending += len(text)
+
+        frames = self._frames
+        while frames and self._written - frames[0][1] > self.cache_limit:
+            frames.pop(0)[2] = False
+
+        if self._pending >= self.chunk_size:
+            self._flush()
+
+    def _flush(self, final: bool = False) -> None:
+        if self.file is None:
+            return
+
+        ## Pieces belonging to a subtree which may still be cached are kept
+        keep = self._frames[0][0] - self._offset if self._frames and not final else len(self._pieces)
+        if keep <= 0:
+            return
+
+        self.file.write(''.join(self._pieces[:keep]))
+        del self._pieces[:keep]
+        self._offset += keep
+        self._pending = sum(map(len, self._pieces))
+
+    ''' Rendering '''
+
+    def render(self, node: Any) -> Optional[str]:
+        ''' Renders a node, returning the string if no file was given '''
+        return self._run([(node, None)])
+
+    def render_call(self, node: ExpressionNode) -> Optional[str]:
+        ''' Renders an operation in the form ``Name(node, node, ...)`` '''
+        return self._run(self._call(node)[::-1])
+
+    def _run(self, stack: list) -> Optional[str]:
+        try:
+            while stack:
+                item, frame = stack.pop()
+
+                if item is None:
+                    self._close(frame)
+                elif isinstance(item, str):
+                    self.write(item)
+                else:
+                    self._visit(item, stack)
+        except _Truncated:
+            pass
+
+        if self.file is None:
+            return ''.join(self._pieces)
+        self._flush(final=True)
+        return None
+
+    def _close(self, frame: list) -> None:
+        if self._frames and self._frames[-1] is frame:
+            self._frames.pop()
+        if frame[2]:
+            self.cache[frame[3]] = ''.join(self._pieces[frame[0] - self._offset:])
+
+    def _call(self, node: ExpressionNode) -> list:
+        items = [(f'{node.__class__.__name__}(', None)]
+        for index, child in enumerate(node.nodes):
+            if index:
+                items.append((', ', None))
+            items.append((child, None))
+        items.append((')', None))
+        return items
+
+    def _parts(self, node: Any) -> Optional[list]:
+        ## Returns the pieces making up a node, or None for nodes rendered using str
+        if isinstance(node, cake.Expression):
+            return [node.exp]
+
+        elif isinstance(node, Operation) and type(node).__str__ is Operation.__str__:
+            if node.separator is None:
+                return self._call(node)
+
+            parts = []
+            for index, child in enumerate(node.nodes):
+                if index:
+                    parts.append(node.separator)
+
+                if isinstance(getattr(child, 'exp', child), node.parenthesize):
+                    parts.extend(('(', child, ')'))
+                else:
+                    parts.append(child)
+            return parts
+
+        elif isinstance(node, cake.Function) and type(node).__str__ is cake.Function.__str__:
+            head = node._head()
+            return [head, node.parameter, ')']
+
+        elif isinstance(node, cake.VariableGroup):
+            return node._parts()
+        return None
+
+    def _visit(self, node: Any, stack: list) -> None:
+        key = id(node)
+        if key in self.cache:
+            self.write(self.cache[key])
+            return
+
+        parts = self._parts(node)
+        if parts is None:
+            text = str(node)
+            if len(text) <= self.cache_limit:
+                self.cache[key] = text
+            self.write(text)
+            return
+
+        ## Marks where the node starts so it can be cached once it is closed
+        frame = [self._offset + len(self._pieces), self._written, True, key, node]
+        self._frames.append(frame)
+
+        stack.append((None, frame))
+        for part in reversed(parts):
+            stack.append(part if isinstance(part, tuple) else (part, None))
+
+
+def render(node: Any, file: Optional[TextIO] = None, *, max_chars: Optional[int] = None) -> Optional[str]:
+    ''' Renders a node or expression as a string, streaming the output into a file like object.
+
+    .. code-block:: py
+
+        >>> expr = cake.sum(Variable(f'x{i}') for i in range(100_000))
+        >>> render(expr, sys.stdout, max_chars=20)
+        x0 + x1 + x2 + x3 + ...
+        >>> render(expr, max_chars=10)
+        'x0 + x1 + ...'
+
+    Parameters
+    ----------
+    node: Any[Like[cake.BasicNode]]
+        Node to render
+    file: Optional[TextIO]
+        File like object to write to, if not given the rendered string is returned.
+    max_chars: Optional[:class:`int`]
+        Maximum number of characters to write before truncating the output with ``...``
+    '''
+    return Renderer(file, max_chars=max_chars).render(node)
@@ -0,0 +1,59 @@
+## Structural comparison of nodes
+##
+## >>> same(Sin(x) ** 2, Sin(x) ** 2)
+## True
+##
+## Variables are compared by their ids in the symbol table rather than their names,
+## and functions by every field including their coefficients and powers,
+## unlike Function.__eq__ which only compares parameters.
+##
+from __future__ import annotations
+from typing import Any, Hashable
+import numbers
+
+from ..symbols import table
+from .add import Operation
+import cake
+
+## Fields of a function which are compared explicitly, rather than with the rest of its state
+_FUNCTION_FIELDS = ('parameter', 'coefficient', 'power', '_err')
+
+
+def key(node: Any) -> Hashable:
+    ''' Returns a hashable key describing the structure of a node,
+    2 nodes with the same key are structurally identical.
+    Nodes of commutative operations are sorted, so ``x + y`` and ``y + x`` share a key.
+
+    .. code-block:: py
+
+        >>> key(x + 1) == key(1 + x)
+        True
+    '''
+    node = getattr(node, 'exp', node)
+
+    if isinstance(node, bool):
+        return ('Node', bool, node)
+    elif isinstance(node, numbers.Number):
+        return ('Number', getattr(node, 'value', node))
+    elif isinstance(node, str):
+        return (cake.Variable, table.intern(node), ('Number', 1), ('Number', 1))
+    elif isinstance(node, cake.Variable):
+        return (type(node), node.symbol_id, key(node.coefficient), key(node.power))
+    elif isinstance(node, cake.VariableGroup):
+        return (cake.VariableGroup, key(node.coefficient), tuple((i, key(e)) for i, e in node.monomial))
+    elif isinstance(node, cake.RaisedVariable):
+        return (cake.RaisedVariable, key(node.base), key(node.power))
+    elif isinstance(node, cake.Function):
+        state = tuple(sorted((k, key(v)) for k, v in vars(node).items() if k not in _FUNCTION_FIELDS))
+        return (type(node), key(node.parameter), key(node.coefficient), key(node.power), state)
+    elif isinstance(node, Operation):
+        keys = tuple(key(i) for i in node.nodes)
+        if node.commutative:
+            keys = tuple(sorted(keys, key=repr))
+        return (type(node), keys)
+    return ('Node', type(node), repr(node))
+
+
+def same(x: Any, y: Any) -> bool:
+    ''' Returns whether 2 nodes are structurally identical '''
+    return x is y or key(x) == key(y)
@@ -0,0 +1,64 @@
+## Replacing variables within expression trees
+##
+## Expression(Add(x, Sin(y))).subs({y: x + 1}) -> Expression(Add(x, Sin(x + 1)))
+##
+from __future__ import annotations
+from typing import Any, Dict
+import numbers
+
+from .traversal import Transformer
+import cake
+
+
+def _is_one(value: Any) -> bool:
+    return isinstance(value, numbers.Number) and value == 1
+
+
+class Substitution(Transformer):
+    ''' A :class:`Transformer` which replaces variables with other values,
+    only the parts of the tree which contain a replaced variable are rebuilt.
+
+    Parameters
+    ----------
+    mapping: Dict[Union[:class:`str`, :class:`Variable`], Any[Like[cake.BasicNode]]]
+        Variables to replace, keys may be variables or their representations.
+    '''
+    def __init__(self, mapping: Dict[Any, Any]) -> None:
+        super().__init__()
+        self.mapping = {getattr(k, 'representation', k): v for k, v in mapping.items()}
+
+    def _replace(self, representation: str, power: Any) -> Any:
+        value = self.mapping[representation]
+        if _is_one(power):
+            return value
+        return value ** power
+
+    def visit_Variable(self, node: cake.Variable, results: list) -> Any:
+        ## Constants have a value of their own
+        if getattr(node, '_to_type', None):
+            return node
+
+        coefficient = self.visit(node.coefficient)
+        power = self.visit(node.power)
+
+        if node.representation not in self.mapping:
+            if coefficient is node.coefficient and power is node.power:
+                return node
+            return cake.Variable(node.representation, coefficient, power)
+
+        value = self._replace(node.representation, power)
+        if _is_one(coefficient):
+            return value
+        return cake.prod((coefficient, value))
+
+    def visit_VariableGroup(self, node: cake.VariableGroup, results: list) -> Any:
+        if not any(i.representation in self.mapping for i in node.groups):
+            return node
+
+        factors = [self.visit(node.coefficient)]
+        for group in node.groups:
+            if group.representation in self.mapping:
+                factors.append(self._replace(group.representation, group.power))
+            else:
+                factors.append(group)
+        return cake.prod(factors)
@@ -0,0 +1,201 @@
+## Walking expression trees
+##
+## Expression(Add(x, Multiply(y, 2)))
+##
+## preorder  -> Expression, Add, x, Multiply, y, 2
+## postorder -> x, y, 2, Multiply, Add, Expression
+##
+## Walks use an explicit stack so deep trees don't hit the recursion limit,
+## nodes shared between several parents are only visited once.
+##
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+from .add import Operation
+import cake
+
+
+def children(node: Any) -> Tuple[Any, ...]:
+    ''' Returns the direct children of a node.
+
+    * :class:`Expression` ~ the operation it holds
+    * :class:`Operation` ~ its nodes
+    * :class:`Function` ~ its parameter, coefficient and power
+    * :class:`RaisedVariable` ~ its base and power
+
+    Any other node is a leaf and has no children.
+    '''
+    if isinstance(node, cake.Expression):
+        return (node.exp,)
+    elif isinstance(node, Operation):
+        return tuple(node.nodes)
+    elif isinstance(node, cake.Function):
+        return (node.parameter, node.coefficient, node.power)
+    elif isinstance(node, cake.RaisedVariable):
+        return (node.base, node.power)
+    return ()
+
+
+def preorder(node: Any) -> Iterator[Any]:
+    ''' Yields every unique node in a tree, parents before their children.
+
+    .. code-block:: py
+
+        >>> list(preorder(x + Sin(y)))
+        [Expression(x + Sin(y)), Add(x, Sin(y)), x, Sin(y), y, 1]
+    '''
+    seen = set()
+    stack = [node]
+
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+
+        yield node
+        stack.extend(reversed(children(node)))
+
+
+def postorder(node: Any) -> Iterator[Any]:
+    ''' Yields every unique node in a tree, children before their parents.
+
+    .. code-block:: py
+
+        >>> list(postorder(x + Sin(y)))
+        [x, y, 1, Sin(y), Add(x, Sin(y)), Expression(x + Sin(y))]
+    '''
+    seen = set()
+    stack = [(node, False)]
+
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            yield node
+            continue
+
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+
+        stack.append((node, True))
+        stack.extend((child, False) for child in reversed(children(node)))
+
+
+class Visitor(object):
+    ''' Base class for computing a result over an expression tree.
+
+    Results are computed bottom up, each node receives the results of its children.
+    Define ``visit_<ClassName>`` methods to handle specific nodes,
+    any other node is passed to :meth:`Visitor.generic_visit`.
+    Results are memoized so subtrees shared between parents are only visited once.
+
+    .. code-block:: py
+
+        class CountVariables(Visitor):
+            def visit_Variable(self, node, results):
+                return 1
+
+            def generic_visit(self, node, results):
+                return sum(results)
+
+        >>> CountVariables().visit(x + Sin(y) + Cos(z))
+        3
+    '''
+    def __init__(self) -> None:
+        self.memo: Dict[int, Tuple[Any, Any]] = {}
+        self._handlers: Dict[type, Callable[[Any, list], Any]] = {}
+
+    def _handler(self, node: Any) -> Callable[[Any, list], Any]:
+        cls = node.__class__
+        handler = self._handlers.get(cls)
+
+        if handler is None:
+            for base in cls.__mro__:
+                handler = getattr(self, f'visit_{base.__name__}', None)
+                if handler:
+                    break
+            else:
+                handler = self.generic_visit
+            self._handlers[cls] = handler
+        return handler
+
+    def children(self, node: Any) -> Tuple[Any, ...]:
+        ''' Returns the children to visit for a node, see :func:`children` '''
+        return children(node)
+
+    def visit(self, node: Any) -> Any:
+        ''' Visits the tree, returning the result for the root node '''
+        memo = self.memo
+        stack = [(node, False)]
+
+        while stack:
+            current, expanded = stack.pop()
+            if id(current) in memo:
+                continue
+
+            nodes = self.children(current)
+            if not expanded:
+                stack.append((current, True))
+                stack.extend((child, False) for child in reversed(nodes) if id(child) not in memo)
+                continue
+
+            results = [memo[id(child)][1] for child in nodes]
+            ## The node is stored alongside the result so its id can't be reused
+            memo[id(current)] = (current, self._handler(current)(current, results))
+        return memo[id(node)][1]
+
+    def generic_visit(self, node: Any, results: list) -> Any:
+        ''' Called for nodes without a specific visitor, returns ``None`` by default '''
+        return None
+
+
+class Transformer(Visitor):
+    ''' A :class:`Visitor` which returns a new tree.
+
+    By default a node is rebuilt only if one of its children changed,
+    otherwise the original node is returned so unchanged subtrees are shared with the new tree.
+
+    .. code-block:: py
+
+        class DoubleNumbers(Transformer):
+            def visit_Number(self, node, results):
+                return node * 2
+
+        >>> DoubleNumbers().visit(x + 3)
+        Expression(x + 6)
+    '''
+    def generic_visit(self, node: Any, results: list) -> Any:
+        return self.rebuild(node, results)
+
+    def rebuild(self, node: Any, results: list) -> Any:
+        ''' Returns a node with its children replaced by the results given '''
+        original = self.children(node)
+        if all(a is b for a, b in zip(original, results)):
+            return node
+        return rebuild(node, results)
+
+
+def rebuild(node: Any, nodes: list) -> Any:
+    ''' Creates a copy of a node using new children, in the order given by :func:`children`.
+    Operations are rebuilt using :meth:`Operation.with_nodes` so they are flattened again.
+    '''
+    if isinstance(node, cake.Expression):
+        exp, = nodes
+        if isinstance(exp, Operation):
+            return cake.Expression(exp)
+        return exp
+
+    elif isinstance(node, Operation):
+        return node.with_nodes(*nodes)
+
+    elif isinstance(node, cake.Function):
+        f = node.copy()
+        f.parameter, f.coefficient, f.power = (
+            n if not isinstance(n, Operation) else cake.Expression(n) for n in nodes
+        )
+        return f
+
+    elif isinstance(node, cake.RaisedVariable):
+        return cake.RaisedVariable(*nodes)
+    return node
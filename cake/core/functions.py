@@ -16,12 +16,13 @@ x + 3 + Sin(x)
 94
 '''
 from __future__ import annotations
-from typing import Any
+from typing import Any, Optional
 from abc import ABC, abstractmethod
 
 import cake
 from cake.basic import OtherType
 from cake.core.numbers import NumInstance
+from cake.core.cache import function_cache, value_key, MISSING
 from math import *
 
 
@@ -67,12 +68,24 @@ class Function(cake.IFunction, ABC):
     '''
     _err: Any = None
 
+    _kernel: Optional[str] = None
+    ''' Name of the NumPy function used to evaluate arrays of values, such as ``'sin'``.
+    Functions without one apply :meth:`Function._handler` to each element instead.
+    '''
+
+    def _share(self) -> Function:
+        if cake.options.immutable_nodes:
+            return self
+        return self.copy()
+
     def __repr__(self) -> str:
         return f'{self.__class__.__name__}(parameter={repr(self.parameter)}, coefficient={repr(self.coefficient)}, power={repr(self.power)})'
 
-    def __str__(self) -> str:
+    def _head(self) -> str:
         if self.coefficient != 1:
             coefficient = f'{str(self.coefficient)}*'
+            if isinstance(self.coefficient, cake.Expression):
+                coefficient = f'({self.coefficient})*'
         else:
             coefficient = ''
 
@@ -81,12 +94,49 @@ class Function(cake.IFunction, ABC):
         else:
             power = ''
 
-        return f'{coefficient}{self.__class__.__name__}{power}({self.parameter})'
+        return f'{coefficient}{self.__class__.__name__}{power}('
+
+    def __str__(self) -> str:
+        return f'{self._head()}{self.parameter})'
 
     @abstractmethod
     def _handler(self, value, **options) -> Any:
         raise NotImplemented
 
+    def _array_handler(self, np: Any, v: Any) -> Any:
+        ## Vectorised version of _handler, v is always a NumPy array
+        if self._kernel is not None:
+            return getattr(np, self._kernel)(v)
+
+        def handle(x: Any) -> Any:
+            r = self._handler(x)
+            return getattr(r, 'value', r)
+        return np.frompyfunc(handle, 1, 1)(v)
+
+    def _vectorised(self, value: Any, to_rad: bool, prehandler: bool) -> Any:
+        np = cake.utils._numpy()
+        value = np.asarray(value)
+
+        if value.dtype == object:
+            raise ValueError(f'Cannot evaluate {self.__class__.__name__} over arrays containing unsolved values')
+        if to_rad:
+            value = np.deg2rad(value)
+        if prehandler:
+            value = self.prehandler(value)
+        return self._array_handler(np, value)
+
+    def _cache_state(self) -> tuple:
+        ## Anything other than the parameter, coefficient and power which changes the result
+        return ()
+
+    def _cache_key(self, to_rad: bool, solved: tuple) -> Any:
+        ## Key for function_cache from the solved parameter, coefficient and power,
+        ## None when any of them aren't numbers
+        keys = tuple(value_key(i) for i in solved)
+        if None in keys:
+            return None
+        return (self.__class__, self._cache_state(), to_rad) + keys
+
     def _try_solve_co(self, kwds) -> Any:
         try:
             if hasattr(self.coefficient, 'solve'):
@@ -107,24 +157,35 @@ class Function(cake.IFunction, ABC):
             return self.power
         return self.power
 
-    def _evaluate(self,
-                  to_rad: bool = False,
-                  prehandler: bool = False,
-                  o_v: bool = False,
-                  **kwds) -> Any:
+    def _solve_parameter(self, kwds) -> Any:
         if hasattr(self.parameter, 'solve'):
             value = self.parameter.solve(**kwds)
         elif hasattr(self.parameter, 'evaluate'):
             value = self.parameter.evaluate(**kwds)
         else:
             value = self.parameter
-        value = getattr(value, 'value', value)
+        return getattr(value, 'value', value)
+
+    def _evaluate_value(self, value: Any, to_rad: bool = False, prehandler: bool = False) -> Any:
+        if cake.utils._is_array(value):
+            return self._vectorised(value, to_rad, prehandler)
+        return self._handler(value, rad=to_rad, prehandle=prehandler)
+
+    def _apply_co_pow(self, value: Any, coefficient: Any, power: Any) -> Any:
+        ## Raises the evaluated parameter to the solved power and multiplies it by the solved coefficient
+        return coefficient * (value ** power)
+
+    def _evaluate(self,
+                  to_rad: bool = False,
+                  prehandler: bool = False,
+                  o_v: bool = False,
+                  **kwds) -> Any:
+        value = self._solve_parameter(kwds)
 
         ## Only the solved value wanted.
         if o_v:
             return value
-
-        return self._handler(value, rad=to_rad, prehandle=prehandler)
+        return self._evaluate_value(value, to_rad, prehandler)
 
     def evaluate(self, /, to_radians: bool = False, 
                           use_preprocess: bool = False, 
@@ -151,9 +212,24 @@ class Function(cake.IFunction, ABC):
             if (use_preprocess or self.auto_preprocess) and self.preprocessor:
                 kwds = self.preprocessor(kwds)
 
-            r = self._evaluate(to_radians, use_prehandler, **kwds)
+            parameter = self._solve_parameter(kwds)
+            coefficient = self._try_solve_co(kwds)
+            power = self._try_solve_pow(kwds)
+
+            key = None
+            if function_cache.enabled and not use_prehandler:
+                key = self._cache_key(to_radians, (parameter, coefficient, power))
 
-            value = self._try_solve_co(kwds) * (r ** self._try_solve_pow(kwds))
+            value = MISSING if key is None else function_cache.get(key)
+            if value is MISSING:
+                r = self._evaluate_value(parameter, to_radians, use_prehandler)
+                value = self._apply_co_pow(r, coefficient, power)
+
+                ## The cache keeps its own copy, so changes to the result aren't seen by later calls
+                if key is not None:
+                    function_cache.put(key, value.copy() if hasattr(value, 'copy') else value)
+            elif hasattr(value, 'copy'):
+                value = value.copy()
 
             if (use_postprocess or self.auto_postprocess) and self.postprocessor:
                 return self.postprocessor(value)
@@ -162,6 +238,58 @@ class Function(cake.IFunction, ABC):
             self._err = e
             return self
 
+    def evaluate_array(self, /, to_radians: bool = False,
+                                use_preprocess: bool = False,
+                                use_postprocess: bool = False,
+                                use_prehandler: bool = False,
+                                **kwds) -> Any:
+        ''' Evaluates the function over arrays of values using NumPy,
+        each function maps onto a single NumPy call such as :py:obj:`numpy.sin` for :class:`Sin`.
+        :meth:`Function.evaluate` also takes this path when the parameter solves to an array.
+
+        .. code-block:: py
+
+            >>> f = Sin(Variable('x'), coefficient=2)
+            >>> f.evaluate_array(x=numpy.array([0, 90, 180]), to_radians=True)
+            array([0.0000000e+00, 2.0000000e+00, 2.4492936e-16])
+
+        Inherits all parameters from :meth:`Function.evaluate`.
+
+        Raises
+        ------
+        :py:obj:`ImportError`:
+            NumPy isn't installed
+        :py:obj:`ValueError`:
+            A value wasn't given for every variable
+        '''
+        np = cake.utils._numpy()
+        kwds = {k: np.asarray(v) if isinstance(v, (list, tuple)) else v for k, v in kwds.items()}
+
+        if (use_preprocess or self.auto_preprocess) and self.preprocessor:
+            kwds = self.preprocessor(kwds)
+
+        try:
+            value = self._evaluate(o_v=True, **kwds)
+        except TypeError as e:
+            ## Unsolved nodes can't be combined with arrays
+            raise ValueError(f'Cannot evaluate {self.__class__.__name__} over arrays containing unsolved values') from e
+        value = self._vectorised(value, to_radians, use_prehandler)
+
+        coefficient = self._try_solve_co(kwds)
+        power = self._try_solve_pow(kwds)
+        for x in (coefficient, power):
+            if isinstance(x, (cake.BasicVariable, cake.BasicExpression, Function)):
+                raise ValueError(f'Cannot evaluate {self.__class__.__name__} with an unsolved coefficient or power')
+
+        power = getattr(power, 'value', power)
+        if not (isinstance(power, (int, float)) and power == 1):
+            value = value ** power
+        value = getattr(coefficient, 'value', coefficient) * value
+
+        if (use_postprocess or self.auto_postprocess) and self.postprocessor:
+            return self.postprocessor(value)
+        return value
+
     ''' Comparitive Methods '''
     def __eq__(self, other: OtherType) -> Any:
         if not isinstance(other, Function):
@@ -177,25 +305,25 @@ class Function(cake.IFunction, ABC):
         return not (self == other)
 
     def __lt__(self, other: OtherType) -> Any:
-        return cake.Comparity(self.copy(), other, cake.ComparitySymbol.LESS_THAN)
+        return cake.Comparity(self._share(), other, cake.ComparitySymbol.LESS_THAN)
 
     def __le__(self, other: OtherType) -> Any:
-        return cake.Comparity(self.copy(), other, cake.ComparitySymbol.LESS_OR_EQUAL_TO)
+        return cake.Comparity(self._share(), other, cake.ComparitySymbol.LESS_OR_EQUAL_TO)
 
     def __gt__(self, other: OtherType) -> Any:
-        return cake.Comparity(self.copy(), other, cake.ComparitySymbol.GREATER_THAN)
+        return cake.Comparity(self._share(), other, cake.ComparitySymbol.GREATER_THAN)
 
     def __ge__(self, other: OtherType) -> Any:
-        return cake.Comparity(self.copy(), other, cake.ComparitySymbol.GREATER_OR_EQUAL_TO)
+        return cake.Comparity(self._share(), other, cake.ComparitySymbol.GREATER_OR_EQUAL_TO)
 
     ''' Numerical Methods '''
 
     def __add__(self, other: OtherType) -> Any:
-        if other == self:
+        if other == self and (x := other.power == self.power) and not isinstance(x, cake.Comparity):
             c = self.copy()
-            c.coefficient += 1
+            c.coefficient += other.coefficient
             return c
-        return cake.Expression(cake.Add(self.copy(), other))
+        return cake.Expression(cake.Add(self._share(), other))
 
     __radd__ = __add__
     __iadd__ = __add__
@@ -213,7 +341,7 @@ class Function(cake.IFunction, ABC):
 
     def __mul__(self, other: OtherType) -> Any:
         if other == 1:
-            return self.copy()
+            return self._share()
 
         if self == other:
             s = self.copy()
@@ -224,7 +352,7 @@ class Function(cake.IFunction, ABC):
             s = self.copy()
             s.coefficient *= other
             return s
-        return cake.Expression(cake.Multiply(self.copy(), other))
+        return cake.Expression(cake.Multiply(self._share(), other))
 
     __rmul__ = __mul__
     __imul__ = __mul__
@@ -238,10 +366,13 @@ class Function(cake.IFunction, ABC):
     def __pow__(self, other: OtherType) -> Any:
         s = self.copy()
         s.power *= other
+        if s.coefficient != 1:
+            ## (c*f(x))**n == c**n * f(x)**n
+            s.coefficient = s.coefficient ** other
         return s
 
     def __ipow__(self, other: OtherType) -> Any:
-        return cake.Expression(cake.Power(other, self.copy()))
+        return cake.Expression(cake.Power(other, self._share()))
 
     __ipow__ = __pow__
 
@@ -251,9 +382,9 @@ class Function(cake.IFunction, ABC):
                 f = self.copy()
                 f.power -= other.power
                 return f
-        return cake.Expression(cake.Divide(self.copy(), other))
+        return cake.Expression.wrap(cake.Divide(self._share(), other))
 
     def __rtruediv__(self, other: OtherType) -> Any:
-        return cake.Expression(cake.Divide(other, self.copy()))
+        return cake.Expression.wrap(cake.Divide(other, self._share()))
 
     __itruediv__ = __truediv__
\ No newline at end of file
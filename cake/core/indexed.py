@@ -0,0 +1,96 @@
+## Arrays of symbols
+##
+## >>> w = IndexedSymbol('w', 10_000)
+## >>> f = w[0] * 3 + w[1]
+## >>> f.solve(w=numpy.array([...]))
+##
+## Elements are only created when indexed, rather than creating every Variable up front
+## like Variable.many, and are solved from a single array rather than a keyword per element.
+##
+from __future__ import annotations
+from typing import Any, Iterator, List, Optional, Union
+import operator
+
+from .symbols import table
+import cake
+
+
+class IndexedSymbol:
+    ''' Represents the symbols ``name[0]`` to ``name[size - 1]`` without creating a :class:`Variable` for each of them,
+    elements are created when indexed and are solved using an array passed under the name of the symbol.
+
+    .. code-block:: py
+
+        >>> w = IndexedSymbol('w', 10_000)
+        >>> w
+        IndexedSymbol('w', 10000)
+        >>> w[3]
+        Variable('w[3]', coefficient=1, power=1)
+        >>> f = w[0] * 2 + w[9_999]
+        >>> f.solve(w=numpy.arange(10_000))
+        Integral(9999)
+
+    Parameters
+    ----------
+    name: :class:`str`
+        Name of the symbol
+    size: :class:`int`
+        Number of elements in the symbol
+    '''
+    __slots__ = ('name', 'size')
+
+    def __init__(self, name: str, size: int) -> None:
+        size = operator.index(size)
+        if size < 0:
+            raise ValueError('Size of an indexed symbol cannot be negative')
+
+        self.name = name
+        self.size = size
+
+    def __repr__(self) -> str:
+        return f'IndexedSymbol({self.name!r}, {self.size})'
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[cake.Variable]:
+        for index in range(self.size):
+            yield self[index]
+
+    def _index(self, index: Any) -> int:
+        index = operator.index(index)
+        if index < 0:
+            index += self.size
+
+        if not 0 <= index < self.size:
+            raise IndexError(f'{self.name} index out of range')
+        return index
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[cake.Variable, List[cake.Variable]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.size))]
+
+        i = self.symbol_id(index)
+        return cake.Variable(table.name(i))
+
+    def __contains__(self, variable: Any) -> bool:
+        return self.index_of(variable) is not None
+
+    def symbol_id(self, index: int) -> int:
+        ''' Returns the id of an element within the symbol table '''
+        return table.intern_index(self.name, self._index(index))
+
+    def index_of(self, variable: Any) -> Optional[int]:
+        ''' Returns the index of a variable within the symbol, ``None`` if it isn't an element of it.
+
+        .. code-block:: py
+
+            >>> w.index_of(w[5])
+            5
+            >>> w.index_of(Variable('x'))
+            None
+        '''
+        base, index = table.indices.get(getattr(variable, 'symbol_id', None), (None, None))
+        if base != self.name or index >= self.size:
+            return None
+        return index
@@ -0,0 +1,266 @@
+## Sparse multivariate polynomials
+##
+## Terms are stored as a mapping of exponent tuples to coefficients,
+## exponents are paired with the position of their symbol in the polynomials symbol index.
+##
+## 3x**2y + 5 -> symbols=['x', 'y'], terms={((0, 2), (1, 1)): 3, (): 5}
+##
+## Only non zero exponents are kept, so wide polynomials with thousands of symbols
+## still have small keys and new symbols can be appended without re-keying existing terms.
+##
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numbers
+
+from . import symbols
+import cake
+
+Monomial = Tuple[Any, ...]
+
+
+def _exponent(power: Any) -> Any:
+    power = getattr(power, 'value', power)
+    if isinstance(power, bool) or not isinstance(power, numbers.Real):
+        return None
+    return power
+
+
+def _freeze(exponents: Dict[int, Any]) -> Monomial:
+    return tuple(sorted((p, e) for p, e in exponents.items() if e))
+
+
+def _multiply_keys(k1: Monomial, k2: Monomial) -> Monomial:
+    if not k1:
+        return k2
+    elif not k2:
+        return k1
+
+    exponents = dict(k1)
+    for position, exponent in k2:
+        exponents[position] = exponents.get(position, 0) + exponent
+    return _freeze(exponents)
+
+
+def as_monomial(node: Any) -> Optional[Tuple[Any, List[Tuple[str, Any]]]]:
+    ''' Splits a node into its coefficient and a list of ``(symbol, exponent)`` pairs,
+    ``None`` is returned if the node cannot be represented as a monomial.
+
+    .. code-block:: py
+
+        >>> as_monomial(Variable('x', 3, 2))
+        (3, [('x', 2)])
+        >>> as_monomial(Integral(5))
+        (Integral(5), [])
+        >>> as_monomial(Sin(x))
+        None
+    '''
+    if isinstance(node, numbers.Number):
+        return node, []
+
+    if isinstance(node, cake.Variable):
+        ## Constants hold a value of their own, they are left as they are
+        if getattr(node, '_to_type', None):
+            return None
+
+        exponent = _exponent(node.power)
+        if exponent is None or not isinstance(node.coefficient, numbers.Number):
+            return None
+        return node.coefficient, [(node.representation, exponent)]
+
+    if isinstance(node, cake.VariableGroup):
+        if not isinstance(node.coefficient, numbers.Number):
+            return None
+
+        powers = []
+        for i, exponent in node.monomial:
+            exponent = _exponent(exponent)
+            if exponent is None:
+                return None
+            powers.append((symbols.name(i), exponent))
+        return node.coefficient, powers
+
+    return None
+
+
+class SparsePolynomial(object):
+    ''' Internal representation of a sum of :class:`Variable` and :class:`VariableGroup` terms,
+    used for combining like terms and expanding products without going through operator dispatch.
+
+    .. code-block:: py
+
+        >>> p = SparsePolynomial.from_node(x + 1)
+        >>> q = SparsePolynomial.from_node(y + 2)
+        >>> (p * q).as_node()
+        Expression(xy + 2x + y + 2)
+    '''
+    __slots__ = ('symbols', 'index', 'terms')
+
+    def __init__(self) -> None:
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.terms: Dict[Monomial, Any] = {}
+
+    @classmethod
+    def from_node(cls, node: Any) -> Optional[SparsePolynomial]:
+        ''' Builds a polynomial from a node or expression,
+        returns ``None`` if any of the terms cannot be represented.
+        '''
+        node = getattr(node, 'exp', node)
+        poly = cls()
+
+        if isinstance(node, cake.Add):
+            for child in node.nodes:
+                if poly.add_node(child) is None:
+                    return None
+            return poly
+
+        if poly.add_node(node) is None:
+            return None
+        return poly
+
+    def copy(self) -> SparsePolynomial:
+        ''' Returns a shallow copy of the polynomial '''
+        poly = SparsePolynomial()
+        poly.symbols = self.symbols.copy()
+        poly.index = self.index.copy()
+        poly.terms = self.terms.copy()
+        return poly
+
+    ''' Term handling '''
+
+    def _intern(self, symbol: str) -> int:
+        position = self.index.get(symbol)
+        if position is None:
+            position = self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return position
+
+    def key(self, powers: List[Tuple[str, Any]]) -> Monomial:
+        ''' Returns the exponent tuple for a list of ``(symbol, exponent)`` pairs '''
+        if len(powers) == 1:
+            symbol, exponent = powers[0]
+            return ((self._intern(symbol), exponent),) if exponent else ()
+
+        exponents = {}
+        for symbol, exponent in powers:
+            position = self._intern(symbol)
+            exponents[position] = exponents.get(position, 0) + exponent
+        return _freeze(exponents)
+
+    def add_term(self, key: Monomial, coefficient: Any) -> None:
+        ''' Adds a coefficient onto the term with the given exponents '''
+        if key in self.terms:
+            self.terms[key] = self.terms[key] + coefficient
+        else:
+            self.terms[key] = coefficient
+
+    def add_node(self, node: Any) -> Optional[Monomial]:
+        ''' Adds a monomial node into the polynomial, returning the key it was stored under.
+        ``None`` is returned and the polynomial is left untouched if the node is not a monomial.
+        '''
+        monomial = as_monomial(node)
+        if monomial is None:
+            return None
+
+        coefficient, powers = monomial
+        key = self.key(powers)
+        self.add_term(key, coefficient)
+        return key
+
+    def _align(self, other: SparsePolynomial) -> Dict[Monomial, Any]:
+        if other.symbols == self.symbols[:len(other.symbols)]:
+            return other.terms
+
+        positions = [self._intern(symbol) for symbol in other.symbols]
+        terms = {}
+        for key, coefficient in other.terms.items():
+            terms[tuple(sorted((positions[p], e) for p, e in key))] = coefficient
+        return terms
+
+    def prune(self) -> SparsePolynomial:
+        ''' Removes any terms with a coefficient of 0 '''
+        self.terms = {k: v for k, v in self.terms.items() if v != 0}
+        return self
+
+    ''' Conversions '''
+
+    def node(self, key: Monomial) -> Any:
+        ''' Creates the cake node for a single term '''
+        coefficient = self.terms[key]
+        powers = [(self.symbols[p], e) for p, e in key]
+
+        if not powers:
+            return cake.Number.convert(coefficient)
+        elif len(powers) == 1:
+            return cake.Variable(powers[0][0], coefficient, powers[0][1])
+        return cake.VariableGroup.from_monomial(coefficient, tuple(sorted((symbols.intern(s), e) for s, e in powers)))
+
+    def to_nodes(self) -> List[Any]:
+        ''' Returns a list of nodes for each non zero term '''
+        return [self.node(key) for key, coefficient in self.terms.items() if coefficient != 0]
+
+    def as_node(self) -> Any:
+        ''' Returns the polynomial in its simplest form,
+        either a number, a single variable or an :class:`Expression`.
+        '''
+        nodes = self.to_nodes()
+        if not nodes:
+            return cake.Integral(0)
+        elif len(nodes) == 1:
+            return nodes[0]
+        return cake.Expression(cake.Add(*nodes))
+
+    ''' Arithmetic '''
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __iter__(self) -> Iterator[Tuple[Monomial, Any]]:
+        return iter(self.terms.items())
+
+    def __add__(self, other: SparsePolynomial) -> SparsePolynomial:
+        result = self.copy()
+        for key, coefficient in result._align(other).items():
+            result.add_term(key, coefficient)
+        return result.prune()
+
+    def __neg__(self) -> SparsePolynomial:
+        result = self.copy()
+        result.terms = {k: -v for k, v in self.terms.items()}
+        return result
+
+    def __sub__(self, other: SparsePolynomial) -> SparsePolynomial:
+        return self + (-other)
+
+    def __mul__(self, other: Any) -> SparsePolynomial:
+        result = self.copy()
+        result.terms = {}
+
+        if not isinstance(other, SparsePolynomial):
+            for key, coefficient in self.terms.items():
+                result.terms[key] = coefficient * other
+            return result.prune()
+
+        other_terms = result._align(other)
+        for k1, c1 in self.terms.items():
+            for k2, c2 in other_terms.items():
+                result.add_term(_multiply_keys(k1, k2), c1 * c2)
+        return result.prune()
+
+    __rmul__ = __mul__
+
+    def __pow__(self, n: int) -> SparsePolynomial:
+        if not isinstance(n, int) or n < 0:
+            raise ValueError('Polynomials can only be raised to non-negative integer powers')
+
+        result = SparsePolynomial()
+        result.terms[()] = 1
+        base = self
+
+        while n:
+            if n & 1:
+                result = result * base
+            n >>= 1
+            if n:
+                base = base * base
+        return result
@@ -0,0 +1,114 @@
+## Interned symbols
+##
+## Every symbol name is given a small integer id the first time it's used,
+## >>> intern('x'), intern('y'), intern('x')
+## (0, 1, 0)
+##
+## Variables compare, sort and hash by their id rather than building and comparing strings,
+## and backends which evaluate many symbols at once can bind values by position.
+## Ids are never reused, so they stay valid for the lifetime of the process.
+##
+## Elements of indexed symbols, such as w[3], are interned with the base and index they came from,
+## so their value can be read from a single array passed as w=array.
+##
+from __future__ import annotations
+from typing import Any, Dict, FrozenSet, Iterator, List, Mapping, Optional, Tuple
+
+
+class SymbolTable:
+    ''' Maps symbol names to small integer ids and holds the assumptions made about each symbol.
+
+    .. code-block:: py
+
+        >>> table = SymbolTable()
+        >>> table.intern('x'), table.intern('y')
+        (0, 1)
+        >>> table.name(1)
+        'y'
+        >>> table.id('z')
+        None
+    '''
+    __slots__ = ('_ids', '_names', 'assumptions', 'indices')
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self.assumptions: Dict[int, FrozenSet[str]] = {}
+        self.indices: Dict[int, Tuple[str, int]] = {}
+
+    def __repr__(self) -> str:
+        return f'SymbolTable(symbols={len(self._names)})'
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def intern(self, name: str) -> int:
+        ''' Returns the id of a symbol, giving it the next id if it hasn't been seen before '''
+        try:
+            return self._ids[name]
+        except KeyError:
+            self._ids[name] = i = len(self._names)
+            self._names.append(name)
+            return i
+
+    def intern_index(self, base: str, index: int) -> int:
+        ''' Returns the id of the element ``base[index]``, recording where it came from '''
+        i = self.intern(f'{base}[{index}]')
+        self.indices[i] = (base, index)
+        return i
+
+    def lookup(self, i: int, values: Mapping[str, Any], default: Any = None) -> Any:
+        ''' Finds the value of a symbol within keyword values,
+        elements of indexed symbols are also read from an array passed under their base name.
+
+        .. code-block:: py
+
+            >>> i = table.intern_index('w', 2)
+            >>> table.lookup(i, {'w': [5, 6, 7]})
+            7
+        '''
+        name = self._names[i]
+        if name in values:
+            return values[name]
+
+        if i in self.indices:
+            base, index = self.indices[i]
+            if base in values:
+                return values[base][index]
+        return default
+
+    def id(self, name: str) -> Optional[int]:
+        ''' Returns the id of a symbol without interning it, ``None`` if it hasn't been seen '''
+        return self._ids.get(name)
+
+    def name(self, i: int) -> str:
+        ''' Returns the name of the symbol with the given id '''
+        return self._names[i]
+
+
+table = SymbolTable()
+''' The symbol table used by every :class:`Variable` '''
+
+
+def intern(name: str) -> int:
+    ''' Returns the id of a symbol within the global :data:`table` '''
+    return table.intern(name)
+
+
+def symbol_id(symbol: Any) -> int:
+    ''' Returns the id of a symbol, which may be given as a name or a :class:`Variable` '''
+    i = getattr(symbol, 'symbol_id', None)
+    if i is None:
+        return table.intern(str(symbol))
+    return i
+
+
+def name(i: int) -> str:
+    ''' Returns the name of the symbol with the given id within the global :data:`table` '''
+    return table.name(i)
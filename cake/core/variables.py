@@ -9,18 +9,24 @@ from cake import (
     Comparity, ComparitySymbol,
     Add, Divide, Multiply, Power, FloorDiv,
     Modulo,
-    utils
+    utils,
+    options
 )
 from cake.basic import OtherType
 from .numbers import Number, Integral
-from typing import Any, Generic, TypeVar, Union
+from .assumptions import assume, assumptions as assumed
+from .symbols import table, intern, name
+from typing import Any, FrozenSet, Generic, Iterable, Optional, Tuple, TypeVar, Union
 from operator import mul
 from functools import reduce
+import numbers
 
 from .expressions.binaries import *
+from .expressions.substitution import Substitution
 
 U = TypeVar('U', bound=IVariable)
 ResultType = Union[IVariable, BasicExpression, U]
+Monomial = Tuple[Tuple[str, Any], ...]
 
 
 ''' Meths implemented
@@ -51,73 +57,90 @@ class BasicVariable(ABC):
     def copy(self) -> U:
         raise NotImplemented
 
-    def __pos__(self) -> U:
+    def _share(self) -> U:
+        ## Nodes can be shared between trees when they are never modified in place
+        if options.immutable_nodes:
+            return self
         return self.copy()
 
+    def subs(self, mapping: dict = None, /, **values) -> Any:
+        ''' Replaces variables with other values, see :meth:`Expression.subs`
+
+        .. code-block:: py
+
+            >>> (x * y * z).subs(y=2)
+            VariableGroup(2xz)
+        '''
+        mapping = dict(mapping or {}, **values)
+        return Substitution(mapping).visit(self)
+
+    def __pos__(self) -> U:
+        return self._share()
+
     def __abs__(self) -> U:
         if hasattr(self, 'coefficient'):
             if self.coefficient > 0:
-                return self.copy()
+                return self._share()
             copy = self.copy()
             copy.coefficient = -copy.coefficient
             return copy
         return self
 
     def __floordiv__(self, other) -> Expression:
-        return Expression(FloorDiv(self.copy(), other))
+        return Expression.wrap(FloorDiv(self._share(), other))
 
     def __rfloordiv__(self, other) -> Expression:
-        return Expression(FloorDiv(other, self.copy()))
+        return Expression.wrap(FloorDiv(other, self._share()))
 
     __ifloordiv__ = __floordiv__
 
     def __mod__(self, other) -> Expression:
-        return Expression(Modulo(self.copy(), other))
+        return Expression.wrap(Modulo(self._share(), other))
 
     def __rmod__(self, other) -> Expression:
-        return Expression(Modulo(other, self.copy()))
+        return Expression.wrap(Modulo(other, self._share()))
 
     __imod__ = __mod__
 
     ''' Misc '''
 
     def __lshift__(self, other: OtherType) -> Expression:
-        return Expression(LeftShift(self.copy(), other))
+        return Expression.wrap(LeftShift(self._share(), other))
 
     def __rlshift__(self, other: OtherType) -> Expression:
-        return Expression(LeftShift(other, self.copy()))
+        return Expression.wrap(LeftShift(other, self._share()))
 
     __ilshift__ = __lshift__
 
     def __rshift__(self, other: OtherType) -> Expression:
-        return Expression(RightShift(self.copy(), other))
+        return Expression.wrap(RightShift(self._share(), other))
 
     def __rrshift__(self, other: OtherType) -> Expression:
-        return Expression(RightShift(other, self.copy()))
+        return Expression.wrap(RightShift(other, self._share()))
 
     __irshift__ = __rshift__
 
     def __and__(self, other: OtherType) -> Expression:
-        return Expression(And(self.copy(), other))
+        return Expression.wrap(And(self._share(), other))
 
     def __rand__(self, other: OtherType) -> Expression:
-        return Expression(And(other, self.copy()))
+        return Expression.wrap(And(other, self._share()))
 
     __iand__ = __and__
 
     def __xor__(self, other: OtherType) -> Expression:
-        return Expression(Xor(self.copy(), other))
+        return Expression.wrap(Xor(self._share(), other))
 
     def __rxor__(self, other: OtherType) -> Expression:
-        return Expression(Xor(other, self.copy()))
+        return Expression.wrap(Xor(other, self._share()))
 
     __ixor__ = __xor__
 
     def __or__(self, other: OtherType) -> Expression:
-        return Expression(LeftShift(self.copy(), other))
+        return Expression.wrap(Or(self._share(), other))
 
     def __ror__(self, other: OtherType) -> Expression:
-        return Expression(LeftShift(other, self.copy()))
+        return Expression.wrap(Or(other, self._share()))
 
     __ior__ = __or__
 
@@ -132,7 +155,15 @@ class BasicVariable(ABC):
 
         ## Variable('x', coefficient=2) -> 2x
         ## Variable('x', coefficient=3) -> 3x
-        ## '2x' == '3x' == False -> False is returned.
+        ## Same symbol id, but 2 != 3 -> False is returned.
+        if isinstance(self, Variable):
+            return (
+                self.symbol_id == other.symbol_id
+                and _equal(self.power, other.power)
+                and _equal(self.coefficient, other.coefficient)
+            )
+        elif isinstance(self, VariableGroup):
+            return self.is_similar(self, other) and _equal(self.coefficient, other.coefficient)
         return str(self) == str(other)
 
     def __ne__(self, other: OtherType) -> Union[Comparity, bool]:
@@ -145,16 +176,16 @@ class BasicVariable(ABC):
         return r
 
     def __lt__(self, other: OtherType) -> Comparity:
-        return Comparity(self.copy(), other, ComparitySymbol.LESS_THAN)
+        return Comparity(self._share(), other, ComparitySymbol.LESS_THAN)
 
     def __le__(self, other: OtherType) -> Comparity:
-        return Comparity(self.copy(), other, ComparitySymbol.LESS_OR_EQUAL_TO)
+        return Comparity(self._share(), other, ComparitySymbol.LESS_OR_EQUAL_TO)
 
     def __gt__(self, other: OtherType) -> Comparity:
-        return Comparity(self.copy(), other, ComparitySymbol.GREATER_THAN)
+        return Comparity(self._share(), other, ComparitySymbol.GREATER_THAN)
 
     def __ge__(self, other: OtherType) -> Comparity:
-        return Comparity(self.copy(), other, ComparitySymbol.GREATER_OR_EQUAL_TO)
+        return Comparity(self._share(), other, ComparitySymbol.GREATER_OR_EQUAL_TO)
 
 
 ''' Meths implemented
@@ -202,8 +233,29 @@ class Variable(IVariable, BasicVariable):
 
             print(f.evaluate(x=90))
             # 1
+
+    .. tip::
+        Assumptions about a symbol let expressions simplify safely
+
+        .. code-block:: py
+
+            >>> x = Variable('x', assumptions={'positive', 'integer'})
+            >>> Sqrt(x ** 2)
+            Variable('x', coefficient=1, power=1)
+            >>> (x * 2) // 2
+            Variable('x', coefficient=1, power=1)
+
+    .. warning::
+        Assumptions belong to the symbol rather than the variable,
+        ``Variable('x', assumptions=facts)`` registers them with :func:`cake.assume` so every ``Variable('x')`` shares them.
+        Giving different assumptions for a symbol which already has some raises :py:obj:`ValueError`,
+        use :func:`cake.assume` to replace them or :func:`cake.forget` to remove them.
     '''
-    def __new__(cls, repr: str, coefficient: Any = 1, power: Any = 1) -> Union[Number, Variable]:
+    def __new__(cls, repr: str, coefficient: Any = 1, power: Any = 1, *,
+                assumptions: Optional[Iterable[str]] = None) -> Union[Number, Variable]:
+        if assumptions is not None:
+            assume(repr, assumptions, replace=False)
+
         if power == 0:
             return Integral(1) * coefficient
         elif coefficient == 0:
@@ -211,17 +263,38 @@ class Variable(IVariable, BasicVariable):
 
         return super(Variable, cls).__new__(cls)
 
+    def __init__(self, repr: str, coefficient: Any = 1, power: Any = 1, *,
+                 assumptions: Optional[Iterable[str]] = None) -> None:
+        super().__init__(repr, coefficient, power)
+
+    @property
+    def assumptions(self) -> FrozenSet[str]:
+        ''' Assumptions made about the variables symbol, such as ``'positive'`` or ``'integer'``.
+        These are shared by every variable using the same symbol.
+
+        .. code-block:: py
+
+            >>> x = Variable('x', assumptions={'positive'})
+            >>> Variable('x').assumptions
+            frozenset({'nonnegative', 'nonzero', 'positive', 'real'})
+        '''
+        return assumed(self.representation)
+
     def copy(self) -> Variable:
         ''' Returns a shallow copy of the variable '''
         return Variable(self.representation, self.coefficient, self.power)
 
+    def __hash__(self) -> int:
+        ## Allows variables to be used as keys, such as in ``Expression.subs({x: 5})``
+        return hash(self.symbol_id)
+
     @staticmethod
     def is_similar(x: Variable, y: Variable) -> bool:
         ''' Returns whether 2 Variables can interact with one another,
 
         so ``Variable.is_similar(3x, 4x)`` is True but ``Variable.is_similar(4y, 3x)`` is False.
         '''
-        if not (x.representation == y.representation):
+        if not (x.symbol_id == y.symbol_id):
             return False
         elif not (x.power == y.power):
             return False
@@ -249,11 +322,15 @@ class Variable(IVariable, BasicVariable):
             18
             >>> x.solve(x=2, y=3)
             18
+            >>> w = Variable.array('w', 3)
+            >>> w[2].solve(w=[4, 5, 6])
+            6
         '''
         v = value
         if v is None:
-            v = _v.pop(self.representation, None)
-        v = v or getattr(v, 'value', None)
+            v = table.lookup(self.symbol_id, _v)
+            _v.pop(self.representation, None)
+        v = getattr(v, 'value', v)
 
         if v is None:
             raise ValueError('No value provided')
@@ -267,9 +344,9 @@ class Variable(IVariable, BasicVariable):
             return Variable(self.representation, co, self.power)
 
         elif isinstance(other, BasicExpression):
-            return Expression(Add(self.copy(), other.exp))
+            return Expression(Add(self._share(), other.exp))
 
-        return Expression(Add(self.copy(), other))
+        return Expression(Add(self._share(), other))
 
     __radd__ = __add__
     __iadd__ = __add__
@@ -279,7 +356,7 @@ class Variable(IVariable, BasicVariable):
             co = self.coefficient - other.coefficient
             return Variable(self.representation, co, self.power)
 
-        return Expression(Add(self.copy(), -other))
+        return Expression(Add(self._share(), -other))
 
     def __rsub__(self, other: OtherType) -> ResultType:
         if isinstance(other, Variable) and self.is_similar(self, other):
@@ -294,7 +371,7 @@ class Variable(IVariable, BasicVariable):
         if isinstance(other, BasicExpression):
             return other * self
         elif isinstance(other, Variable):
-            if self.representation == other.representation:
+            if self.symbol_id == other.symbol_id:
                 co = self.coefficient * other.coefficient
                 po = self.power + other.power
                 return Variable(self.representation, co, po)
@@ -315,9 +392,9 @@ class Variable(IVariable, BasicVariable):
 
     def __truediv__(self, other: OtherType) -> ResultType:
         if isinstance(other, BasicExpression):
-            return Expression(Divide(self.copy(), other))
+            return Expression.wrap(Divide(self._share(), other))
         
-        elif isinstance(other, Variable) and other.representation == self.representation:
+        elif isinstance(other, Variable) and other.symbol_id == self.symbol_id:
             coefficient = self.coefficient / other.coefficient
             power = self.power - other.power
 
@@ -325,13 +402,13 @@ class Variable(IVariable, BasicVariable):
         elif isinstance(other, VariableGroup):
             return other.__rtruediv__(self)
         
-        return Expression(Divide(self.copy(), other))
+        return Expression.wrap(Divide(self._share(), other))
 
     def __rtruediv__(self, other: OtherType) -> ResultType:
         if isinstance(other, BasicExpression):
-            return Expression(Divide(other, self.copy()))
+            return Expression.wrap(Divide(other, self._share()))
 
-        elif isinstance(other, Variable) and other.representation == self.representation:
+        elif isinstance(other, Variable) and other.symbol_id == self.symbol_id:
             coefficient = other.coefficient - self.coefficient
             power = other.power - self.power
 
@@ -339,7 +416,7 @@ class Variable(IVariable, BasicVariable):
         elif isinstance(other, VariableGroup):
             return other.__truediv__(self)
         
-        return Expression(Divide(other, self.copy()))
+        return Expression.wrap(Divide(other, self._share()))
 
     __itruediv__ = __truediv__
 
@@ -349,13 +426,13 @@ class Variable(IVariable, BasicVariable):
         r = Variable(self.representation, coefficient, power)
 
         if modulo:
-            return Expression(Modulo(r, modulo[0]))
+            return Expression.wrap(Modulo(r, modulo[0]))
         return r
 
     def __rpow__(self, other: OtherType, *modulo) -> ResultType:
         if modulo:
-            return RaisedVariable(base=other, power=self.copy()).__mod__(modulo[0])
-        return RaisedVariable(base=other, power=self.copy())
+            return RaisedVariable(base=other, power=self._share()).__mod__(modulo[0])
+        return RaisedVariable(base=other, power=self._share())
 
     __ipow__ = __pow__
 
@@ -422,7 +499,7 @@ class RaisedVariable(Generic[U], BasicNode, BasicVariable):
     __iadd__ = __add__
 
     def __sub__(self, other: OtherType) -> Expression:
-        return Expression(Add(self.copy(), -other))
+        return Expression(Add(self._share(), -other))
 
     def __rsub__(self, other: OtherType) -> Expression:
         return Expression(Add(-self, other))
@@ -430,7 +507,12 @@ class RaisedVariable(Generic[U], BasicNode, BasicVariable):
     __isub__ = __sub__
 
     def __mul__(self, other: OtherType) -> Expression:
-        return Expression(Multiply(self.copy(), other))
+        ## Identical bases are merged, 3 ** x * 3 ** y -> 3 ** (x + y)
+        if isinstance(other, RaisedVariable) and (
+            other.base is self.base or ((x := other.base == self.base) and not isinstance(x, Comparity))
+        ):
+            return RaisedVariable(self.base, self.power + other.power)
+        return Expression(Multiply(self._share(), other))
     
     __rmul__ = __mul__
     __imul__ = __mul__
@@ -440,16 +522,16 @@ class RaisedVariable(Generic[U], BasicNode, BasicVariable):
         return RaisedVariable(-self.base, self.power)
 
     def __truediv__(self, other: OtherType) -> Expression:
-        return Expression(Divide(self.copy(), other))
+        return Expression.wrap(Divide(self._share(), other))
 
     def __rtruediv__(self, other: OtherType) -> Expression:
-        return Expression(Divide(other, self.copy()))
+        return Expression.wrap(Divide(other, self._share()))
 
     __itruediv__ = __truediv__
 
     def __pow__(self, other: OtherType, *modulo) -> RaisedVariable:
         if modulo:
-            return Expression(Modulo(RaisedVariable(self.base, self.power * other), modulo[0]))
+            return Expression.wrap(Modulo(RaisedVariable(self.base, self.power * other), modulo[0]))
         return RaisedVariable(self.base, self.power * other)
 
     def __rpow__(self, other: OtherType, *modulo) -> ResultType:
@@ -459,7 +541,7 @@ class RaisedVariable(Generic[U], BasicNode, BasicVariable):
             return other
         
         if modulo:
-            return Expression(Modulo(Power(other, self), modulo[0]))
+            return Expression.wrap(Modulo(Power(other, self), modulo[0]))
         return Expression(Power(other, self))
 
     __ipow__ = __pow__
@@ -473,10 +555,58 @@ __mul__, __rmul__, __imul__, __neg__
 __truediv__, __rtruediv__, __itruediv__
 __pow__, __rpow__, __ipow__
 '''
+def _equal(a: Any, b: Any) -> bool:
+    if isinstance(a, numbers.Number) and isinstance(b, numbers.Number):
+        return a == b
+    return a is b or str(a) == str(b)
+
+
+def _is_zero(exponent: Any) -> bool:
+    value = getattr(exponent, 'value', exponent)
+    return isinstance(value, numbers.Number) and value == 0
+
+
+def _exponent_key(exponent: Any) -> Any:
+    ## Numbers aren't hashable, their values are used instead
+    value = getattr(exponent, 'value', exponent)
+    if isinstance(value, numbers.Number):
+        return value
+    return repr(value)
+
+
+def _merge(m1: Monomial, m2: Monomial, sign: int = 1) -> Monomial:
+    ## Merges 2 sorted monomials, adding (or subtracting) the exponents of shared symbols
+    result = []
+    i = j = 0
+
+    while i < len(m1) and j < len(m2):
+        (s1, e1), (s2, e2) = m1[i], m2[j]
+        if s1 == s2:
+            exponent = e1 + e2 if sign == 1 else e1 - e2
+            if not _is_zero(exponent):
+                result.append((s1, exponent))
+            i += 1
+            j += 1
+        elif s1 < s2:
+            result.append(m1[i])
+            i += 1
+        else:
+            result.append((s2, e2 if sign == 1 else -e2))
+            j += 1
+
+    result.extend(m1[i:])
+    result.extend((s, e if sign == 1 else -e) for s, e in m2[j:])
+    return tuple(result)
+
+
 class VariableGroup(Generic[U], BasicNode, BasicVariable):
     ''' An Variable group is used where multiple Variables make up a single Variable value,
     So, ``5x`` is an Variable whereas ``5x * y`` would be an VariableGroup as theres 2 values.
 
+    Groups are stored as a :attr:`VariableGroup.monomial`,
+    a tuple of ``(symbol id, exponent)`` pairs sorted by the ids from the symbol table,
+    so multiplying groups is a merge of 2 tuples and checking similarity is a tuple comparison.
+
     .. warning::
         Reading coffecients from :attr:`VariableGroup.groups` will always be one,
         instead use :attr:`VariableGroup.coefficient`.
@@ -491,11 +621,11 @@ class VariableGroup(Generic[U], BasicNode, BasicVariable):
         >>> g = x * y
         >>> g
         VariableGroup(xy)
-        >>> g.groups
-        [Variable('x'), Variable('y')]
+        >>> g.monomial
+        ((0, 1), (1, 1))
         >>> g * y
         VariableGroup(xy**2)
-        # Groups == [Variable('x'), Variable('y', power=2, ...)]
+        # Monomial == ((0, 1), (1, 2))
         >>> g + y
         Expression(xy + y)
     '''
@@ -509,20 +639,77 @@ class VariableGroup(Generic[U], BasicNode, BasicVariable):
     def __init__(self, coefficient: Any, *Variables) -> None:
         self.coefficient = coefficient
         self.power = None
-        self.groups = []
 
+        powers = {}
         for group in Variables:
             if isinstance(group, Variable):
-                group = Variable(group.representation, 1, group.power)
-                self.groups.append(group)
+                i = group.symbol_id
+                powers[i] = powers[i] + group.power if i in powers else group.power
             else:
                 self.coefficient *= group
 
+        self._set(tuple(sorted((s, e) for s, e in powers.items() if not _is_zero(e))))
+
+    def _set(self, monomial: Monomial) -> None:
+        self.monomial = monomial
+        self._hash = hash(tuple((s, _exponent_key(e)) for s, e in monomial))
+
+    @classmethod
+    def from_monomial(cls, coefficient: Any, monomial: Monomial) -> ResultType:
+        ''' Creates a group directly from a sorted tuple of ``(symbol id, exponent)`` pairs,
+        an :class:`Variable` or number is returned when there are less than 2 symbols.
+
+        .. code-block:: py
+
+            >>> x, y = Variable.many('x', 'y')
+            >>> VariableGroup.from_monomial(3, ((x.symbol_id, 2), (y.symbol_id, 1)))
+            VariableGroup(3x**2y)
+            >>> VariableGroup.from_monomial(3, ((x.symbol_id, 2),))
+            Variable('x', coefficient=3, power=2)
+
+        Parameters
+        ----------
+        coefficient: Any
+            Coefficient of the group
+        monomial: Tuple[Tuple[:class:`int`, Any], ...]
+            Pairs of symbol ids and exponents, sorted by id with no zero exponents
+        '''
+        if isinstance(coefficient, numbers.Number) and coefficient == 0:
+            return Integral(0)
+        elif not monomial:
+            return Number.convert(coefficient) if isinstance(coefficient, numbers.Number) else coefficient
+        elif len(monomial) == 1:
+            return Variable(name(monomial[0][0]), coefficient, monomial[0][1])
+
+        group = super(VariableGroup, cls).__new__(cls)
+        group.coefficient = coefficient
+        group.power = None
+        group._set(monomial)
+        return group
+
+    @property
+    def groups(self) -> list:
+        ''' The variables which make up the group, each with a coefficient of 1 '''
+        return [Variable(name(s), 1, e) for s, e in self.monomial]
+
+    @groups.setter
+    def groups(self, value: list) -> None:
+        self._set(VariableGroup(1, *value).monomial)
+
+    def __hash__(self) -> int:
+        return self._hash
+
     def __repr__(self) -> str:
         return f'VariableGroup({self.__str__()})'
 
+    def _parts(self) -> list:
+        parts = [f'{self.coefficient}'] if self.coefficient != 1 else []
+        for s, e in self.monomial:
+            parts.append(name(s) if e == 1 else f'{name(s)}**{e}')
+        return parts
+
     def __str__(self) -> str:
-        return (str(self.coefficient) if self.coefficient != 1 else '') + ''.join(map(lambda x: f'{x.representation}{f"**{x.power}" if x.power != 1 else ""}', self.groups))
+        return ''.join(self._parts())
 
 
     @staticmethod
@@ -545,14 +732,9 @@ class VariableGroup(Generic[U], BasicNode, BasicVariable):
         x, y: :class:`VariableGroup`
             2 Groups to be compared.
         '''
-        if len(x.groups) != len(y.groups):
-            return False
-        
-        x = {f'{i.representation}**{i.power}' for i in x.groups}
-        y = {f'{i.representation}**{i.power}' for i in x.groups}
-        return x == y
+        return x._hash == y._hash and x.monomial == y.monomial
 
-    @classmethod
+    @staticmethod
     def is_roughly_similar(x: VariableGroup, y: VariableGroup) -> bool:
         ''' 
         Checks if 2 variable groups are roughly similar, meaning they can broadly interact. 
@@ -573,15 +755,14 @@ class VariableGroup(Generic[U], BasicNode, BasicVariable):
         x, y: :class:`VariableGroup`
             2 Groups to be compared.
         '''
-        x_k = set(x.as_mapping().keys())
-        y_k = set(y.as_mapping().keys())
-
-        return x_k == y_k
+        return len(x.monomial) == len(y.monomial) and all(
+            i[0] == j[0] for i, j in zip(x.monomial, y.monomial)
+        )
 
     @property
     def representation(self) -> str:
         ''' Returns how the group is represented as, without the group coefficient. ''' 
-        return ''.join(i.representation for i in self.groups)
+        return ''.join(name(s) for s, _ in self.monomial)
 
     def as_mapping(self) -> dict:
         ''' Generates a mapping of the group.
@@ -591,27 +772,15 @@ class VariableGroup(Generic[U], BasicNode, BasicVariable):
             >>> g = x * y
             >>> g.as_mapping()
             {
-                'x': Unknown('x')
-                'y': Unknown('y')
-            }
-            >>> g *= 2
-            >>> g.as_mapping()
-            {
-                'x': Unknown('x', coefficient=2),
-                'y': Unknown('y', coefficient=2)
+                'x': Variable('x'),
+                'y': Variable('y')
             }
         '''
-        d = dict()
-        for u in self.groups:
-            if u.representation not in d:
-                d[u.representation] = u
-            else:
-                d[u.representation] *= u
-        return d
+        return {name(s): Variable(name(s), 1, e) for s, e in self.monomial}
 
     def copy(self) -> VariableGroup:
         ''' Returns a shallow copy of the group '''
-        return VariableGroup(self.coefficient, *self.groups)
+        return VariableGroup.from_monomial(self.coefficient, self.monomial)
 
     def solve(self, **values) -> ResultType:
         ''' Generates a value for the group using inputted values.
@@ -627,19 +796,24 @@ class VariableGroup(Generic[U], BasicNode, BasicVariable):
             xy
         '''
         results = []
-        for node in self.groups:
-            if node.representation in values:
-                results.append(values[node.representation] ** node.power)
-        return Number.convert(reduce(mul, results)) * self.coefficient
+        remaining = []
+        for s, e in self.monomial:
+            if (value := table.lookup(s, values)) is not None:
+                results.append(getattr(value, 'value', value) ** e)
+            else:
+                remaining.append((s, e))
+
+        coefficient = Number.convert(reduce(mul, results, 1)) * self.coefficient
+        return VariableGroup.from_monomial(coefficient, tuple(remaining))
 
     ''' Wrapped methods for handling these groups '''
 
     def __add__(self, other: OtherType) -> ResultType:
         if isinstance(other, VariableGroup):
             if not self.is_similar(self, other):
-                return Expression(Add(self.copy(), other.copy()))
-            return VariableGroup(self.coefficient + other.coefficient, *self.groups)
-        return Expression(Add(self.copy(), other))
+                return Expression(Add(self._share(), other._share()))
+            return VariableGroup.from_monomial(self.coefficient + other.coefficient, self.monomial)
+        return Expression(Add(self._share(), other))
 
     __radd__ = __add__
     __iadd__ = __add__
@@ -647,15 +821,15 @@ class VariableGroup(Generic[U], BasicNode, BasicVariable):
     def __sub__(self, other: OtherType) -> ResultType:
         if isinstance(other, VariableGroup):
             if not self.is_similar(self, other):
-                return Expression(Add(self.copy(), -other))
-            return VariableGroup(self.coefficient - other.coefficient, *self.groups)
-        return Expression(Add(self.copy(), -other))
+                return Expression(Add(self._share(), -other))
+            return VariableGroup.from_monomial(self.coefficient - other.coefficient, self.monomial)
+        return Expression(Add(self._share(), -other))
 
     def __rsub__(self, other: OtherType) -> ResultType:
         if isinstance(other, VariableGroup):
             if not self.is_similar(self, other):
-                return Expression(Add(-self, other.copy()))
-            return VariableGroup(-self.coefficient + other.coefficient, *self.groups)
+                return Expression(Add(-self, other._share()))
+            return VariableGroup.from_monomial(other.coefficient - self.coefficient, self.monomial)
         return Expression(Add(-self, other))
 
     __isub__ = __sub__
@@ -663,138 +837,79 @@ class VariableGroup(Generic[U], BasicNode, BasicVariable):
     def __mul__(self, other: OtherType) -> None:
         if isinstance(other, VariableGroup):
             coefficient = self.coefficient * other.coefficient
-            mapping = self.as_mapping()
-            for co in other.groups:
-                co.coefficient = 1
-
-                if rep := co.representation in mapping:
-                    mapping[rep] = mapping[rep] * co
-                else:
-                    mapping[rep] = co
-            nodes = mapping.values()
-
-            return VariableGroup(coefficient, *nodes)
+            return VariableGroup.from_monomial(coefficient, _merge(self.monomial, other.monomial))
 
         elif isinstance(other, Variable):
             coefficient = self.coefficient * other.coefficient
-            mapping = self.as_mapping()
-
-            for node in mapping:
-                if other.representation == node:
-                    mapping[node] = mapping[node] * other
-                    break
-            else:
-                mapping[other.representation] = other
-            return VariableGroup(coefficient, *mapping.values())
+            monomial = _merge(self.monomial, ((other.symbol_id, other.power),))
+            return VariableGroup.from_monomial(coefficient, monomial)
 
         coefficient = self.coefficient * other
-        return VariableGroup(coefficient, *self.groups)
+        return VariableGroup.from_monomial(coefficient, self.monomial)
 
     __rmul__ = __mul__
     __imul__ = __mul__
     __call__ = __mul__
 
     def __neg__(self) -> VariableGroup:
-        return VariableGroup(self.coefficient * -1, *self.groups)
+        return VariableGroup.from_monomial(self.coefficient * -1, self.monomial)
 
     def __truediv__(self, other: OtherType) -> ResultType:
         if isinstance(other, VariableGroup):
             coefficient = self.coefficient / other.coefficient
-            mapping = self.as_mapping()
-
-            remaining = []
-            for group in other.groups:
-                if group.representation in mapping:
-                    g1 = mapping[group.representation]
-                    g2 = g1 / group
-                    mapping[group.representation] = g2
-                else:
-                    remaining.append(group)
-            
-            top = VariableGroup(coefficient, *mapping.values())
-            if not remaining:
-                return top
+            symbols = {s for s, _ in self.monomial}
 
-            r = remaining.pop(0)
-            while remaining:
-                r *= remaining.pop(0)
+            ## Symbols missing from this group are kept in the denominator
+            shared = tuple(i for i in other.monomial if i[0] in symbols)
+            remaining = tuple(i for i in other.monomial if i[0] not in symbols)
 
-            return Expression(Divide(top, r))
+            top = VariableGroup.from_monomial(coefficient, _merge(self.monomial, shared, -1))
+            if not remaining:
+                return top
+            return Expression.wrap(Divide(top, VariableGroup.from_monomial(1, remaining)))
         
         elif isinstance(other, Variable):
-            mapping = self.as_mapping()
-
-            if other.representation in mapping:
-                g = mapping[other.representation] / other
-                mapping[other.representation] = g
-
+            if any(s == other.symbol_id for s, _ in self.monomial):
                 coefficient = self.coefficient / other.coefficient
-                return VariableGroup(coefficient, *mapping.values())
+                monomial = _merge(self.monomial, ((other.symbol_id, other.power),), -1)
+                return VariableGroup.from_monomial(coefficient, monomial)
             
-            return Expression(Divide(self.copy(), other))
+            return Expression.wrap(Divide(self._share(), other))
 
         elif isinstance(other, BasicExpression):
-            return Expression(Divide(self.copy(), other))
+            return Expression.wrap(Divide(self._share(), other))
 
-        return VariableGroup(self.coefficient / other, *self.groups)
+        return VariableGroup.from_monomial(self.coefficient / other, self.monomial)
 
     def __rtruediv__(self, other: OtherType) -> ResultType:
         if isinstance(other, VariableGroup):
-            coefficient = other.coefficient / self.coefficient
-            mapping = other.as_mapping()
-
-            remaining = []
-            for group in self.groups:
-                if group.representation in mapping:
-                    g1 = mapping[group.representation]
-                    g2 = g1 / group
-                    mapping[group.representation] = g2
-                else:
-                    remaining.append(group)
-            
-            top = VariableGroup(coefficient, *mapping.values())
-            if not remaining:
-                return top
-
-            r = remaining.pop(0)
-            while remaining:
-                r *= remaining.pop(0)
-
-            return Expression(Divide(top, r))
+            return other.__truediv__(self)
         
         elif isinstance(other, Variable):
-            mapping = self.as_mapping()
-
-            if other.representation in mapping:
-                g = other / mapping[other.representation]
-                
-                if isinstance(g, Number):
-                    mapping.pop(other.representation)
-                bottom = VariableGroup(self.coefficient, *mapping.values())
-
-                return Expression(Divide(g, bottom))
+            for s, e in self.monomial:
+                if s == other.symbol_id:
+                    top = Variable(other.representation, other.coefficient, other.power - e)
+                    monomial = tuple(i for i in self.monomial if i[0] != s)
+                    return Expression.wrap(Divide(top, VariableGroup.from_monomial(self.coefficient, monomial)))
             
-            return Expression(Divide(other, self.copy()))
-
-        elif isinstance(other, BasicExpression):
-            return Expression(Divide(other, self.copy()))
+            return Expression.wrap(Divide(other, self._share()))
 
-        return VariableGroup(other / self.coefficient, *self.groups)
+        return Expression.wrap(Divide(other, self._share()))
 
     __itruediv__ = __truediv__
 
     def __pow__(self, other: OtherType, *modulo) -> VariableGroup:
-        mapping = self.as_mapping()
         coefficient = self.coefficient ** other
+        monomial = tuple((s, e * other) for s, e in self.monomial if not _is_zero(e * other))
 
-        result = VariableGroup(coefficient, *map(lambda x: x ** other, mapping.values()))
+        result = VariableGroup.from_monomial(coefficient, monomial)
         if modulo:
             return result % modulo[0]
         return result
 
     def __rpow__(self, other: OtherType, *modulo) -> Expression:
         if modulo:
-            return Expression(Modulo(Power(other, self.copy()), modulo[0]))
-        return Expression(Power(other, self.copy()))
+            return Expression.wrap(Modulo(Power(other, self._share()), modulo[0]))
+        return Expression(Power(other, self._share()))
 
     __ipow__ = __pow__
@@ -1,5 +1,6 @@
 from .core import ExpressionBase, PolynomialExpression
 
 from .generic_poly import Polynomial
+from .multivariate import MultivariatePolynomial
 from .linear import LinearExpression
 from .quadratic import QuadraticExpression
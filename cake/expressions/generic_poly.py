@@ -6,7 +6,7 @@ from __future__ import annotations
 from typing import Any, Tuple, Union
 import numbers
 
-from cake import Variable, Expression, Add
+from cake import Variable, Expression, Add, utils
 
 from .core import PolynomialExpression
 
@@ -14,8 +14,9 @@ from .core import PolynomialExpression
 class Polynomial(PolynomialExpression):
     '''
     A generic polynomial expression which can be used to express custom expressions which may use higher powers,
-    we recomend using :class:`cake.expressions.BinomialBase` which simulates very high power polynomial expressions,
-    such as **(x + 5) ^ 25** or **(x / 2 + 3.5) ^ 15**.
+    high powers of sums, such as **(x + 5) ^ 25** or **(x / 2 + 3.5) ^ 15**,
+    can be expanded using :func:`cake.expand_power` which generates each term from its multinomial coefficient.
+    Polynomials in more than one variable are handled by :class:`MultivariatePolynomial`.
     '''
     
     def __init__(self, *args)-> None:
@@ -49,7 +50,7 @@ class Polynomial(PolynomialExpression):
             else:
                 self._cleaned_args[power] = arg
 
-        self._expr: Expression = sum(self._cleaned_args.values())
+        self._expr: Expression = utils.sum(self._cleaned_args.values())
 
     @property
     def degree(self) -> int:
@@ -0,0 +1,357 @@
+## Multivariate polynomials
+##
+## 3x**2y + 5xz - 1
+##
+## Terms are kept in a SparsePolynomial, a mapping of exponent tuples to coefficients,
+## so arithmetic, derivatives and evaluation work on the terms directly rather than on Expression trees.
+##
+from __future__ import annotations
+from typing import Any, Dict, Mapping, Tuple, Union
+import numbers
+
+from cake.core.sparse import SparsePolynomial
+from cake.core.symbols import table
+import cake
+
+from .core import PolynomialExpression
+
+Term = Tuple[Tuple[str, Any], ...]
+
+
+def _symbol(symbol: Any) -> str:
+    return getattr(symbol, 'representation', symbol)
+
+
+def _value(x: Any) -> Any:
+    return getattr(x, 'value', x)
+
+
+class MultivariatePolynomial(PolynomialExpression):
+    ''' A polynomial in any number of variables, such as ``3x**2y + 5xz - 1``.
+    Terms are stored sparsely as a mapping of exponents to coefficients,
+    only terms with a non zero coefficient are kept.
+
+    .. code-block:: py
+
+        >>> x, y = Variable.many('x', 'y')
+        >>> p = MultivariatePolynomial.from_expression(x ** 2 * y + 3 * x + 1)
+        >>> p
+        MultivariatePolynomial(x**2y + 3x + Integral(1))
+        >>> p.degree
+        3
+        >>> p.differentiate(x)
+        MultivariatePolynomial(2xy + Integral(3))
+        >>> p * (x - 1)
+        MultivariatePolynomial(x**3y + -1x**2y + 3x**2 + -2x + Integral(-1))
+        >>> p.solve(x=2, y=3)
+        Integral(19)
+
+    Parameters
+    ----------
+    *terms: Union[:class:`Variable`, :class:`VariableGroup`, :class:`numbers.Number`]
+        Monomials making up the polynomial, which must have numerical coefficients
+
+    Raises
+    ------
+    :py:obj:`TypeError`:
+        A term which isn't a monomial was given
+    '''
+
+    def __init__(self, *terms: Any) -> None:
+        self._poly = SparsePolynomial()
+
+        for index, term in enumerate(terms):
+            if self._poly.add_node(getattr(term, 'exp', term)) is None:
+                raise TypeError('Argument {}, expected a monomial with a numerical coefficient, instead got {}'.format(
+                    index, term.__class__.__name__
+                ))
+        self._poly.prune()
+
+    @classmethod
+    def _from_sparse(cls, poly: SparsePolynomial) -> MultivariatePolynomial:
+        result = cls.__new__(cls)
+        result._poly = poly.prune()
+        return result
+
+    @classmethod
+    def _convert(cls, other: Any) -> Union[SparsePolynomial, None]:
+        if isinstance(other, MultivariatePolynomial):
+            return other._poly
+        elif isinstance(other, numbers.Number):
+            poly = SparsePolynomial()
+            poly.terms[()] = other
+            return poly
+        return SparsePolynomial.from_node(other)
+
+    @classmethod
+    def from_expression(cls, expression: Any) -> MultivariatePolynomial:
+        ''' Creates a polynomial from an :class:`Expression`, or any single term
+
+        Raises
+        ------
+        :py:obj:`TypeError`:
+            The expression isn't a sum of monomials with numerical coefficients
+        '''
+        poly = SparsePolynomial.from_node(expression)
+        if poly is None:
+            raise TypeError('Expression is not a polynomial with numerical coefficients')
+        return cls._from_sparse(poly)
+
+    @classmethod
+    def from_terms(cls, terms: Mapping[Term, Any]) -> MultivariatePolynomial:
+        ''' Creates a polynomial from a mapping of ``((symbol, exponent), ...)`` tuples to coefficients
+
+        .. code-block:: py
+
+            >>> MultivariatePolynomial.from_terms({(('x', 2), ('y', 1)): 3, (): 5})
+            MultivariatePolynomial(3x**2y + Integral(5))
+        '''
+        poly = SparsePolynomial()
+        for powers, coefficient in terms.items():
+            poly.add_term(poly.key(list(powers)), coefficient)
+        return cls._from_sparse(poly)
+
+    @classmethod
+    def generic(cls) -> MultivariatePolynomial:
+        ''' Returns a generic polynomial, ``x + y + 1`` '''
+        return cls(cake.Variable('x'), cake.Variable('y'), 1)
+
+    def as_expression(self) -> Any:
+        ''' Returns the polynomial as an :class:`Expression`,
+        polynomials of a single term are returned as that term.
+        '''
+        return self._poly.as_node()
+
+    def copy(self) -> MultivariatePolynomial:
+        ''' Returns a shallow copy of the polynomial '''
+        return MultivariatePolynomial._from_sparse(self._poly.copy())
+
+    ''' Properties '''
+
+    @property
+    def terms(self) -> Dict[Term, Any]:
+        ''' Mapping of ``((symbol, exponent), ...)`` tuples to the coefficient of the term '''
+        symbols = self._poly.symbols
+        return {tuple((symbols[p], e) for p, e in key): c for key, c in self._poly.terms.items()}
+
+    @property
+    def symbols(self) -> Tuple[str, ...]:
+        ''' Symbols used by at least one term '''
+        used = {p for key in self._poly.terms for p, _ in key}
+        return tuple(s for p, s in enumerate(self._poly.symbols) if p in used)
+
+    @property
+    def degree(self) -> Any:
+        ''' Highest total degree of any term, 0 for a constant polynomial '''
+        return max((sum(e for _, e in key) for key in self._poly.terms), default=0)
+
+    def degree_in(self, symbol: Any) -> Any:
+        ''' Highest power of a symbol within the polynomial '''
+        position = self._poly.index.get(_symbol(symbol))
+        return max((e for key in self._poly.terms for p, e in key if p == position), default=0)
+
+    ''' Calculus '''
+
+    def differentiate(self, symbol: Any) -> MultivariatePolynomial:
+        ''' Returns the partial derivative with respect to a symbol
+
+        .. code-block:: py
+
+            >>> p = MultivariatePolynomial.from_expression(x ** 2 * y + y)
+            >>> p.differentiate(y)
+            MultivariatePolynomial(x**2 + Integral(1))
+        '''
+        result = self._poly.copy()
+        result.terms = {}
+
+        position = self._poly.index.get(_symbol(symbol))
+        if position is None:
+            return MultivariatePolynomial._from_sparse(result)
+
+        for key, coefficient in self._poly.terms.items():
+            for p, e in key:
+                if p == position:
+                    new = tuple((q, f - 1 if q == p else f) for q, f in key if q != p or f != 1)
+                    result.add_term(new, coefficient * e)
+                    break
+        return MultivariatePolynomial._from_sparse(result)
+
+    def integrate(self, symbol: Any) -> MultivariatePolynomial:
+        ''' Returns the indefinite integral with respect to a symbol, without a constant of integration
+
+        Raises
+        ------
+        :py:obj:`ValueError`:
+            A term has the symbol raised to ``-1``, which integrates to a logarithm
+        '''
+        result = self._poly.copy()
+        result.terms = {}
+        position = result._intern(_symbol(symbol))
+
+        for key, coefficient in self._poly.terms.items():
+            exponents = dict(key)
+            e = exponents.get(position, 0) + 1
+            if e == 0:
+                raise ValueError('Cannot integrate a term raised to the power of -1 as a polynomial')
+
+            exponents[position] = e
+            result.add_term(tuple(sorted(exponents.items())), coefficient / e)
+        return MultivariatePolynomial._from_sparse(result)
+
+    def _coefficients(self) -> list:
+        ## Coefficients of each power of the only symbol, lowest power first
+        coefficients = [0] * (self.degree + 1)
+        for key, c in self._poly.terms.items():
+            e = sum(e for _, e in key)
+            if not isinstance(e, int) or e < 0:
+                raise ValueError('Roots are only found for polynomials with non negative integer powers')
+            coefficients[e] += c
+        return coefficients
+
+    def roots(self) -> Tuple[Any, ...]:
+        ''' Returns the roots of a polynomial which only uses a single symbol, up to a degree of 2.
+        Give values for the other symbols using :meth:`solve` first.
+
+        .. code-block:: py
+
+            >>> p = MultivariatePolynomial.from_expression(x ** 2 * y - 4 * y)
+            >>> p.solve(y=1).roots()
+            (Real(2.0), Real(-2.0))
+
+        Raises
+        ------
+        :py:obj:`ValueError`:
+            The polynomial uses more than 1 symbol, or has a degree higher than 2
+        '''
+        symbols = self.symbols
+        if len(symbols) > 1:
+            raise ValueError('Multivariate polynomials have no roots in a single variable, '
+                             'give values for all but 1 of {} first'.format(', '.join(symbols)))
+
+        coefficients = self._coefficients()
+        if len(coefficients) == 1:
+            return ()
+        elif len(coefficients) == 2:
+            c, m = coefficients
+            return cake.expressions.LinearExpression(m, c).roots()
+        elif len(coefficients) == 3:
+            c, b, a = coefficients
+            return cake.expressions.QuadraticExpression(a, b, c).roots()
+        raise ValueError('Roots are only found for polynomials with a degree of 2 or less')
+
+    ''' Evaluation '''
+
+    def solve(self, **values) -> Any:
+        ''' Evaluates the polynomial using the values given, values may also be NumPy arrays.
+        Symbols without a value are kept, returning a new polynomial.
+
+        .. code-block:: py
+
+            >>> p = MultivariatePolynomial.from_expression(x ** 2 * y + 3 * x + 1)
+            >>> p.solve(x=2, y=3)
+            Integral(19)
+            >>> p.solve(x=2)
+            MultivariatePolynomial(4y + Integral(7))
+        '''
+        symbols = self._poly.symbols
+        known = [table.lookup(table.intern(s), values) for s in symbols]
+        known = [_value(v) for v in known]
+
+        powers = {}
+        result = self._poly.copy()
+        result.terms = {}
+        total = 0
+
+        for key, coefficient in self._poly.terms.items():
+            value = _value(coefficient)
+            remaining = []
+
+            for p, e in key:
+                if known[p] is None:
+                    remaining.append((p, e))
+                    continue
+
+                if (p, e) not in powers:
+                    powers[p, e] = known[p] ** e
+                value = value * powers[p, e]
+
+            if remaining:
+                result.add_term(tuple(remaining), value)
+            else:
+                total = total + value
+
+        if not result.terms:
+            return cake.Number.convert(total) if isinstance(total, numbers.Number) else total
+
+        result.add_term((), total)
+        return MultivariatePolynomial._from_sparse(result)
+
+    def r_solve(self, y: Any, /, **values) -> Tuple[Any, ...]:
+        ''' Returns the values of the remaining symbol for which the polynomial equals ``y``,
+        values must be given for every other symbol. ``y`` is positional, so a symbol may also be called ``y``.
+
+        .. code-block:: py
+
+            >>> p = MultivariatePolynomial.from_expression(x * y + 1)
+            >>> p.r_solve(7, x=2)
+            (3.0,)
+
+        Raises
+        ------
+        :py:obj:`ValueError`:
+            Values were given for every symbol or for too few of them, see :meth:`roots`
+        '''
+        p = self.solve(**values) if values else self
+        if not isinstance(p, MultivariatePolynomial):
+            raise ValueError('Values were given for every symbol, so there is nothing left to solve for')
+        return (p - y).roots()
+
+    ''' Magic methods '''
+
+    def __repr__(self) -> str:
+        return f'MultivariatePolynomial({self})'
+
+    def __str__(self) -> str:
+        return str(self.as_expression())
+
+    def __len__(self) -> int:
+        return len(self._poly)
+
+    def __eq__(self, other: Any) -> bool:
+        other = self._convert(other)
+        if other is None:
+            return False
+        return not (self._poly - other).terms
+
+    __hash__ = None
+
+    def __add__(self, other: Any) -> MultivariatePolynomial:
+        poly = self._convert(other)
+        if poly is None:
+            return NotImplemented
+        return MultivariatePolynomial._from_sparse(self._poly + poly)
+
+    __radd__ = __add__
+
+    def __neg__(self) -> MultivariatePolynomial:
+        return MultivariatePolynomial._from_sparse(-self._poly)
+
+    def __sub__(self, other: Any) -> MultivariatePolynomial:
+        poly = self._convert(other)
+        if poly is None:
+            return NotImplemented
+        return MultivariatePolynomial._from_sparse(self._poly - poly)
+
+    def __rsub__(self, other: Any) -> MultivariatePolynomial:
+        return -self + other
+
+    def __mul__(self, other: Any) -> MultivariatePolynomial:
+        poly = self._convert(other)
+        if poly is None:
+            return NotImplemented
+        return MultivariatePolynomial._from_sparse(self._poly * poly)
+
+    __rmul__ = __mul__
+
+    def __pow__(self, n: int) -> MultivariatePolynomial:
+        return MultivariatePolynomial._from_sparse(self._poly ** n)
@@ -0,0 +1,172 @@
+## User defined functions
+##
+## >>> @cake.function(array=numpy.exp, derivative=lambda u: Exp(u))
+## ... def Exp(v):
+## ...     return math.exp(v)
+## >>> Exp(Variable('x')).evaluate(x=1)
+## Real(2.718281828459045)
+##
+## Each decorated kernel becomes a Function subclass, registered by name
+## so it can be looked up again, such as when building trees from names.
+##
+from __future__ import annotations
+from typing import Any, Callable, Dict, Optional, Type, Union
+import numbers
+
+from cake import Function, to_radians
+import cake
+
+registry: Dict[str, Type[Function]] = {}
+''' Functions created using :func:`function`, by name '''
+
+
+def _convert(result: Any) -> Any:
+    if isinstance(result, numbers.Number) and not isinstance(result, cake.Number):
+        return cake.Number.convert(result)
+    return result
+
+
+def _value(node: Any) -> Any:
+    value = getattr(node, 'value', node)
+    return value if isinstance(value, numbers.Number) else None
+
+
+def _inner_derivative(parameter: Any, symbol: Any) -> Any:
+    ## Derivative of a parameter for the chain rule, functions created by function() are differentiated in turn
+    if isinstance(parameter, Function):
+        if registry.get(type(parameter).__name__) is not type(parameter):
+            raise TypeError(f'Cannot differentiate {type(parameter).__name__} within another function')
+        return parameter.differentiate(symbol)
+
+    poly = cake.expressions.MultivariatePolynomial.from_expression(parameter)
+    if symbol is None:
+        if len(poly.symbols) > 1:
+            raise ValueError(f'A symbol must be given to differentiate with respect to, found {poly.symbols!r}')
+        elif not poly.symbols:
+            return cake.Integral(0)
+        symbol, = poly.symbols
+    return poly.differentiate(symbol).as_expression()
+
+
+def function(scalar: Optional[Callable[[Any], Any]] = None, /, *,
+             name: Optional[str] = None,
+             array: Optional[Union[str, Callable[[Any], Any]]] = None,
+             derivative: Optional[Callable[[Any], Any]] = None,
+             replace: bool = False) -> Any:
+    ''' Creates a :class:`Function` from a scalar kernel, used as a decorator.
+
+    .. code-block:: py
+
+        >>> @cake.function(array=numpy.exp, derivative=lambda u: Exp(u))
+        ... def Exp(v):
+        ...     return math.exp(v)
+        >>> f = Exp(Variable('x'), coefficient=2)
+        >>> f
+        2*Exp(x)
+        >>> f.evaluate(x=0)
+        Real(2.0)
+        >>> f.evaluate_array(x=numpy.array([0, 1]))
+        array([2.        , 5.43656366])
+        >>> f.differentiate()
+        2*Exp(x)
+        >>> Exp(Variable('x') ** 2).differentiate()
+        2x*Exp(x**2)
+
+    Parameters
+    ----------
+    scalar: Callable[[Any], Any]
+        Kernel evaluating a single value
+    name: Optional[:class:`str`]
+        Name of the function, defaults to the name of the kernel
+    array: Optional[Union[:class:`str`, Callable[[Any], Any]]]
+        Kernel evaluating a whole NumPy array at once, or the name of a NumPy function.
+        Without one, the scalar kernel is applied to each element.
+    derivative: Optional[Callable[[Any], Any]]
+        Returns the derivative of the function for a parameter, used by :meth:`differentiate`
+    replace: :class:`bool`
+        Whether to replace a registered function with the same name
+
+    Raises
+    ------
+    :py:obj:`ValueError`:
+        A function with the same name is already registered
+    '''
+    def decorator(kernel: Callable[[Any], Any]) -> Type[Function]:
+        fname = name or kernel.__name__
+        if fname in registry and not replace:
+            raise ValueError(f'A function named {fname!r} is already registered')
+
+        def _handler(self, v, **opts) -> Any:
+            if opts.get('rad'):
+                v = to_radians(v)
+            if opts.get('prehandle'):
+                v = self.prehandler(v)
+
+            try:
+                return _convert(kernel(getattr(v, 'value', v)))
+            except Exception:
+                return self.__class__(v)
+
+        def _array_handler(self, np: Any, v: Any) -> Any:
+            if array is None:
+                return Function._array_handler(self, np, v)
+            elif isinstance(array, str):
+                return getattr(np, array)(v)
+            return array(v)
+
+        def differentiate(self, symbol: Any = None) -> Any:
+            ''' Returns the derivative of the function, using the chain rule for its parameter.
+
+            Parameters
+            ----------
+            symbol: Optional[Union[:class:`str`, :class:`Variable`]]
+                Symbol to differentiate with respect to, defaults to the only symbol within the parameter
+
+            Raises
+            ------
+            :py:obj:`TypeError`:
+                The function has no derivative defined, or its parameter isn't a polynomial or function created by :func:`function`
+            :py:obj:`ValueError`:
+                No symbol was given and the parameter contains more than one
+            '''
+            if derivative is None:
+                raise TypeError(f'{fname} has no derivative defined')
+
+            inner = _inner_derivative(self.parameter, symbol)
+            if _value(inner) == 0:
+                return cake.Integral(0)
+
+            d = derivative(self.parameter)
+            if self.power != 1:
+                d = d * self.power * self.__class__(self.parameter, 1, self.power - 1)
+            if _value(inner) != 1:
+                d = d * inner
+            return d * self.coefficient
+
+        cls = type(fname, (Function,), {
+            '__doc__': kernel.__doc__ or f''' User defined {fname} function ''',
+            '__module__': kernel.__module__,
+            '_handler': _handler,
+            '_array_handler': _array_handler,
+            'differentiate': differentiate,
+            'kernel': staticmethod(kernel),
+            'array_kernel': array,
+            'derivative': staticmethod(derivative) if derivative else None,
+        })
+        registry[fname] = cls
+        return cls
+
+    if scalar is not None:
+        return decorator(scalar)
+    return decorator
+
+
+def lookup(name: str) -> Type[Function]:
+    ''' Returns a function created by :func:`function` from its name
+
+    Raises
+    ------
+    :py:obj:`KeyError`:
+        No function with that name is registered
+    '''
+    return registry[name]
@@ -18,6 +18,7 @@ class Truncate(Function):
         >>> t.evaluate(x=Variable('y'))
         Truncate(y)
     '''
+    _kernel = 'trunc'
 
     def _handler(self, v, **opts) -> Any:
         if opts.get('rad'):
@@ -43,6 +44,7 @@ class Ceil(Function):
         >>> c.evaluate(x=Variable('y'))
         Ceil(y)
     '''
+    _kernel = 'ceil'
 
     def _handler(self, v, **opts) -> Any:
         if opts.get('rad'):
@@ -68,6 +70,8 @@ class Floor(Function):
         >>> f.evaluate(x=Variable('y'))
         Floor(y)
     '''
+    _kernel = 'floor'
+
     def _handler(self, v, **opts) -> Any:
         if opts.get('rad'):
             v = to_radians(v)
@@ -113,6 +117,12 @@ class Round(Function):
         s = super().__str__()[:-1]
         return s + f', {self.n_places})'
 
+    def _cache_state(self) -> tuple:
+        return (self.n_places,)
+
+    def _array_handler(self, np: Any, v: Any) -> Any:
+        return np.round(v, self.n_places)
+
     def _handler(self, v, **opts) -> Any:
         if opts.get('rad'):
             v = to_radians(v)
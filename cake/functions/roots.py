@@ -4,6 +4,9 @@ from cake import Real, Function, to_radians, Expression, Divide, utils
 
 from functools import reduce
 from operator import mul
+import cake
+
+from cake.core.cache import function_cache, value_key, MISSING
 
 
 def _prime_factors(factorable: Any) -> list:
@@ -26,6 +29,25 @@ def _prime_factors(factorable: Any) -> list:
     return factors
 
 
+def _square_root(parameter: Any) -> Any:
+    node = getattr(parameter, 'exp', parameter)
+
+    if isinstance(node, cake.Variable) and not getattr(node, '_to_type', None):
+        power = getattr(node.power, 'value', node.power)
+        if not isinstance(power, int) or power <= 0 or power % 2 or node.coefficient != 1:
+            return None
+
+        root = cake.Variable(node.representation, 1, power // 2)
+        if cake.assumptions.is_nonnegative(root):
+            return root
+
+    elif isinstance(node, cake.Power):
+        power = getattr(node.power, 'value', node.power)
+        if power == 2 and cake.assumptions.is_nonnegative(node.base):
+            return cake.Expression(node.base) if isinstance(node.base, cake.Operation) else node.base
+    return None
+
+
 class Root(Function):
     ''' Generic function for representing `n ** 1/x`,
     unlike :class:`Sqrt` the :class:`Root` function doesn't reduce values to its simplest form.
@@ -76,6 +98,9 @@ class Root(Function):
         x = super().__str__()[:-1]
         x += f', base={self.base})'
         return x
+
+    def _cache_state(self) -> tuple:
+        return (value_key(self.base),)
         
     def _handler(self, v, **opts) -> Any:
         if opts.get('rad'):
@@ -85,6 +110,10 @@ class Root(Function):
 
         return v ** self.base
 
+    def _array_handler(self, np: Any, v: Any) -> Any:
+        ## Negative values give complex results, as they do for scalars
+        return np.emath.power(v, self.base)
+
 
 class Sqrt(Root):
     ''' Built in sqrt function, which implements reducing into simplest form if possible.
@@ -97,15 +126,38 @@ class Sqrt(Root):
         >>> f.evaluate(x=4)
         Real(2.0)
     '''
+    def __new__(cls, parameter: Any = None, coefficient: Any = 1, power: Any = 1) -> Any:
+        ## Roots of squares are simplified when the base is known to be non-negative, Sqrt(x ** 2) -> x
+        base = _square_root(parameter)
+        if base is None:
+            return super().__new__(cls)
+
+        if power != 1:
+            base = base ** power
+        if coefficient != 1:
+            base = base * coefficient
+        return base
+
     def __init__(self, parameter: Any, coefficient: Any = 1, power: Any = 1) -> None:
         super().__init__(Real(0.5), parameter, coefficient, power)
 
-    def __str__(self) -> str:
-        return Function.__str__(self)
-
+    __str__ = Function.__str__
     copy = Function.copy
 
     def _reduce_if_possible(self, v):
+        ## Factorising is expensive, so reduced forms are cached along with function results
+        key = value_key(v)
+        if key is None or not function_cache.enabled:
+            return self._reduce(v)
+
+        key = (Sqrt._reduce_if_possible, key)
+        result = function_cache.get(key)
+        if result is MISSING:
+            result = self._reduce(v)
+            function_cache.put(key, result)
+        return result.copy() if hasattr(result, 'copy') else result
+
+    def _reduce(self, v):
         try:
             bases = _prime_factors(v)
         except TypeError:
@@ -132,11 +184,15 @@ class Sqrt(Root):
             ## Perfect square
             x = reduce(mul, groups)
             return Real(x)
-        coefficient = reduce(mul, groups)
+        coefficient = reduce(mul, groups, 1)
         param = reduce(mul, ungrouped)
 
         return Sqrt(param, coefficient)
 
+    def _array_handler(self, np: Any, v: Any) -> Any:
+        ## Arrays are evaluated numerically rather than reduced into their simplest form
+        return np.emath.sqrt(v)
+
     def true_value(self, /, to_radians: bool = False, use_prehandler: bool = False, use_postprocess: bool = False, **kwds) -> Any:
         ''' Reduces the value of the function to its true value if possible
 
@@ -169,6 +225,6 @@ class Sqrt(Root):
 
         if isinstance(v, (Real, float)):
             top, bottom = map(self._reduce_if_possible, v.as_integer_ratio())
-            return Expression(Divide(top, bottom))
+            return Expression.wrap(Divide(top, bottom))
         
         return self._reduce_if_possible(v)
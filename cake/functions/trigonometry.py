@@ -1,56 +1,206 @@
 from __future__ import annotations
-from typing import Any
+from fractions import Fraction
+from typing import Any, Callable, Dict, Optional, Tuple
+import numbers
 
 from cake.core.functions import Function
 import cake
 from math import *
 
-class Sin(Function):
-    ''' Sin function ''' 
+## Exact values at multiples of 30 and 45 degrees, as (radicand, coefficient)
+## so 45 degrees is Sqrt(2) / 2. Other quadrants are found from their reference angle.
+_SIN: Dict[int, Tuple[int, Fraction]] = {
+    0: (1, Fraction(0)),
+    30: (1, Fraction(1, 2)),
+    45: (2, Fraction(1, 2)),
+    60: (3, Fraction(1, 2)),
+    90: (1, Fraction(1)),
+}
+_TAN: Dict[int, Tuple[int, Fraction]] = {
+    0: (1, Fraction(0)),
+    30: (3, Fraction(1, 3)),
+    45: (1, Fraction(1)),
+    60: (3, Fraction(1)),
+}
+
+
+def _degrees(v: Any) -> Optional[Fraction]:
+    ## Exact value of a real number, so reducing it by 360 doesn't lose precision
+    v = getattr(v, 'value', v)
+    if isinstance(v, bool):
+        return None
+    elif isinstance(v, numbers.Rational):
+        return Fraction(v)
+    elif isinstance(v, float) and isfinite(v):
+        return Fraction(v)
+    return None
+
+
+def _rational(v: Any) -> Optional[Fraction]:
+    ## Rational numbers are stored as floats, so floats are accepted when they are exactly a small fraction
+    v = getattr(v, 'value', v)
+    if isinstance(v, bool):
+        return None
+    elif isinstance(v, numbers.Rational):
+        return Fraction(v)
+    elif isinstance(v, float) and isfinite(v):
+        f = Fraction(v).limit_denominator(360)
+        return f if float(f) == v else None
+    return None
+
+
+def _pi_degrees(node: Any) -> Optional[Fraction]:
+    ## Degrees of a rational multiple of Pi, such as Pi(Rational(1, 6)) or Pi() / 6
+    node = getattr(node, 'exp', node)
+
+    if isinstance(node, cake.Divide):
+        top, bottom = _pi_degrees(node.numerator), _rational(node.denominator)
+        if top is None or not bottom:
+            return None
+        return top / bottom
+    elif not isinstance(node, cake.Pi) or getattr(node.power, 'value', node.power) != 1:
+        return None
+
+    c = _rational(node.coefficient)
+    return None if c is None else c * 180
+
+
+def _surd(entry: Optional[Tuple[int, Fraction]], sign: int) -> Any:
+    if entry is None:
+        return None
+
+    radicand, c = entry
+    c *= sign
+    coefficient = cake.Integral(c.numerator) if c.denominator == 1 else cake.Rational(c.numerator, c.denominator)
+
+    if radicand == 1:
+        return coefficient
+    return cake.Sqrt(radicand, coefficient)
+
+
+def _entry(node: Any) -> Optional[Tuple[int, Fraction]]:
+    ## Inverse of _surd, for values looked up from the tables
+    if isinstance(node, cake.Sqrt):
+        radicand = getattr(node.parameter, 'value', node.parameter)
+        c = _rational(node.coefficient)
+        if c is None or getattr(node.power, 'value', node.power) != 1 or isinstance(radicand, bool) or not isinstance(radicand, int):
+            return None
+        return radicand, c
+
+    c = _rational(node)
+    return None if c is None else (1, c)
+
+
+def _sin_exact(d: Fraction) -> Any:
+    if d <= 90:
+        return _surd(_SIN.get(d), 1)
+    elif d <= 180:
+        return _surd(_SIN.get(180 - d), 1)
+    elif d <= 270:
+        return _surd(_SIN.get(d - 180), -1)
+    return _surd(_SIN.get(360 - d), -1)
+
+
+def _cos_exact(d: Fraction) -> Any:
+    return _sin_exact((d + 90) % 360)
+
+
+def _tan_exact(d: Fraction) -> Any:
+    d %= 180
+    if d == 90:
+        raise ValueError('Tan is undefined at 90 + 180n degrees')
+    elif d < 90:
+        return _surd(_TAN.get(d), 1)
+    return _surd(_TAN.get(180 - d), -1)
+
+
+class _Periodic(Function):
+    ## Sin, Cos and Tan, which are evaluated exactly at multiples of 30 and 45 degrees.
+    ## Degrees are reduced by 360 exactly and converted using math.radians,
+    ## rather than through cake.to_radians which builds and divides Real numbers.
+    ## Rational multiples of Pi are converted to degrees, so are reduced and looked up in the same way.
+    _function: Callable[[float], float]
+    _exact: Callable[[Fraction], Any]
+
+    def _cache_state(self) -> tuple:
+        return (_pi_degrees(self.parameter),)
+
+    def _evaluate_value(self, value: Any, to_rad: bool = False, prehandler: bool = False) -> Any:
+        ## Solving a multiple of Pi gives a float, so the parameter itself is checked rather than its value
+        if not (to_rad or prehandler) and (d := _pi_degrees(self.parameter)) is not None:
+            return self._from_degrees(d % 360)
+        return super()._evaluate_value(value, to_rad, prehandler)
+
+    def _apply_co_pow(self, value: Any, coefficient: Any, power: Any) -> Any:
+        ## Integer powers of exact values stay exact, k * (c * Sqrt(r)) ** n == k * c**n * r**(n // 2) * Sqrt(r)**(n % 2)
+        n = getattr(power, 'value', power)
+        k = _rational(coefficient)
+        if isinstance(n, numbers.Integral) and not isinstance(n, bool) and k is not None and (entry := _entry(value)) is not None:
+            radicand, c = entry
+            return _surd((radicand if n % 2 else 1, k * c ** n * Fraction(radicand) ** (n // 2)), 1)
+        return super()._apply_co_pow(value, coefficient, power)
 
     def _handler(self, v, **opts) -> Any:
+        if opts.get('rad') and not opts.get('prehandle') and (d := _degrees(v)) is not None:
+            return self._from_degrees(d % 360)
+
         if opts.get('rad'):
             v = cake.to_radians(v)
         if opts.get('prehandle'):
             v = self.prehandler(v)
-        
+
         try:
-            return cake.Real(sin(v))
+            return cake.Real(self._function(v))
         except Exception:
-            return Sin(v)
+            return self.__class__(v)
 
-class Cos(Function):
-    ''' Cos function '''
+    def _from_degrees(self, d: Fraction) -> Any:
+        exact = self._exact(d)
+        if exact is None:
+            return cake.Real(self._function(radians(d)))
+        return exact
 
-    def _handler(self, v, **opts) -> Any:
-        if opts.get('rad'):
-            v = cake.to_radians(v)
-        if opts.get('prehandle'):
-            v = self.prehandler(v)
 
-        try:
-            return cake.Real(cos(v))
-        except Exception:
-            return Cos(v)
+class Sin(_Periodic):
+    ''' Sin function, evaluated exactly at multiples of 30 and 45 degrees, or of ``Pi / 6`` and ``Pi / 4``
 
+    .. code-block:: py
 
-class Tan(Function):
-    ''' tan function '''
+        >>> Sin(Variable('x')).evaluate(x=210, to_radians=True)
+        Rational(-0.5)
+        >>> Sin(Variable('x')).evaluate(x=405, to_radians=True)
+        Sqrt(parameter=2, coefficient=Rational(0.5), power=1)
+        >>> Sin(Pi(Rational(1, 3))).evaluate()
+        Sqrt(parameter=3, coefficient=Rational(0.5), power=1)
+    '''
+    _kernel = 'sin'
+    _function = staticmethod(sin)
+    _exact = staticmethod(_sin_exact)
 
-    def _handler(self, v, **opts) -> Any:
-        if opts.get('rad'):
-            v = cake.to_radians(v)
-        if opts.get('prehandle'):
-            v = self.prehandler(v)
 
-        try:
-            return cake.Real(tan(v))
-        except Exception:
-            return Tan(v)
+class Cos(_Periodic):
+    ''' Cos function, evaluated exactly at multiples of 30 and 45 degrees, or of ``Pi / 6`` and ``Pi / 4`` '''
+    _kernel = 'cos'
+    _function = staticmethod(cos)
+    _exact = staticmethod(_cos_exact)
+
+
+class Tan(_Periodic):
+    ''' tan function, evaluated exactly at multiples of 30 and 45 degrees, or of ``Pi / 6`` and ``Pi / 4``
+
+    Raises
+    ------
+    :py:obj:`ValueError`:
+        Evaluated at an odd multiple of 90 degrees or ``Pi / 2``, where tan is undefined
+    '''
+    _kernel = 'tan'
+    _function = staticmethod(tan)
+    _exact = staticmethod(_tan_exact)
 
 
 class ASin(Function):
     ''' arc sin or inverse sin function '''
+    _kernel = 'arcsin'
 
     def _handler(self, v, **opts) -> Any:
         if opts.get('rad'):
@@ -66,6 +216,7 @@ class ASin(Function):
 
 class ACos(Function):
     ''' arc cos or inverse cos function '''
+    _kernel = 'arccos'
 
     def _handler(self, v, **opts) -> Any:
         if opts.get('rad'):
@@ -80,6 +231,7 @@ class ACos(Function):
 
 class ATan(Function):
     ''' arc tan or inverse tan function '''
+    _kernel = 'arctan'
 
     def _handler(self, v, **opts) -> Any:
         if opts.get('rad'):
@@ -110,6 +262,7 @@ class ATan2(Function):
 
 class SinH(Function):
     ''' Hyperbolic sin function '''
+    _kernel = 'sinh'
     def _handler(self, v, **opts) -> Any:
         if opts.get('rad'):
             v = cake.to_radians(v)
@@ -123,6 +276,7 @@ class SinH(Function):
 
 class CosH(Function):
     ''' Hyperbolic cos function '''
+    _kernel = 'cosh'
     def _handler(self, v, **opts) -> Any:
         if opts.get('rad'):
             v = cake.to_radians(v)
@@ -137,6 +291,7 @@ class CosH(Function):
 
 class TanH(Function):
     ''' Hyperbolic tan function '''
+    _kernel = 'tanh'
     def _handler(self, v, **opts) -> Any:
         if opts.get('rad'):
             v = cake.to_radians(v)
@@ -151,6 +306,7 @@ class TanH(Function):
 
 class ASinH(Function):
     ''' Arc hyperbolic sin or inverse hyperbolic sin function '''
+    _kernel = 'arcsinh'
     def _handler(self, v, **opts) -> Any:
         if opts.get('rad'):
             v = cake.to_radians(v)
@@ -165,6 +321,7 @@ class ASinH(Function):
 
 class ACosH(Function):
     ''' Arc hyperbolic cos or inverse hyperbolic cos function '''
+    _kernel = 'arccosh'
     def _handler(self, v, **opts) -> Any:
         if opts.get('rad'):
             v = cake.to_radians(v)
@@ -179,6 +336,7 @@ class ACosH(Function):
 
 class ATanH(Function):
     ''' Arc hyperbolic tan or inverse hyperbolic tan function '''
+    _kernel = 'arctanh'
     def _handler(self, v, **opts) -> Any:
         if opts.get('rad'):
             v = cake.to_radians(v)
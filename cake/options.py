@@ -0,0 +1,68 @@
+## Global options for the cake library
+##
+## >>> cake.options.configure(immutable_nodes=True)
+##
+## >>> with cake.options.using(immutable_nodes=True):
+## ...     ...
+##
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Any, Iterator
+import sys
+
+
+immutable_nodes: bool = False
+''' Treat nodes as immutable, operators share existing nodes instead of copying them.
+Operations store their nodes as tuples while enabled, other nodes must not be modified in place.
+'''
+
+factored_products: bool = False
+''' Keep products of sums as :class:`Multiply` nodes rather than distributing them,
+use :meth:`Expression.expand` to distribute when needed.
+'''
+
+function_cache_size: int = 0
+''' Number of function results kept in ``cake.function_cache``, 0 disables caching.
+Results are keyed by the function type and its solved parameter, coefficient and power.
+'''
+
+_options = sys.modules[__name__]
+
+
+def configure(**options: Any) -> None:
+    ''' Sets the value of one or more options
+
+    .. code-block:: py
+
+        >>> cake.options.configure(immutable_nodes=True)
+        >>> cake.options.immutable_nodes
+        True
+
+    Raises
+    ------
+    :py:obj:`AttributeError`:
+        An unknown option was given
+    '''
+    for name, value in options.items():
+        if name.startswith('_') or not hasattr(_options, name) or callable(getattr(_options, name)):
+            raise AttributeError(f'Unknown option {name!r}')
+
+    for name, value in options.items():
+        setattr(_options, name, value)
+
+
+@contextmanager
+def using(**options: Any) -> Iterator[None]:
+    ''' Context manager which sets options, restoring the previous values on exit
+
+    .. code-block:: py
+
+        >>> with cake.options.using(immutable_nodes=True):
+        ...     expr = x + y
+    '''
+    previous = {name: getattr(_options, name, None) for name in options}
+    configure(**options)
+    try:
+        yield
+    finally:
+        configure(**previous)
@@ -0,0 +1,373 @@
+## Pattern based rewriting of expression trees
+##
+## >>> x = Variable('x')
+## >>> rules = RuleSet()
+## >>> rules.register(Sin(x) ** 2 + Cos(x) ** 2, 1)
+## >>> rules.rewrite(Sin(y + 1) ** 2 + Cos(y + 1) ** 2 + y)
+## Expression(1 + y)
+##
+## Variables in a pattern are wildcards, they match any node and are bound to it,
+## a wildcard used twice must be bound to the same node both times.
+##
+## Rules are indexed by the type at the root of their pattern,
+## so a node is only checked against rules which could possibly match it.
+##
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import numbers
+
+from .core.expressions.add import Operation, Add
+from .core.expressions.multiply import Multiply, Power
+from .core.expressions.traversal import Transformer, preorder
+from .core.expressions.substitution import Substitution
+from .core.expressions.structure import key
+import cake
+
+Bindings = Dict[str, Any]
+
+## Operations whose nodes can be matched in any order
+COMMUTATIVE = (Add, Multiply)
+
+
+def _unwrap(node: Any) -> Any:
+    return node.exp if isinstance(node, cake.Expression) else node
+
+
+def _convert(node: Any) -> Any:
+    if isinstance(node, str):
+        return cake.Variable(node)
+    elif isinstance(node, numbers.Number) and not isinstance(node, cake.Number):
+        return cake.Number.convert(node)
+    return _unwrap(node)
+
+
+def _is_function(replacement: Any) -> bool:
+    ## Nodes such as variables are callable themselves, so they are excluded
+    if isinstance(replacement, (cake.BasicNode, cake.BasicExpression, Operation, numbers.Number, str)):
+        return False
+    return callable(replacement)
+
+
+class Rule(object):
+    ''' A single rewrite rule, replacing nodes which match a pattern.
+
+    Parameters
+    ----------
+    pattern: Any[Like[cake.BasicNode]]
+        Pattern to match, variables within it are wildcards.
+    replacement: Union[Any[Like[cake.BasicNode]], Callable[..., Any]]
+        Node to replace matches with, wildcards within it are substituted with what they matched.
+        Can also be a function which receives the bindings as keyword arguments.
+    wild: Optional[Iterable[Union[:class:`str`, :class:`Variable`]]]
+        Variables which are wildcards, defaults to every variable in the pattern.
+    condition: Optional[Callable[..., :class:`bool`]]
+        Function receiving the bindings as keyword arguments, the rule is only applied if it returns ``True``.
+    name: Optional[:class:`str`]
+        Name of the rule, used for its representation.
+    '''
+    def __init__(self, pattern: Any, replacement: Any, *,
+                 wild: Optional[Iterable[Any]] = None,
+                 condition: Optional[Callable[..., bool]] = None,
+                 name: Optional[str] = None) -> None:
+        self.pattern = _convert(pattern)
+        self.replacement = replacement if _is_function(replacement) else _convert(replacement)
+        self.condition = condition
+        self.name = name
+
+        if wild is None:
+            self.wild = {i.representation for i in _variables(self.pattern)}
+        else:
+            self.wild = {getattr(i, 'representation', i) for i in wild}
+
+    @property
+    def head(self) -> type:
+        ''' Type of node at the root of the pattern, wildcards match any type '''
+        if self._is_wild(self.pattern):
+            return object
+        return type(self.pattern)
+
+    def __repr__(self) -> str:
+        return f'Rule({self.name or self.pattern} -> {self.replacement})'
+
+    def _is_wild(self, pattern: Any) -> bool:
+        return isinstance(pattern, cake.Variable) and pattern.representation in self.wild
+
+    ''' Matching '''
+
+    def _bind(self, name: str, node: Any, bindings: Bindings) -> Optional[Bindings]:
+        if name in bindings:
+            if key(bindings[name]) != key(node):
+                return None
+            return bindings
+        return {**bindings, name: node}
+
+    def _match_wild(self, pattern: cake.Variable, node: Any, bindings: Bindings) -> Optional[Bindings]:
+        ## Wildcards may carry a coefficient and power, x**2 matches y**2 and (y + 1) ** 2
+        if key(pattern.coefficient) != key(1):
+            if not isinstance(node, cake.Variable) or key(node.coefficient) != key(pattern.coefficient):
+                return None
+            node = cake.Variable(node.representation, 1, node.power)
+
+        if key(pattern.power) == key(1):
+            return self._bind(pattern.representation, node, bindings)
+
+        if isinstance(node, Power) or (isinstance(node, cake.RaisedVariable)):
+            if key(node.power) == key(pattern.power):
+                return self._bind(pattern.representation, _unwrap(node.base), bindings)
+        elif isinstance(node, cake.Variable) and not getattr(node, '_to_type', None):
+            if key(node.power) == key(pattern.power) and key(node.coefficient) == key(1):
+                return self._bind(pattern.representation, cake.Variable(node.representation), bindings)
+        return None
+
+    def match(self, pattern: Any, node: Any, bindings: Bindings) -> Optional[Bindings]:
+        ''' Matches a node against a pattern, returning the updated bindings or ``None`` '''
+        node = _convert(node)
+        pattern = _convert(pattern)
+
+        if self._is_wild(pattern):
+            return self._match_wild(pattern, node, bindings)
+
+        if isinstance(pattern, cake.Function):
+            if type(node) is not type(pattern):
+                return None
+            for p, n in ((pattern.parameter, node.parameter),
+                         (pattern.coefficient, node.coefficient),
+                         (pattern.power, node.power)):
+                bindings = self.match(p, n, bindings)
+                if bindings is None:
+                    return None
+            return bindings
+
+        if isinstance(pattern, Operation):
+            if type(node) is not type(pattern):
+                return None
+
+            if isinstance(pattern, COMMUTATIVE):
+                if len(pattern.nodes) != len(node.nodes):
+                    return None
+                for bound, _ in self._match_unordered(list(pattern.nodes), list(node.nodes), bindings):
+                    return bound
+                return None
+
+            if len(pattern.nodes) != len(node.nodes):
+                return None
+            for p, n in zip(pattern.nodes, node.nodes):
+                bindings = self.match(p, n, bindings)
+                if bindings is None:
+                    return None
+            return bindings
+
+        if isinstance(pattern, cake.Variable) and isinstance(node, cake.Variable):
+            if pattern.representation != node.representation:
+                return None
+            for p, n in ((pattern.coefficient, node.coefficient), (pattern.power, node.power)):
+                bindings = self.match(p, n, bindings)
+                if bindings is None:
+                    return None
+            return bindings
+
+        return bindings if key(pattern) == key(node) else None
+
+    def _match_unordered(self, patterns: List[Any], nodes: List[Any],
+                         bindings: Bindings) -> Iterator[Tuple[Bindings, List[Any]]]:
+        ## Yields every way of matching all patterns against distinct nodes, with the unused nodes
+        if not patterns:
+            yield bindings, nodes
+            return
+
+        pattern, rest = patterns[0], patterns[1:]
+        for index, node in enumerate(nodes):
+            bound = self.match(pattern, node, bindings)
+            if bound is not None:
+                yield from self._match_unordered(rest, nodes[:index] + nodes[index + 1:], bound)
+
+    ''' Applying '''
+
+    def _replace(self, bindings: Bindings) -> Any:
+        if _is_function(self.replacement):
+            return _convert(self.replacement(**bindings))
+        return _unwrap(Substitution(bindings).visit(self.replacement))
+
+    def apply(self, node: Any) -> Optional[Any]:
+        ''' Applies the rule to the root of a node, returning ``None`` if it doesn't match.
+
+        Patterns rooted at :class:`Add` or :class:`Multiply` also match a subset of a larger
+        sum or product, the remaining nodes are kept alongside the replacement.
+        '''
+        node = _convert(node)
+        pattern = self.pattern
+
+        if isinstance(pattern, COMMUTATIVE) and type(node) is type(pattern) and len(node.nodes) > len(pattern.nodes):
+            for bindings, rest in self._match_unordered(list(pattern.nodes), list(node.nodes), {}):
+                if self.condition is None or self.condition(**bindings):
+                    return type(node)(self._replace(bindings), *rest)
+            return None
+
+        bindings = self.match(pattern, node, {})
+        if bindings is None or (self.condition is not None and not self.condition(**bindings)):
+            return None
+        return self._replace(bindings)
+
+
+def _variables(node: Any) -> Iterator[cake.Variable]:
+    stack = [node]
+    while stack:
+        for child in preorder(stack.pop()):
+            if isinstance(child, cake.Variable) and not getattr(child, '_to_type', None):
+                stack.extend((child.coefficient, child.power))
+                yield child
+            elif isinstance(child, cake.VariableGroup):
+                yield from child.groups
+
+
+class RuleSet(object):
+    ''' A collection of rewrite rules, indexed by the type at the root of each pattern.
+
+    .. code-block:: py
+
+        >>> rules = RuleSet()
+        >>> x = Variable('x')
+        >>> rules.register(Sin(x) ** 2 + Cos(x) ** 2, 1)
+        >>> rules.register(Sqrt(x ** 2), x)
+        >>> rules.rewrite(Sqrt(y ** 2) * (Sin(y) ** 2 + Cos(y) ** 2))
+        y
+
+    Parameters
+    ----------
+    *rules: :class:`Rule`
+        Rules to start the set with
+    '''
+    def __init__(self, *rules: Rule) -> None:
+        self._rules: Dict[type, List[Rule]] = {}
+        self._cache: Dict[type, List[Rule]] = {}
+
+        for rule in rules:
+            self.add(rule)
+
+    def add(self, rule: Rule) -> Rule:
+        ''' Adds a rule into the set '''
+        self._rules.setdefault(rule.head, []).append(rule)
+        self._cache.clear()
+        return rule
+
+    def register(self, pattern: Any, replacement: Any = None, **options: Any) -> Union[Rule, Callable]:
+        ''' Creates and adds a rule, accepts the same arguments as :class:`Rule`.
+        If no replacement is given, this can be used as a decorator around a replacement function.
+
+        .. code-block:: py
+
+            @rules.register(Sqrt(x ** 2))
+            def sqrt_of_square(x):
+                return Abs(x)
+        '''
+        if replacement is None:
+            def decorator(func: Callable) -> Callable:
+                self.add(Rule(pattern, func, **options))
+                return func
+            return decorator
+        return self.add(Rule(pattern, replacement, **options))
+
+    def lookup(self, node: Any) -> List[Rule]:
+        ''' Returns the rules which could match a node, based on its type '''
+        cls = type(node)
+        rules = self._cache.get(cls)
+
+        if rules is None:
+            rules = []
+            for base in cls.__mro__:
+                rules.extend(self._rules.get(base, ()))
+            self._cache[cls] = rules
+        return rules
+
+    def rewrite(self, node: Any, *, max_rewrites: int = 10_000) -> Any:
+        ''' Applies the rules to a node, see :func:`rewrite` '''
+        return rewrite(node, self, max_rewrites=max_rewrites)
+
+    def __iter__(self) -> Iterator[Rule]:
+        for rules in self._rules.values():
+            yield from rules
+
+    def __len__(self) -> int:
+        return sum(map(len, self._rules.values()))
+
+    def __repr__(self) -> str:
+        return f'RuleSet({len(self)} rules)'
+
+
+class Rewriter(Transformer):
+    ''' A :class:`Transformer` which applies rules bottom up until none of them match,
+    subtrees shared between parents are only rewritten once.
+
+    Parameters
+    ----------
+    rules: :class:`RuleSet`
+        Rules to apply
+    max_rewrites: :class:`int`
+        Maximum number of rewrites made, guards against rules which undo each other.
+    '''
+    def __init__(self, rules: RuleSet, *, max_rewrites: int = 10_000) -> None:
+        super().__init__()
+        self.rules = rules
+        self.remaining = max_rewrites
+
+    def generic_visit(self, node: Any, results: list) -> Any:
+        node = self.rebuild(node, results)
+        if isinstance(node, cake.Expression):
+            ## The operation it holds has already been rewritten
+            return node
+
+        while self.remaining > 0:
+            for rule in self.rules.lookup(_unwrap(node)):
+                result = rule.apply(node)
+                if result is not None:
+                    break
+            else:
+                return node
+
+            self.remaining -= 1
+            node = result
+
+            ## Only the children of the result are visited, nodes already rewritten are memoised
+            nodes = self.children(node)
+            if nodes:
+                node = self.rebuild(node, [self.visit(i) for i in nodes])
+            if isinstance(node, cake.Expression):
+                return node
+        return node
+
+
+default_rules = RuleSet()
+''' Rules used by :func:`rewrite` when none are given '''
+
+
+def register(pattern: Any, replacement: Any = None, **options: Any) -> Union[Rule, Callable]:
+    ''' Registers a rule into :data:`default_rules`, see :meth:`RuleSet.register` '''
+    return default_rules.register(pattern, replacement, **options)
+
+
+def rewrite(node: Any, rules: Optional[RuleSet] = None, *, max_rewrites: int = 10_000) -> Any:
+    ''' Applies rewrite rules to a node until none of them match.
+
+    .. code-block:: py
+
+        >>> x = Variable('x')
+        >>> cake.rewrite.register(Sin(x) ** 2 + Cos(x) ** 2, 1)
+        >>> cake.rewrite.rewrite(Sin(y + 1) ** 2 + Cos(y + 1) ** 2 + y)
+        Expression(1 + y)
+
+    Parameters
+    ----------
+    node: Any[Like[cake.BasicNode]]
+        Node to rewrite
+    rules: Optional[:class:`RuleSet`]
+        Rules to apply, defaults to :data:`default_rules`
+    max_rewrites: :class:`int`
+        Maximum number of rewrites made, guards against rules which undo each other.
+    '''
+    if rules is None:
+        rules = default_rules
+
+    result = Rewriter(rules, max_rewrites=max_rewrites).visit(node)
+    if isinstance(result, Operation):
+        return cake.Expression(result)
+    return result
@@ -1,8 +1,25 @@
 from __future__ import annotations
-from typing import Any
+from typing import Any, Iterable
+import itertools
 import math
 import cake
 
+from .core.sparse import SparsePolynomial
+
+
+def _numpy() -> Any:
+    ## NumPy is optional, it's only imported by features which need it
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('NumPy is required for vectorised evaluation, install it using "pip install numpy"') from None
+    return numpy
+
+
+def _is_array(x: Any) -> bool:
+    ## Whether a value is an array of values rather than a single value, without importing NumPy
+    return getattr(x, 'ndim', 0) > 0
+
 
 def to_radians(x: Any, *, use_constant: bool = False) -> Any:
     ''' Converts the desired input from degrees into radians
@@ -50,3 +67,70 @@ def solve_if_possible(__x_v: Any, /, **kwds) -> Any:
     elif hasattr(__x_v, 'evaluate'):
         return __x_v.evaluate(**kwds)
     return __x_v
+
+
+def sum(iterable: Iterable[Any], /, start: Any = 0) -> Any:
+    ''' Adds together any number of terms, flattening them exactly once.
+    Unlike the built in :py:func:`sum`, a new :class:`Add` isn't made for every term.
+
+    .. code-block:: py
+
+        >>> cake.sum(Variable('x', power=i) for i in range(1, 4))
+        Expression(x + x**2 + x**3)
+        >>> cake.sum([Variable('x'), Variable('x')])
+        Variable('x', coefficient=2, power=1)
+
+    Parameters
+    ----------
+    iterable: Iterable[Any[Like[cake.BasicNode]]]
+        Terms to add together
+    start: Any[Like[cake.BasicNode]]
+        Value to start the sum from, defaults to ``0``.
+    '''
+    add = cake.Add.from_iterable(itertools.chain((start,), iterable))
+    if len(add.nodes) == 1:
+        return add.nodes[0]
+    return cake.Expression(add)
+
+
+def prod(iterable: Iterable[Any], /, start: Any = 1) -> Any:
+    ''' Multiplies together any number of terms, flattening them exactly once.
+    Numbers, variables and sums of variables are expanded together in a single pass,
+    any other terms are gathered into one :class:`Multiply`.
+
+    .. code-block:: py
+
+        >>> x, y = Variable.many('x', 'y')
+        >>> cake.prod([x + 1, y, 3])
+        Expression(3xy + 3y)
+        >>> cake.prod([x, Sin(x)])
+        Expression(x * Sin(x))
+
+    Parameters
+    ----------
+    iterable: Iterable[Any[Like[cake.BasicNode]]]
+        Terms to multiply together
+    start: Any[Like[cake.BasicNode]]
+        Value to start the product from, defaults to ``1``.
+    '''
+    poly = None
+    others = []
+
+    for term in itertools.chain((start,), iterable):
+        factor = SparsePolynomial.from_node(term)
+        if factor is None:
+            others.append(term)
+        elif poly is None:
+            poly = factor
+        else:
+            poly = poly * factor
+
+    result = poly.as_node() if poly is not None else 1
+    if not others:
+        return cake.Number.convert(result)
+
+    if (x := result == 1) and not isinstance(x, cake.Comparity):
+        if len(others) == 1:
+            return others[0]
+        return cake.Expression(cake.Multiply(*others))
+    return cake.Expression(cake.Multiply(result, *others))
@@ -0,0 +1,27 @@
+import pytest
+
+import cake
+from cake import Variable
+
+
+def test_variables_share_the_assumptions_of_their_symbol():
+    try:
+        Variable('n', assumptions={'integer'})
+        assert 'integer' in Variable('n').assumptions
+    finally:
+        cake.forget('n')
+
+
+def test_different_assumptions_are_not_replaced_by_a_variable():
+    try:
+        Variable('n', assumptions={'integer'})
+        Variable('n', assumptions={'integer'})
+
+        with pytest.raises(ValueError):
+            Variable('n', assumptions={'positive'})
+        assert 'positive' not in Variable('n').assumptions
+
+        cake.assume('n', {'positive'})
+        assert 'integer' not in Variable('n').assumptions
+    finally:
+        cake.forget('n')
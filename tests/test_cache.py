@@ -0,0 +1,14 @@
+import cake
+from cake import Integral, Sin, Variable
+
+x = Variable('x')
+
+
+def test_cached_results_are_copies():
+    with cake.options.using(function_cache_size=16):
+        cake.function_cache.clear()
+        value = Sin(x).evaluate(x=45, to_radians=True)
+        value.coefficient = Integral(9)
+
+        assert repr(Sin(x).evaluate(x=45, to_radians=True)) == 'Sqrt(parameter=2, coefficient=Rational(0.5), power=1)'
+        assert cake.function_cache.info().hits == 1
@@ -0,0 +1,39 @@
+import math
+
+import pytest
+
+import cake
+from cake import Variable
+
+x, y = Variable.many('x', 'y')
+
+
+@cake.function(derivative=lambda u: Exp(u), replace=True)
+def Exp(v):
+    return math.exp(v)
+
+
+def test_chain_rule_is_applied():
+    assert str(Exp(x ** 2).differentiate()) == '2x*Exp(x**2)'
+    assert str(Exp(x).differentiate()) == 'Exp(x)'
+    assert Exp(x ** 2).differentiate().evaluate(x=1) == pytest.approx(2 * math.e)
+
+
+def test_nested_functions_are_differentiated():
+    d = Exp(Exp(2 * x)).differentiate()
+    assert cake.Expression.wrap(d).solve(x=0) == pytest.approx(2 * math.e)
+
+
+def test_symbol_is_required_for_several_symbols():
+    with pytest.raises(ValueError):
+        Exp(x * y).differentiate()
+    assert str(Exp(x * y).differentiate(y)) == 'x*Exp(xy)'
+
+
+def test_missing_derivative_raises_type_error():
+    @cake.function(replace=True)
+    def Identity(v):
+        return v
+
+    with pytest.raises(TypeError):
+        Identity(x).differentiate()
@@ -0,0 +1,57 @@
+from cake import Divide, Expression, Multiply, Sin, Variable, probably_equal
+from cake.core.expressions.structure import same
+
+x, y = Variable.many('x', 'y')
+
+
+def test_nested_numerator():
+    e = Expression(Divide(Divide(x, 2), 3))
+    assert e.solve(x=12) == 2
+
+
+def test_nested_denominator():
+    e = Expression(Divide(x, Divide(3, y)))
+    assert e.solve(x=6, y=2) == 4
+
+
+def test_nested_numerator_and_denominator():
+    e = Expression(Divide(Divide(x, 2), Divide(3, y)))
+    assert e.solve(x=4, y=3) == 2
+
+
+def test_nested_fraction_cancels():
+    assert Divide(Divide(x, y), Divide(x, y)) == 1
+
+
+def test_negative_denominator_with_float_coefficient():
+    assert Expression(Divide(Variable('x', 2.5), -3)).solve(x=6) == -5
+    assert Expression(Divide(Variable('x', 2.5), Variable('y', -2))).solve(x=4, y=5) == -1
+
+
+def test_negative_denominator_with_integer_coefficients():
+    e = Expression(Divide(Variable('x', 6), Variable('y', -4)))
+    assert str(e) == '-3x / 2y'
+
+
+def test_sums_and_products_are_bracketed():
+    assert str(Expression(Divide(x, x + 1))) == 'x / (x + Integral(1))'
+    assert str(Expression(Divide(x + 1, y))) == '(x + Integral(1)) / y'
+
+
+def test_cancels_the_factor_which_matched():
+    f = Divide(Multiply(Sin(x, coefficient=2), Sin(x)), Sin(x))
+    assert abs(f.evaluate(x=1) - 2 * Sin(x).evaluate(x=1)) < 1e-12
+
+
+def test_cancelled_denominator_returns_the_numerator():
+    assert Divide(x + 1, x + 1) == 1
+    assert str(Expression.wrap(Divide(2 * x + 4, 2))) == 'x + Integral(2)'
+    assert same(Divide(x ** 2 * y, x * y), x)
+    assert same(x / 1, x)
+
+
+def test_floor_division_and_modulo_are_not_true_division():
+    assert (x // 2).solve(x=3) == 1
+    assert (x % 2).solve(x=3) == 1
+    assert ((x // 2) * 3).solve(x=3) == 3
+    assert not probably_equal(x // 1, x)
@@ -0,0 +1,13 @@
+from cake import Cos, Sin, Sqrt, Variable, probably_equal
+
+x = Variable('x')
+
+
+def test_identities_which_only_hold_for_positive_values():
+    assert not probably_equal(Sqrt(x ** 2), x, seed=0)
+
+
+def test_float_identities():
+    assert probably_equal(Sin(x) ** 2 + Cos(x) ** 2, 1, seed=0)
+    assert probably_equal(Sin(x) / x, Sin(x) * x ** -1, seed=0)
+    assert not probably_equal(Sin(x), Cos(x), seed=0)
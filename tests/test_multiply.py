@@ -0,0 +1,37 @@
+from cake import Multiply, Power, Sin, Cos, Variable
+from cake.core.expressions.structure import same
+
+x, y = Variable.many('x', 'y')
+
+
+def test_powers_merge_with_the_same_base():
+    assert str(Multiply(Power(Sin(x), 2), Sin(x))) == 'Sin**3(x)'
+    assert str(Multiply(Sin(y), Sin(x), Power(Sin(y), 2))) == 'Sin**3(y) * Sin(x)'
+
+
+def test_nested_products_are_merged():
+    s = Sin(x)
+    product = Multiply(Multiply(Cos(y), Power(s, 2)), Multiply(s, Cos(y)))
+    assert str(product) == 'Cos**2(y) * Sin**3(x)'
+
+
+def test_equal_factors_are_merged():
+    assert str(Multiply(Sin(x), Sin(x))) == 'Sin**2(x)'
+
+    product = Multiply(x + 1, x + 1)
+    assert len(product.nodes) == 1
+    assert same(product.nodes[0], Power(x + 1, 2))
+
+
+def test_chained_products_stay_flat():
+    product = x
+    for i in range(1, 3001):
+        product = Multiply(product, Sin(y + i))
+    assert len(product.nodes) == 3001
+
+
+def test_chained_equal_factors_are_merged():
+    product = x
+    for _ in range(3000):
+        product = Multiply(product, Sin(y))
+    assert str(product) == 'x * Sin**3000(y)'
@@ -0,0 +1,24 @@
+import pytest
+
+from cake import Variable
+from cake.expressions import MultivariatePolynomial
+
+x, y = Variable.many('x', 'y')
+
+
+def test_roots_once_one_symbol_remains():
+    p = MultivariatePolynomial.from_expression(x ** 2 * y - 4 * y)
+    assert sorted(p.solve(y=1).roots()) == [-2, 2]
+
+
+def test_r_solve_for_the_remaining_symbol():
+    p = MultivariatePolynomial.from_expression(x * y + 1)
+    assert p.r_solve(7, x=2) == (3,)
+
+
+def test_roots_of_several_symbols_raise():
+    p = MultivariatePolynomial.from_expression(x * y + 1)
+    with pytest.raises(ValueError):
+        p.roots()
+    with pytest.raises(ValueError):
+        p.r_solve(1, x=1, y=1)
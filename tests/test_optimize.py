@@ -0,0 +1,17 @@
+from cake import Expression, Power, Real, Sin, Variable, optimize
+
+x = Variable('x')
+
+
+def _solve(node, **values):
+    return node.solve(**values) if hasattr(node, 'solve') else Expression(node).solve(**values)
+
+
+def test_fractional_power_of_power_is_not_folded():
+    e = Expression(Power(Power(Sin(x), 2), Real(0.5)))
+    assert abs(_solve(optimize(e), x=30) - e.solve(x=30)) < 1e-12
+
+
+def test_integer_power_of_power_is_folded():
+    o = optimize(Expression(Power(Power(x, 2), 3)))
+    assert o.power == 6
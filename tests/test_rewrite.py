@@ -0,0 +1,28 @@
+from cake import Cos, Sin, Variable
+from cake.rewrite import RuleSet
+
+x, y = Variable.many('x', 'y')
+
+
+def test_rules_which_undo_each_other_stop():
+    rules = RuleSet()
+    rules.register(Sin(x), Cos(x))
+    rules.register(Cos(x), Sin(x))
+
+    result = rules.rewrite(Sin(y), max_rewrites=5_001)
+    assert str(result) == 'Cos(y)'
+
+
+def test_results_are_rewritten_again():
+    rules = RuleSet()
+    rules.register(Sin(x), Cos(x))
+    rules.register(Cos(x), x ** 2)
+
+    assert str(rules.rewrite(Sin(Sin(y)))) == 'y**4'
+
+
+def test_commutative_patterns_match():
+    rules = RuleSet()
+    rules.register(Sin(x) ** 2 + Cos(x) ** 2, 1)
+
+    assert rules.rewrite(Cos(y + 1) ** 2 + Sin(y + 1) ** 2) == 1
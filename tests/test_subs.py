@@ -0,0 +1,12 @@
+from cake import Variable
+
+x, y, z = Variable.many('x', 'y', 'z')
+
+
+def test_subs_on_variables():
+    assert x.subs(x=3) == 3
+    assert (x * y * z).subs(y=2, x=1, z=5) == 10
+
+
+def test_subs_on_raised_variables():
+    assert (2 ** x).subs(x=3).solve() == 8
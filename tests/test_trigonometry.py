@@ -0,0 +1,24 @@
+from cake import Cos, Integral, Pi, Rational, Sin, Sqrt, Tan, Variable
+
+x = Variable('x')
+
+
+def test_integer_powers_of_exact_values_are_exact():
+    value = Sin(Pi() / 3, power=2).evaluate()
+    assert isinstance(value, Rational) and value == Rational(3, 4)
+
+    value = Tan(Pi() / 3, power=2).evaluate()
+    assert isinstance(value, Integral) and value == 3
+
+
+def test_odd_powers_keep_the_surd():
+    value = Sin(Pi() / 4, power=3).evaluate()
+    assert isinstance(value, Sqrt) and value.parameter == 2 and value.coefficient == Rational(1, 4)
+
+    value = Cos(Pi() / 4, power=-1).evaluate()
+    assert isinstance(value, Sqrt) and value.parameter == 2 and value.coefficient == 1
+
+
+def test_coefficient_is_applied_exactly():
+    value = Sin(x, coefficient=4, power=2).evaluate(x=60, to_radians=True)
+    assert isinstance(value, Integral) and value == 3